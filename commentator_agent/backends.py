@@ -0,0 +1,421 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Deque, List, Optional
+
+from loguru import logger
+
+LATENCY_WINDOW = 50  # samples kept per backend for p50/p95
+FAILURE_THRESHOLD = 3  # consecutive failures that open the circuit
+ERROR_RATE_THRESHOLD = 0.5  # ... or this error rate over the window (once it has enough samples)
+MIN_SAMPLES_FOR_RATE = 6
+COOLDOWN_S = 30.0  # how long an open circuit rejects calls before a half-open probe
+
+
+class NarrationBackend(ABC):
+    """
+    Something that can turn a prompt into commentary.
+
+    ``narrate`` returns the commentary text (or None) and must set
+    ``first_output`` as soon as the listener can hear or read something,
+    which is what the router's latency and hedging decisions are based on.
+    Subclass it, or pass any object with the same ``name``/``narrate`` shape.
+    """
+    name: str = "backend"
+
+    @abstractmethod
+    async def narrate(self, prompt: str, first_output: asyncio.Event) -> Optional[str]:
+        ...
+
+
+class CallableBackend(NarrationBackend):
+    """Adapts a coroutine function ``fn(prompt, first_output)`` into a backend."""
+
+    def __init__(self, name: str, fn: Callable[[str, asyncio.Event], Awaitable[Optional[str]]]):
+        self.name = name
+        self._fn = fn
+
+    async def narrate(self, prompt: str, first_output: asyncio.Event) -> Optional[str]:
+        return await self._fn(prompt, first_output)
+
+
+class LiteLlmBackend(NarrationBackend):
+    """
+    Text-only commentary through LiteLLM. With ``on_text`` set the completion
+    is streamed and every text delta is handed to it as it arrives.
+    """
+
+    def __init__(self, model: str, name: Optional[str] = None,
+                 on_text: Optional[Callable[[str], None]] = None):
+        self.model = model
+        self.name = name or model
+        self.on_text = on_text
+        self._acompletion = None
+
+    async def narrate(self, prompt: str, first_output: asyncio.Event) -> Optional[str]:
+        if self._acompletion is None:
+            # import once, on first use, rather than on every failure
+            from litellm import acompletion
+            self._acompletion = acompletion
+        messages = [{"role": "user", "content": prompt}]
+
+        if self.on_text is None:
+            response = await self._acompletion(model=self.model, messages=messages)
+            first_output.set()
+            return response.choices[0].message.content
+
+        pieces = []
+        stream = await self._acompletion(model=self.model, messages=messages, stream=True)
+        async for part in stream:
+            delta = part.choices[0].delta.content if part.choices else None
+            if delta:
+                first_output.set()
+                pieces.append(delta)
+                self.on_text(delta)
+        return "".join(pieces)
+
+
+class StandInBackend(NarrationBackend):
+    """Local stand-in with a fixed delay and failure pattern, for dry runs and benchmarks."""
+
+    def __init__(self, name: str = "stand_in", delay: float = 0.0, fail_every: int = 0,
+                 text: str = "Stand-in commentary."):
+        self.name = name
+        self.delay = delay
+        self.fail_every = fail_every
+        self.text = text
+        self.calls = 0
+
+    async def narrate(self, prompt: str, first_output: asyncio.Event) -> Optional[str]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise RuntimeError(f"{self.name} simulated failure")
+        first_output.set()
+        return self.text
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class NarrationResult:
+    backend: str
+    text: Optional[str]
+    first_output_s: float
+    total_s: float
+    hedged: bool = False
+
+
+class CircuitOpenError(RuntimeError):
+    """A half-open backend already has its probe in flight."""
+
+
+class BackendHealth:
+    """Rolling latency/error window and circuit breaker for one backend."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, cooldown: float = COOLDOWN_S):
+        self.cooldown = cooldown
+        self.state = CircuitState.CLOSED
+        self.calls = 0
+        self.failures = 0
+        self.trips = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False  # a half-open probe is in flight
+
+    def _percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self._percentile(0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self._percentile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def available(self) -> bool:
+        if self.state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = CircuitState.HALF_OPEN  # let one probe through
+        if self.state is CircuitState.HALF_OPEN:
+            return not self._probing
+        return self.state is CircuitState.CLOSED
+
+    def begin_attempt(self) -> bool:
+        """
+        Claim the probe of a half-open circuit; only one attempt may probe at
+        a time. Returns whether this attempt is the probe, for ``end_attempt``.
+        """
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError("half-open probe already in flight")
+            self._probing = True
+            return True
+        return False
+
+    def end_attempt(self, probe: bool) -> None:
+        if probe:
+            self._probing = False  # a cancelled probe leaves the circuit half-open for the next one
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self._latencies.append(latency)
+        self._outcomes.append(True)
+        self._consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        self.calls += 1
+        self.failures += 1
+        self._outcomes.append(False)
+        self._consecutive_failures += 1
+        rate_tripped = len(self._outcomes) >= MIN_SAMPLES_FOR_RATE and self.error_rate >= ERROR_RATE_THRESHOLD
+        if (self.state is CircuitState.HALF_OPEN or rate_tripped
+                or self._consecutive_failures >= FAILURE_THRESHOLD):
+            if self.state is not CircuitState.OPEN:
+                self.trips += 1
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    def describe(self) -> str:
+        p50, p95 = self.p50, self.p95
+        latency = f"p50={p50:.2f}s p95={p95:.2f}s" if p50 is not None else "no samples"
+        return f"{self.state.value}, {latency}, errors={self.error_rate:.0%}, trips={self.trips}"
+
+
+class BackendRouter:
+    """
+    Routes each narration to the first healthy backend in preference order.
+
+    Latency is measured to the backend's first output. With ``hedge_after``
+    set, a second healthy backend is started if the first has produced
+    nothing by then, and whichever produces output first wins; the other is
+    cancelled. Failed attempts fall through to the next backend.
+    """
+
+    def __init__(self, backends: List[NarrationBackend], hedge_after: Optional[float] = None):
+        if not backends:
+            raise ValueError("BackendRouter needs at least one backend")
+        self.backends = backends
+        self.hedge_after = hedge_after
+        self.health = {backend.name: BackendHealth() for backend in backends}
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _candidates(self) -> List[NarrationBackend]:
+        return [backend for backend in self.backends if self.health[backend.name].available()]
+
+    async def _attempt(self, backend: NarrationBackend, prompt: str, first_output: asyncio.Event) -> NarrationResult:
+        started = time.monotonic()
+        health = self.health[backend.name]
+        first_output_at: List[float] = []
+
+        async def mark_first_output():
+            await first_output.wait()
+            first_output_at.append(time.monotonic())
+
+        probe = health.begin_attempt()
+        marker = asyncio.create_task(mark_first_output())
+        try:
+            text = await backend.narrate(prompt, first_output)
+        except Exception as e:
+            health.record_failure()
+            logger.warning(f"🔀 Narration backend {backend.name} failed: {e}")
+            raise
+        finally:
+            marker.cancel()
+            health.end_attempt(probe)
+
+        finished = time.monotonic()
+        first = (first_output_at[0] if first_output_at else finished) - started
+        health.record_success(first)
+        return NarrationResult(backend.name, text, first, finished - started)
+
+    async def narrate(self, prompt: str) -> NarrationResult:
+        candidates = self._candidates()
+        if not candidates:
+            # every circuit is open: try the preferred backend anyway rather than go silent
+            candidates = self.backends[:1]
+
+        last_error: Optional[BaseException] = None
+        index = 0
+        while index < len(candidates):
+            primary = candidates[index]
+            hedge = candidates[index + 1] if self.hedge_after is not None and index + 1 < len(candidates) else None
+            index += 1 if hedge is None else 2
+            try:
+                if hedge is None:
+                    return await self._attempt(primary, prompt, asyncio.Event())
+                return await self._hedged(primary, hedge, prompt)
+            except Exception as e:
+                last_error = e
+        raise RuntimeError(f"All narration backends failed: {last_error}") from last_error
+
+    async def _hedged(self, primary: NarrationBackend, hedge: NarrationBackend, prompt: str) -> NarrationResult:
+        """
+        Run ``primary``; start ``hedge`` if it stays silent past the deadline or
+        fails. The first attempt to produce output wins and the other is
+        cancelled, so a hedge that finishes early never cuts off audio the
+        listener is already hearing.
+        """
+        outputs = {}  # attempt task -> its first-output event
+        losers: List[asyncio.Task] = []
+        hedged = False
+
+        def start(backend: NarrationBackend) -> None:
+            output = asyncio.Event()
+            outputs[asyncio.create_task(self._attempt(backend, prompt, output))] = output
+
+        def start_hedge() -> None:
+            nonlocal hedged
+            hedged = True
+            self.hedges += 1
+            start(hedge)
+
+        def won(result: NarrationResult) -> NarrationResult:
+            result.hedged = hedged
+            if hedged and result.backend == hedge.name:
+                self.hedge_wins += 1
+            return result
+
+        start(primary)
+        try:
+            primary_task, primary_output = next(iter(outputs.items()))
+            output_wait = asyncio.create_task(primary_output.wait())
+            await asyncio.wait({primary_task, output_wait}, timeout=self.hedge_after,
+                               return_when=asyncio.FIRST_COMPLETED)
+            output_wait.cancel()
+            if not primary_output.is_set() and not primary_task.done():
+                logger.debug(f"🔀 {primary.name} silent after {self.hedge_after:.1f}s, hedging with {hedge.name}")
+                start_hedge()
+
+            errors: List[BaseException] = []
+            while outputs:
+                speaking = next((task for task, output in outputs.items() if output.is_set()), None)
+                if speaking is not None:
+                    # decided by first output: drop the other attempt and let this one finish
+                    losers.extend(task for task in outputs if task is not speaking)
+                    for task in losers:
+                        task.cancel()
+                    outputs = {speaking: outputs[speaking]}
+                    waiting = {speaking}
+                else:
+                    waiting = set(outputs) | {asyncio.create_task(output.wait()) for output in outputs.values()}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                for task in waiting - set(outputs):
+                    task.cancel()
+                for task in done & set(outputs):
+                    if task.exception() is None:
+                        return won(task.result())
+                    errors.append(task.exception())
+                    del outputs[task]
+                if not outputs and not hedged:
+                    start_hedge()  # primary failed before the deadline
+            raise errors[-1]
+        finally:
+            losers.extend(outputs)
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.wait(losers)  # let the losers stop their own output before returning
+
+    def describe(self) -> str:
+        return "; ".join(f"{name}: {health.describe()}" for name, health in self.health.items())
+
+
+if __name__ == "__main__":
+    # Exercises the circuit breaker and hedging against local stand-ins; exits non-zero on a regression
+
+    class ScriptedBackend(NarrationBackend):
+        """Speaks after ``speak_after`` seconds and finishes ``finish_after`` seconds later, or fails."""
+
+        def __init__(self, name: str, speak_after: float = 0.0, finish_after: float = 0.0, fail: bool = False):
+            self.name = name
+            self.speak_after = speak_after
+            self.finish_after = finish_after
+            self.fail = fail
+            self.calls = 0
+            self.cancelled = 0
+
+        async def narrate(self, prompt: str, first_output: asyncio.Event) -> Optional[str]:
+            self.calls += 1
+            try:
+                await asyncio.sleep(self.speak_after)
+                if self.fail:
+                    raise RuntimeError(f"{self.name} scripted failure")
+                first_output.set()
+                await asyncio.sleep(self.finish_after)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            return self.name
+
+    async def circuit_breaker() -> None:
+        live, text = ScriptedBackend("live", fail=True), ScriptedBackend("text")
+        router = BackendRouter([live, text])
+        router.health["live"].cooldown = 0.05
+        for _ in range(FAILURE_THRESHOLD):
+            assert (await router.narrate("p")).backend == "text"
+        assert router.health["live"].state is CircuitState.OPEN and router.health["live"].trips == 1
+        assert (await router.narrate("p")).backend == "text" and live.calls == FAILURE_THRESHOLD, "open circuit skipped"
+
+        await asyncio.sleep(0.06)
+        live.fail, live.speak_after = False, 0.05
+        results = await asyncio.gather(*(router.narrate("p") for _ in range(5)))
+        assert live.calls == FAILURE_THRESHOLD + 1, f"one half-open probe expected, got {live.calls - FAILURE_THRESHOLD}"
+        assert [result.backend for result in results].count("live") == 1
+        assert router.health["live"].state is CircuitState.CLOSED
+
+    async def hedging() -> None:
+        # primary speaks after the hedge started but finishes after it: the primary must not be cut off
+        live, text = ScriptedBackend("live", speak_after=0.05, finish_after=0.2), ScriptedBackend("text", 0.1)
+        router = BackendRouter([live, text], hedge_after=0.02)
+        result = await router.narrate("p")
+        assert result.backend == "live" and result.hedged and text.cancelled == 1 and live.cancelled == 0
+
+        # primary stays silent: the hedge speaks first and the primary is cancelled
+        live, text = ScriptedBackend("live", speak_after=1.0), ScriptedBackend("text", 0.05)
+        router = BackendRouter([live, text], hedge_after=0.02)
+        result = await router.narrate("p")
+        assert result.backend == "text" and router.hedge_wins == 1 and live.cancelled == 1
+
+        # primary fails before the deadline: the hedge starts at once
+        live, text = ScriptedBackend("live", fail=True), ScriptedBackend("text")
+        router = BackendRouter([live, text], hedge_after=1.0)
+        started = time.monotonic()
+        assert (await router.narrate("p")).backend == "text" and time.monotonic() - started < 0.5
+
+    def probe_ownership() -> None:
+        # an attempt begun while the circuit was closed ends during the half-open probe: the probe stays exclusive
+        health = BackendHealth(cooldown=0.0)
+        straggler = health.begin_attempt()
+        for _ in range(FAILURE_THRESHOLD):
+            health.record_failure()
+        assert health.available() and health.state is CircuitState.HALF_OPEN
+        probe = health.begin_attempt()
+        assert probe and not straggler
+        health.end_attempt(straggler)
+        assert not health.available(), "a non-probe attempt released the probe"
+        health.end_attempt(probe)
+        assert health.available()
+
+    probe_ownership()
+    asyncio.run(circuit_breaker())
+    asyncio.run(hedging())
+    print("🔀 circuit breaker and hedging behave")
@@ -2,126 +2,290 @@ import asyncio
 import atexit
 import json
 import os
-from asyncio import Queue
-from collections import deque
-from typing import AsyncGenerator, Deque
+from contextvars import ContextVar
+from typing import AsyncGenerator, Dict, Optional
 import time
 
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event
-from google.adk.models.lite_llm import LiteLlm
-from google.genai import Client  # Gemini SDK
-from google.genai.types import Content, Part, LiveConnectConfig, Modality, ProactivityConfig
+from google.genai.types import LiveConnectConfig, Modality, ProactivityConfig
 from loguru import logger
 from pydantic import PrivateAttr
 
+from commentator_agent.backends import BackendRouter, CallableBackend, LiteLlmBackend
+from commentator_agent.context import NarrationContext, estimate_tokens
+from commentator_agent.dedup import NarrationDeduplicator
+from commentator_agent.event_channel import PriorityEventChannel, is_run_complete, is_urgent_alert
+from commentator_agent.listen_server import CommentaryStreamServer, LISTEN_PORT
+from commentator_agent.journal import EventJournal, EVENT_JOURNAL_DIR
+from commentator_agent.live_session import LiveSessionManager
+from commentator_agent.publisher import EventPublisher
+from commentator_agent.narration_cache import NarrationCache, CachedNarration, cache_key
+from commentator_agent.routing import FairNarrationGate, SessionEventRouter, DEFAULT_SESSION
+from commentator_agent.scheduler import CoalescingScheduler
+from commentator_agent.supersede import SupersedePolicy, Superseder, SUPERSEDE_THRESHOLD
+from commentator_agent.transcript import TranscriptStream, PCM_BYTES_PER_SECOND
 # For playing audio data
 from utils.audio_player import CallbackAudioPlayer
-
-# Global audio player instance
-_audio_player = CallbackAudioPlayer()
-atexit.register(_audio_player.stop)
+from utils.jitter_buffer import JitterBufferConfig
+from utils.lazy_llm import lazy_lite_llm
+
+# Global audio player instance, created on first narration so imports and text-only runs never open a device
+_audio_player: Optional[CallbackAudioPlayer] = None
+
+
+def _get_audio_player() -> CallbackAudioPlayer:
+    """
+    The shared player: jitter-buffered so bursty Live audio plays without
+    mid-sentence gaps, loudness-matched and faded at the edges of each narration
+    ($AUDIO_OUTPUT_RATE sets the output rate).
+    """
+    global _audio_player
+    if _audio_player is None:
+        from utils.audio_dsp import AudioProcessor  # NumPy is only needed once audio plays
+        _audio_player = CallbackAudioPlayer(jitter=JitterBufferConfig(), processor=AudioProcessor())
+        _audio_player.start()
+        atexit.register(_audio_player.stop)
+    return _audio_player
 
 MAX_EVENTS = 50  # sliding window size
 # GEMINI_LIVE_MODEL = "gemini-2.5-flash-preview-native-audio-dialog"  # gemini-live-2.5-flash-preview or gemini-2.5-flash-preview-native-audio-dialog
 GEMINI_LIVE_MODEL = "gemini-live-2.5-flash-preview"
 # GEMINI_LIVE_MODEL = "gemini-2.5-flash-exp-native-audio-thinking-dialog"
-FALLBACK_MODEL = LiteLlm(model="openai/gpt-4o")  # any OpenAI model
-
-# Global queue for receiving tool events from callbacks
-commentator_queue = Queue()
+FALLBACK_MODEL_NAME = "openai/gpt-4o"  # any OpenAI model
+FALLBACK_MODEL = lazy_lite_llm(FALLBACK_MODEL_NAME)
+HEDGE_AFTER_S = 5.0  # start the fallback if Live has produced nothing by then
+IDLE_TIMEOUT_S = 300.0  # safety net if the observed agent never sends its end-of-run sentinel
+CACHED_FEED_POLL_S = 0.1  # how often a cached narration waiting for room in the player checks again
+
+# Global router for receiving tool events from callbacks, one bounded priority channel per session
+commentator_queue = SessionEventRouter()
+# What the callbacks publish through: safe from worker threads and other event loops
+event_publisher = EventPublisher(commentator_queue)
+# Optional record of every published event, for offline replay (python -m commentator_agent.journal replay)
+event_journal: Optional[EventJournal] = None
+if EVENT_JOURNAL_DIR:
+    event_journal = EventJournal(EVENT_JOURNAL_DIR)
+    event_publisher.taps.append(event_journal.append)
+    atexit.register(event_journal.close)
+
+
+def _live_connect_config() -> LiveConnectConfig:
+    # Enable audio transcription to get text alongside audio
+    return LiveConnectConfig(
+        response_modalities=[Modality.AUDIO],
+        temperature=1.0,
+        # enable_affective_dialog=True,  # detect emotions and adapt its responses accordingly
+        # proactivity=ProactivityConfig(proactive_audio=True),
+        output_audio_transcription={}  # ← Add this to get transcription
+    )
+
+
+class CommentarySession:
+    """Everything one observed run needs its own copy of."""
+
+    def __init__(self, session_id: str, channel: PriorityEventChannel, superseder: Superseder):
+        self.session_id = session_id
+        self.channel = channel
+        self.context = NarrationContext(max_events=MAX_EVENTS)
+        self.event_count = 0
+        self.start_time = time.time()
+        # one long-lived Live connection, each narration is a new turn on it
+        self.live_session = LiveSessionManager(GEMINI_LIVE_MODEL, _live_connect_config())
+        # coalesces bursts of events into one narration per window
+        self.scheduler = CoalescingScheduler(channel)
+        # "latest wins": newer windows may cancel a narration that is still streaming
+        self.superseder = superseder
+        # skips windows that would only repeat what was just narrated
+        self.dedup = NarrationDeduplicator()
+        self.narration_task: Optional[asyncio.Task] = None
+        self.narration_id = 0
+        self.persona = ""  # commentary style of the prompt being narrated
+        self.urgent = False  # the narration being started reacts to a critical alert
+        self.segment_id: Optional[int] = None  # audio player segment of the narration being streamed
+
+
+# The session whose narration is running; backends read it to reach per-session state
+_active_session: ContextVar[CommentarySession] = ContextVar("active_commentary_session")
 
 
 class LiveCommentator(BaseAgent):
     """Streams narrated commentary for every observed event."""
 
     # declare private attribute so Pydantic knows about it
-    _buffer: Deque[str] = PrivateAttr(default_factory=lambda: deque(maxlen=MAX_EVENTS))
-    _commentary_history: Deque[str] = PrivateAttr(
-        default_factory=lambda: deque(maxlen=50))  # Remember last 10 commentaries
-    _event_count: int = PrivateAttr(default=0)
-    _session_start_time: float = PrivateAttr(default_factory=time.time)
-
-    def __init__(self, name: str = "Commentator"):
+    _sessions: Dict[str, CommentarySession] = PrivateAttr(default_factory=dict)
+    _supersede_policy: SupersedePolicy = PrivateAttr(default=SupersedePolicy.ON_THRESHOLD)
+    _supersede_threshold: int = PrivateAttr(default=SUPERSEDE_THRESHOLD)
+    # shares narration slots fairly between concurrently observed sessions
+    _gate: FairNarrationGate = PrivateAttr(default_factory=FairNarrationGate)
+    # picks Live or the text fallback per narration, tracking latency and health
+    _router: Optional[BackendRouter] = PrivateAttr(default=None)
+    # partial commentary text, published as it streams in
+    _transcript: TranscriptStream = PrivateAttr(default_factory=TranscriptStream)
+    # replays identical narrations from disk instead of regenerating them
+    _cache: NarrationCache = PrivateAttr(default_factory=NarrationCache)
+    # fans narration audio out to local listeners when COMMENTARY_STREAM_PORT is set
+    _listen_server: Optional[CommentaryStreamServer] = PrivateAttr(default=None)
+
+    def __init__(
+            self,
+            name: str = "Commentator",
+            supersede_policy: SupersedePolicy = SupersedePolicy.ON_THRESHOLD,
+            supersede_threshold: int = SUPERSEDE_THRESHOLD
+    ):
         # let BaseAgent/Pydantic finish their own __init__ first
         super().__init__(name=name, sub_agents=[])
-        _audio_player.start()
+        self._supersede_policy = SupersedePolicy(supersede_policy)
+        self._supersede_threshold = supersede_threshold
+        self._router = BackendRouter(
+            [
+                CallableBackend("gemini_live", self._stream_gemini_live),
+                LiteLlmBackend(FALLBACK_MODEL_NAME, on_text=self._publish_fallback_text)
+            ],
+            hedge_after=HEDGE_AFTER_S
+        )
+
+    @property
+    def transcript(self) -> TranscriptStream:
+        """Subscribe here for commentary text as it streams, timestamped for audio alignment."""
+        return self._transcript
+
+    def _publish_fallback_text(self, text: str) -> None:
+        session = _active_session.get()
+        self._transcript.publish(session.narration_id, FALLBACK_MODEL_NAME, text, session_id=session.session_id)
+
+    async def _play_cached(self, session: CommentarySession, cached: CachedNarration,
+                           first_output: Optional[asyncio.Event]) -> str:
+        """Stream a cached narration into the audio player, read off the loop and fed as it has room."""
+        player = _get_audio_player()
+        chunks = cached.iter_audio()
+        read: Optional[asyncio.Future] = None
+        try:
+            while True:
+                read = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+                chunk = await asyncio.shield(read)  # cancelling us must not abandon the read mid-file
+                if chunk is None:
+                    break
+                # hand audio over no faster than it plays, so none of it overflows the ring buffer
+                while player.is_running and not player.has_room(len(chunk)):
+                    await asyncio.sleep(CACHED_FEED_POLL_S)
+                self._play_audio_chunk(chunk, session.segment_id)
+                if first_output is not None:
+                    first_output.set()
+        finally:
+            if read is not None and not read.done():
+                read.add_done_callback(lambda _: chunks.close())  # the reader thread still holds the file
+            else:
+                chunks.close()
+        self._transcript.publish(session.narration_id, "narration_cache", cached.transcription,
+                                 audio_offset_s=0.0, session_id=session.session_id)
+        logger.debug(f"💾 Narration cache hit | {self._cache.describe()}")
+        return cached.transcription
+
+    async def _stream_gemini_live(self, text: str, first_output: Optional[asyncio.Event] = None) -> str:
+        session = _active_session.get()
+        player = _get_audio_player()
+        # urgent narrations pre-empt whatever commentary is still queued for playback
+        segment_id = session.segment_id = player.begin_segment(session.narration_id, urgent=session.urgent)
+        try:
+            return await self._stream_live_turn(session, text, first_output)
+        except asyncio.CancelledError:
+            player.flush(segment_id)  # superseded: stop the stale audio too, not just the stream
+            raise
+        finally:
+            playback = player.end_segment(segment_id)
+            if playback is not None:
+                logger.debug(
+                    f"🔊 Narration {playback.narration_id} playback: pre-roll {playback.preroll_ms:.0f}ms "
+                    f"(jitter {playback.jitter_ms:.0f}ms), startup wait {playback.startup_wait_ms:.0f}ms, "
+                    f"{playback.underruns} underruns ({playback.rebuffer_ms:.0f}ms rebuffering), "
+                    f"{playback.overruns} overruns over {playback.chunks} chunks"
+                )
+
+    async def _stream_live_turn(self, session: CommentarySession, text: str,
+                                first_output: Optional[asyncio.Event]) -> str:
+        key = cache_key(text, GEMINI_LIVE_MODEL, session.persona)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return await self._play_cached(session, cached, first_output)
 
-    async def _stream_gemini_live(self, text: str) -> None:
         try:
-            client = Client(api_key=os.getenv("GOOGLE_API_KEY"))
-
-            # Enable audio transcription to get text alongside audio
-            config = LiveConnectConfig(
-                response_modalities=[Modality.AUDIO],
-                temperature=1.0,
-                # enable_affective_dialog=True,  # detect emotions and adapt its responses accordingly
-                # proactivity=ProactivityConfig(proactive_audio=True),
-                output_audio_transcription={}  # ← Add this to get transcription
+            logger.debug("🎤 Listening for Gemini Live audio response...")
+            turn_started = time.monotonic()
+
+            audio_received = False
+            transcription_received = False
+            accumulated_transcription = ""
+            audio_bytes = 0
+            recorded_audio = bytearray()
+
+            async for response in session.live_session.send_turn(text):
+                if hasattr(response, 'server_content') and response.server_content:
+                    server_content = response.server_content
+
+                    # Handle model turn (contains audio and other content)
+                    if hasattr(server_content, 'model_turn') and server_content.model_turn:
+                        model_turn = server_content.model_turn
+                        if hasattr(model_turn, 'parts') and model_turn.parts:
+                            for part in model_turn.parts:
+                                if hasattr(part, 'inline_data') and part.inline_data:
+                                    audio_data = part.inline_data.data
+                                    audio_received = True
+                                    audio_bytes += len(audio_data)
+                                    recorded_audio += audio_data
+                                    if first_output is not None:
+                                        first_output.set()
+                                    # logger.debug(f"🔊 AUDIO RECEIVED: {len(audio_data)} bytes!")
+                                    try:
+                                        self._play_audio_chunk(audio_data, session.segment_id)
+                                    except Exception as e:
+                                        logger.error(f"Audio playback error: {e}")
+                                        raise
+
+                    # Handle transcription (NEW)
+                    if hasattr(server_content, 'output_transcription') and server_content.output_transcription:
+                        transcription_text = server_content.output_transcription.text
+                        transcription_received = True
+                        accumulated_transcription += transcription_text
+                        self._transcript.publish(session.narration_id, "gemini_live", transcription_text,
+                                                 audio_offset_s=audio_bytes / PCM_BYTES_PER_SECOND,
+                                                 session_id=session.session_id)
+                        # logger.debug(f"📝 Transcription: {transcription_text}")
+
+            if accumulated_transcription.strip():
+                logger.debug(f"📝 Complete Transcription: {accumulated_transcription.strip()}")
+
+            if audio_received:
+                print("✅ Gemini Live audio response received successfully!")
+            if transcription_received:
+                print("✅ Audio transcription received!")
+
+            stats = session.live_session.stats
+            logger.debug(
+                f"🔌 Live turn took {time.monotonic() - turn_started:.2f}s, "
+                f"session reuse saved {stats.last_turn_saved_s:.2f}s "
+                f"({stats.total_saved_s:.2f}s over {stats.reused_turns} reused turns)"
             )
-
-            async with client.aio.live.connect(model=GEMINI_LIVE_MODEL, config=config) as session:
-                await session.send_client_content(
-                    turns=Content(role="user", parts=[Part(text=text)])
-                )
-                logger.debug("🎤 Listening for Gemini Live audio response...")
-
-                audio_received = False
-                transcription_received = False
-                accumulated_transcription = ""
-
-                async for response in session.receive():
-                    if hasattr(response, 'server_content') and response.server_content:
-                        server_content = response.server_content
-
-                        # Handle model turn (contains audio and other content)
-                        if hasattr(server_content, 'model_turn') and server_content.model_turn:
-                            model_turn = server_content.model_turn
-                            if hasattr(model_turn, 'parts') and model_turn.parts:
-                                for part in model_turn.parts:
-                                    if hasattr(part, 'inline_data') and part.inline_data:
-                                        audio_data = part.inline_data.data
-                                        audio_received = True
-                                        # logger.debug(f"🔊 AUDIO RECEIVED: {len(audio_data)} bytes!")
-                                        try:
-                                            self._play_audio_chunk(audio_data)
-                                        except Exception as e:
-                                            logger.error(f"Audio playback error: {e}")
-                                            raise
-
-                        # Handle transcription (NEW)
-                        if hasattr(server_content, 'output_transcription') and server_content.output_transcription:
-                            transcription_text = server_content.output_transcription.text
-                            transcription_received = True
-                            accumulated_transcription += transcription_text
-                            # logger.debug(f"📝 Transcription: {transcription_text}")
-
-                # Display transcription as commentary text
-                if accumulated_transcription.strip():
-                    logger.debug(f"📝 Complete Transcription: {accumulated_transcription.strip()}")
-                    print(f"\n🎙️ LIVE COMMENTARY: {accumulated_transcription.strip()}\n")
-                    self._commentary_history.append(accumulated_transcription.strip())
-
-                if audio_received:
-                    print("✅ Gemini Live audio response received successfully!")
-                if transcription_received:
-                    print("✅ Audio transcription received!")
+            self._cache.put(key, bytes(recorded_audio), accumulated_transcription.strip(),
+                            GEMINI_LIVE_MODEL, session.persona)
+            return accumulated_transcription.strip()
 
         except Exception as e:
             print(f"An error occurred streaming Gemini Live: {e}")
             raise
 
-    @staticmethod
-    def _play_audio_chunk(audio_bytes: bytes):
-        """Play audio chunk through speakers using PyAudio."""
+    def _play_audio_chunk(self, audio_bytes: bytes, segment_id: Optional[int] = None):
+        """Queue an audio chunk of a narration segment for playback and remote listeners."""
+        if self._listen_server is not None:
+            self._listen_server.publish(audio_bytes)
         try:
-            _audio_player.add_chunk(audio_bytes)
+            _get_audio_player().add_chunk(audio_bytes, segment_id)
             # logger.debug(f"🔊 AUDIO BUFFERED: {len(audio_bytes)} bytes!")
         except Exception as e:
             logger.error(f"Audio playback failed: {e}")
 
-    def _get_commentary_style(self) -> str:
+    def _get_commentary_style(self, session: CommentarySession) -> str:
         """Rotate between different commentary styles."""
         styles = [
             # <---- ENTERTAINING COMMENTARY PERSONAS ---->
@@ -139,7 +303,7 @@ class LiveCommentator(BaseAgent):
         ]
 
         # Rotate based on event count
-        style_index = (self._event_count - 1) % len(styles)
+        style_index = (session.event_count - 1) % len(styles)
         return styles[style_index]
 
     # def _generate_commentary_prompt(self, narration: str) -> str:
@@ -188,17 +352,28 @@ class LiveCommentator(BaseAgent):
     #
     #     return base_prompt
 
-    def _generate_commentary_prompt(self, narration: str) -> str:
+    @staticmethod
+    def _record_commentary(session: CommentarySession, commentary: str) -> None:
+        if session.dedup.record_commentary(commentary):
+            logger.debug("🔁 Commentary repeated a recent one, not adding it to the prompt history")
+            return
+        session.context.add_commentary(commentary)
+
+    def _generate_commentary_prompt(self, session: CommentarySession) -> str:
         """Generate a varied, contextual prompt for commentary."""
 
-        style = self._get_commentary_style()
-        recent_commentary = list(self._commentary_history)[-100:] if self._commentary_history else []
-        session_duration = time.time() - self._session_start_time
+        style = self._get_commentary_style(session)
+        session.persona = style
+        recent_commentary = session.context.commentary_text()
+        session_duration = time.time() - session.start_time
 
         base_prompt = f"""You are a high-energy expert crisis response analyst providing {style} commentary on emergency AI systems.
 
         CURRENT INTELLIGENCE DATA:
-        {narration}
+        {session.context.events_text()}
+
+        ACTIVITY SO FAR:
+        {session.context.aggregates_text()}
 
         PRIMARY FOCUS - Analyze the DATA and DISCOVERIES:
         • What specific information is each tool revealing?
@@ -225,123 +400,159 @@ class LiveCommentator(BaseAgent):
         ❌ AVOID: Repetitive agent transfers
         ❌ AVOID: Meta-commentary about the commentary process
 
-        Recent topics covered: {', '.join(recent_commentary) if recent_commentary else 'This is the first analysis'}
+        Recent topics covered: {recent_commentary or 'This is the first analysis'}
 
-        Event #{self._event_count} | Duration: {session_duration:.1f}s | Style: {style}
+        Event #{session.event_count} | Duration: {session_duration:.1f}s | Style: {style}
 
         Provide 100-150 words of sharp analysis focusing on the intelligence and discoveries."""
 
         return base_prompt
 
-    async def _narrate(self) -> None:
+    async def _narrate(self, session: CommentarySession) -> None:
         """Stream recent events to Gemini Live for narration."""
-        logger.debug(f"🎯 _narrate() called with buffer size: {len(self._buffer)}")  # DEBUG
+        logger.debug(f"🎯 _narrate() called with buffer size: {len(session.context)}")  # DEBUG
 
-        if len(self._buffer) == 0:
+        if len(session.context) == 0:
             logger.debug("🎯 Buffer is empty, skipping narration")
             return
 
-        narration = "\n".join(list(self._buffer)[-100:])
-        logger.debug(f"🎯 Narration content (first 100 chars): {narration[:100]}...")
-
-        # Get more context than just last 5 events
-        recent_events = list(self._buffer)[-100:]  # More context
-        narration = "\n".join(recent_events)
+        session.narration_id += 1
 
-        # Generate contextual prompt
-        prompt = self._generate_commentary_prompt(narration)
+        # Event lines are encoded at enqueue time and kept under budget, so this is cheap
+        prompt = self._generate_commentary_prompt(session)
 
-        logger.debug(f"🎯 Generated prompt (first 150 chars): {prompt[:150]}...")
+        logger.debug(f"🎯 Generated prompt (~{estimate_tokens(prompt)} tokens, "
+                     f"first 150 chars): {prompt[:150]}...")
 
         try:
-            logger.debug("🎯 Attempting Gemini Live...")
-            await self._stream_gemini_live(prompt)
-            logger.debug("🎯 Gemini Live succeeded!")
+            async with self._gate.slot(session.session_id):
+                result = await self._router.narrate(prompt)
         except Exception as e:
-            logger.error(f"Gemini Live failed, using fallback: {e}")
+            logger.error(f"Narration failed on every backend: {e}")
+            return
+
+        logger.debug(f"🔀 Narrated by {result.backend} (first output {result.first_output_s:.2f}s, "
+                     f"total {result.total_s:.2f}s, hedged={result.hedged}) | {self._router.describe()}")
+        if result.text:
+            self._transcript.publish(session.narration_id, result.backend, result.text, final=True,
+                                     session_id=session.session_id)
+            # Display transcription as commentary text
+            label = "" if result.backend == "gemini_live" else " (Fallback)"
+            print(f"\n🎙️ LIVE COMMENTARY{label}: {result.text}\n")
+            self._record_commentary(session, result.text)
+
+    async def _timed_narrate(self, session: CommentarySession) -> None:
+        _active_session.set(session)  # local to this task and the backend tasks it spawns
+        started = time.monotonic()
+        await self._narrate(session)
+        session.superseder.stats.completed += 1
+        session.scheduler.record_narration_latency(time.monotonic() - started)
+
+    @staticmethod
+    async def _supersede_or_wait(session: CommentarySession, new_events: int, urgent: bool = False) -> None:
+        """Cancel or finish the in-flight narration before starting a newer one."""
+        task = session.narration_task
+        if task is None or task.done():
+            return
+        if urgent or session.superseder.should_supersede(new_events):
+            logger.debug(f"🎯 {new_events} new events{' with a critical alert' if urgent else ''}, "
+                         f"superseding in-flight narration")
+            task.cancel()
             try:
-                # Use LiteLLM correctly through ADK's interface
-                logger.debug("🎯 Attempting LiteLLM fallback...")
-                import litellm
-                response = await litellm.acompletion(
-                    model="openai/gpt-4o",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                commentary = response.choices[0].message.content
-                self._commentary_history.append(commentary)
-                print(f"\n🎙️ LIVE COMMENTARY (Fallback): {commentary}\n")
-            except Exception as fallback_error:
-                logger.error(f"Fallback also failed: {fallback_error}")
+                await task
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise  # we are being cancelled ourselves
+                session.superseder.record_superseded(new_events)
+        else:
+            await task
+
+    def _open_session(self, ctx: InvocationContext) -> CommentarySession:
+        session_id = getattr(getattr(ctx, "session", None), "id", None) or ctx.invocation_id or DEFAULT_SESSION
+        session = CommentarySession(
+            session_id,
+            commentator_queue.channel(session_id),
+            Superseder(self._supersede_policy, self._supersede_threshold)
+        )
+        self._sessions[session_id] = session
+        return session
+
+    async def _close_session(self, session: CommentarySession) -> None:
+        if session.narration_task is not None:
+            await session.narration_task
+        await session.live_session.close()
+        self._sessions.pop(session.session_id, None)
+        commentator_queue.release(session.session_id)
 
     async def _run_async_impl(
             self, ctx: InvocationContext
     ) -> AsyncGenerator[Event, None]:
-        timeout_count = 0
-        max_timeouts = 5  # Stop after 5 consecutive timeouts
+        # Commentary goes to speakers and the transcript stream, not into session
+        # history, so this generator yields nothing (no heartbeat events).
+        event_publisher.bind(asyncio.get_running_loop())
+        session = self._open_session(ctx)
+        logger.debug(f"🎯 Commentator starting for session {session.session_id}, "
+                     f"queue size: {session.channel.qsize()}")
+
+        # The run is over once every agent we run alongside has sent its end-of-run sentinel
+        siblings = {agent.name for agent in getattr(self.parent_agent, "sub_agents", []) if agent is not self}
+        finished_agents = set()
+
+        if LISTEN_PORT and self._listen_server is None:
+            self._listen_server = CommentaryStreamServer()
+            try:
+                await self._listen_server.start()
+            except OSError as e:
+                logger.warning(f"Could not start commentary audio stream: {e}")
+                self._listen_server = None
 
-        logger.debug(f"🎯 Commentator starting, queue size: {commentator_queue.qsize()}")
+        # Pre-warm the Live connection while the observed agents get going
+        try:
+            await session.live_session.start()
+        except Exception as e:
+            logger.warning(f"Could not pre-warm Gemini Live session: {e}")
 
-        while timeout_count < max_timeouts:
+        while True:
             try:
-                logger.debug(f"🎯 Waiting for event from queue (timeout {timeout_count}/{max_timeouts})...")
-                event = await asyncio.wait_for(commentator_queue.get(), timeout=3.0)
-                timeout_count = 0  # Reset on successful event
-                # self._buffer.append(json.dumps(event))
-                self._buffer.append(str(event))
-                logger.debug(f"🎯 Buffer now has {len(self._buffer)} events, calling _narrate()")
-                await self._narrate()
-                yield Event(author=self.name)
+                batch = await session.scheduler.next_batch(timeout=IDLE_TIMEOUT_S)
             except asyncio.TimeoutError:
-                logger.debug(f"🎯 Queue timeout #{timeout_count + 1}")
-                timeout_count += 1
-                if timeout_count < max_timeouts:
-                    yield Event(author=self.name)  # Heartbeat
-
-        print("Commentator finished - no more events detected")
-
-    # async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
-    #     timeout_count = 0
-    #     max_timeouts = 5
-    #     batch_timeout = 3.0  # Wait up to 3 seconds for event batching
-    #
-    #     logger.debug(f"🎯 Commentator starting, queue size: {commentator_queue.qsize()}")
-    #
-    #     while timeout_count < max_timeouts:
-    #         try:
-    #             # Collect the first event
-    #             logger.debug(
-    #                 f"🎯 Waiting for event from queue (timeout {timeout_count}/{max_timeouts})...")
-    #             event = await asyncio.wait_for(commentator_queue.get(), timeout=5.0)
-    #
-    #             self._event_count += 1
-    #             self._buffer.append(json.dumps(event))
-    #             self._buffer.append(str(event))
-    #
-    #             # Try to collect additional events within the batch timeout
-    #             batch_start = time.time()
-    #             while (time.time() - batch_start) < batch_timeout:
-    #                 try:
-    #                     additional_event = await asyncio.wait_for(
-    #                         commentator_queue.get(),
-    #                         timeout=1.5  # Short timeout for batching
-    #                     )
-    #                     self._event_count += 1
-    #                     # self._buffer.append(json.dumps(additional_event))
-    #                     self._buffer.append(str(additional_event))
-    #                     logger.debug(
-    #                         f"🎯 Batched additional event, buffer size: {len(self._buffer)}")
-    #                 except asyncio.TimeoutError:
-    #                     break  # No more events to batch
-    #
-    #             timeout_count = 0
-    #             logger.debug(f"🎯 Buffer now has {len(self._buffer)} events, calling _narrate()")
-    #             await self._narrate()
-    #             yield Event(author=self.name)
-    #
-    #         except asyncio.TimeoutError:
-    #             logger.debug(f"🎯 Queue timeout #{timeout_count + 1}")
-    #             timeout_count += 1
-    #             if timeout_count < max_timeouts:
-    #                 yield Event(author=self.name)
-    #
-    #     print("Commentator finished - no more events detected")
+                logger.warning(f"🎯 No events for {IDLE_TIMEOUT_S:.0f}s and no end-of-run signal, stopping")
+                break
+
+            events = [event for event in batch if not is_run_complete(event)]
+            finished_agents.update(event.agent for event in batch if is_run_complete(event))
+            finished = bool(finished_agents) and siblings <= finished_agents
+            if finished:
+                # drain whatever is still queued into one final narration
+                while not session.channel.empty():
+                    event = session.channel.get_nowait()
+                    if not is_run_complete(event):
+                        events.append(event)
+
+            if events:
+                window = "\n".join(session.context.add_event(event) for event in events)
+                session.event_count += len(events)
+                if session.dedup.should_skip_window(window) and not finished:
+                    logger.debug(f"🔁 Skipping near-duplicate window ({session.dedup.summary()})")
+                    continue
+                logger.debug(f"🎯 Buffer now has {len(session.context)} events, calling _narrate()")
+                urgent = any(is_urgent_alert(event) for event in events)
+                await self._supersede_or_wait(session, len(events), urgent)
+                session.urgent = urgent
+                session.superseder.stats.started += 1
+                session.narration_task = asyncio.create_task(self._timed_narrate(session))
+
+            if finished:
+                logger.debug(f"🏁 Observed run finished ({', '.join(sorted(finished_agents))}), draining")
+                break
+
+        await self._close_session(session)
+        stats = session.superseder.stats
+        logger.debug(f"🎯 Narrations started={stats.started} completed={stats.completed} "
+                     f"superseded={stats.superseded}, dedup {session.dedup.summary()}")
+        logger.debug(f"💾 Narration cache: {self._cache.describe()}")
+        logger.debug(f"📉 Event channel metrics: {session.channel.snapshot()}")
+        logger.debug(f"📮 Publisher enqueue latency: {event_publisher.snapshot()}")
+        print("Commentator finished - observed run complete")
+        return
+        yield  # unreachable, keeps this an async generator
@@ -0,0 +1,160 @@
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Optional, Tuple
+
+from commentator_agent.events import (
+    BroadcastEvent, ReasoningEvent, ToolCallEvent, ToolCompleteEvent, MAX_FIELD_CHARS
+)
+
+EVENT_TOKEN_BUDGET = 900  # tokens of event lines allowed in one prompt
+COMMENTARY_TOKEN_BUDGET = 250  # tokens of past commentary allowed in one prompt
+AGGREGATE_TOKEN_BUDGET = 120  # tokens for the running per-agent/per-tool summary
+TOP_AGGREGATES = 6
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def encode_event(event: Any, session_start: float) -> str:
+    """Render one broadcast event as a single compact line. Records cache their own rendering."""
+    if isinstance(event, BroadcastEvent):
+        return event.render(session_start)
+    return _truncate(str(event), MAX_FIELD_CHARS * 2)
+
+
+class _BudgetedLines:
+    """
+    Sliding window of lines whose total token estimate stays under a budget.
+
+    ``append`` is amortised O(1) and never touches the joined text. ``text``
+    returns the cached string when nothing changed; otherwise it joins only
+    the lines appended since it last ran and concatenates them onto what is
+    left of the cached string, which is still one O(window) copy per call,
+    but no longer a walk and re-join over every line in the window.
+    """
+
+    def __init__(self, budget: int, max_lines: Optional[int] = None, separator: str = "\n"):
+        self.budget = budget
+        self.max_lines = max_lines
+        self.separator = separator
+        self._lines: Deque[Tuple[str, int]] = deque()
+        self._tokens = 0
+        self._text = ""  # the joined lines as of the last text(), evicted ones possibly still at its head
+        self._joined = 0  # lines of the window that are in _text
+        self._head = 0  # characters at the start of _text that belong to evicted lines
+        self._new: Deque[str] = deque()  # lines appended since the last text()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    def append(self, line: str) -> None:
+        # a single line may never blow the whole budget on its own
+        line = _truncate(line, self.budget * 4)
+        cost = estimate_tokens(line) + 1  # + newline
+        self._lines.append((line, cost))
+        self._new.append(line)
+        self._tokens += cost
+        # amortised O(1): every line is evicted at most once
+        while self._lines and (self._tokens > self.budget or
+                               (self.max_lines is not None and len(self._lines) > self.max_lines)):
+            evicted_line, evicted = self._lines.popleft()
+            self._tokens -= evicted
+            if self._joined:
+                self._joined -= 1
+                self._head += len(evicted_line) + len(self.separator)
+            else:
+                self._new.popleft()
+
+    def text(self) -> str:
+        if self._new or self._head:
+            kept = self._text[self._head:] if self._joined else ""
+            fresh = self.separator.join(self._new)
+            self._text = kept + self.separator + fresh if kept and fresh else kept or fresh
+            self._joined += len(self._new)
+            self._head = 0
+            self._new.clear()
+        return self._text
+
+
+class NarrationContext:
+    """
+    Incrementally maintained narration context.
+
+    Each event is encoded once when it is added, per-agent and per-tool
+    aggregates are kept as running counters, and the event and commentary
+    sections are trimmed to their token budgets as they grow, so building a
+    prompt only costs work proportional to what changed since the last one.
+    """
+
+    def __init__(
+            self,
+            event_budget: int = EVENT_TOKEN_BUDGET,
+            commentary_budget: int = COMMENTARY_TOKEN_BUDGET,
+            max_events: Optional[int] = None,
+            session_start: Optional[float] = None
+    ):
+        self.session_start = session_start if session_start is not None else time.time()
+        self.agent_counts: Counter = Counter()
+        self.tool_counts: Counter = Counter()
+        self.tool_completions: Counter = Counter()
+        self.reasoning_counts: Counter = Counter()
+        self.total_events = 0
+        self._events = _BudgetedLines(event_budget, max_events)
+        self._commentary = _BudgetedLines(commentary_budget, separator=" | ")
+        self._aggregates_text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def token_budget(self) -> int:
+        """Upper bound on the tokens the dynamic sections can add to a prompt."""
+        return self._events.budget + self._commentary.budget + AGGREGATE_TOKEN_BUDGET
+
+    def add_event(self, event: Any) -> str:
+        line = encode_event(event, self.session_start)
+        self._events.append(line)
+        self.total_events += 1
+
+        if isinstance(event, BroadcastEvent):
+            self.agent_counts[event.agent] += 1
+            if isinstance(event, ReasoningEvent):
+                self.reasoning_counts[event.agent] += 1
+            elif isinstance(event, ToolCompleteEvent):
+                self.tool_completions[event.tool] += 1
+            elif isinstance(event, ToolCallEvent):
+                self.tool_counts[event.tool] += 1
+        self._aggregates_text = None
+        return line
+
+    def add_commentary(self, text: str) -> None:
+        self._commentary.append(" ".join(text.split()))
+
+    def events_text(self) -> str:
+        return self._events.text()
+
+    def commentary_text(self) -> str:
+        return self._commentary.text()
+
+    def aggregates_text(self) -> str:
+        if self._aggregates_text is None:
+            agents = ", ".join(f"{name} x{count}" for name, count in self.agent_counts.most_common(TOP_AGGREGATES))
+            tools = ", ".join(f"{name} x{count}" for name, count in self.tool_counts.most_common(TOP_AGGREGATES))
+            completed = sum(self.tool_completions.values())
+            reasoning = sum(self.reasoning_counts.values())
+            self._aggregates_text = _truncate(
+                f"{self.total_events} events | agents: {agents or 'none'} | "
+                f"tool calls: {tools or 'none'} | {completed} tool results | {reasoning} reasoning steps",
+                AGGREGATE_TOKEN_BUDGET * 4
+            )
+        return self._aggregates_text
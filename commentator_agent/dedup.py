@@ -0,0 +1,134 @@
+import operator
+import random
+import re
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Iterable, Tuple
+
+NUM_PERMUTATIONS = 32
+SHINGLE_SIZE = 3  # words per shingle
+SIMILARITY_THRESHOLD = 0.8  # estimated Jaccard similarity counted as a near-duplicate
+INDEX_CAPACITY = 32  # recent signatures kept for comparison
+
+_WORD_RE = re.compile(r"[a-z_]+")
+
+Signature = Tuple[int, ...]
+
+
+@dataclass
+class SimilarityStats:
+    """Lookup and near-duplicate hit counters for a SimilarityIndex."""
+    lookups: int = 0
+    hits: int = 0
+    last_similarity: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class SimilarityIndex:
+    """
+    MinHash index over the most recent texts.
+
+    Text is normalised to lowercase words (numbers, timestamps and ids are
+    dropped so they do not make repeats look fresh), split into word
+    shingles and reduced to a fixed-size MinHash signature. Comparing two
+    signatures estimates their Jaccard similarity without touching the text.
+    """
+
+    def __init__(
+            self,
+            threshold: float = SIMILARITY_THRESHOLD,
+            num_perm: int = NUM_PERMUTATIONS,
+            shingle_size: int = SHINGLE_SIZE,
+            capacity: int = INDEX_CAPACITY,
+            seed: int = 1
+    ):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.stats = SimilarityStats()
+        rng = random.Random(seed)
+        # XOR with a random mask stands in for a hash permutation; much cheaper
+        # than (a * x + b) % p in pure Python and accurate enough for dedup
+        self._masks = [rng.getrandbits(32) for _ in range(num_perm)]
+        self._signatures: Deque[Signature] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _shingles(self, text: str) -> Iterable[int]:
+        words = _WORD_RE.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        return {
+            zlib.crc32(" ".join(words[i:i + size]).encode())
+            for i in range(max(len(words) - size + 1, 1))
+        }
+
+    def signature(self, text: str) -> Signature:
+        shingles = self._shingles(text)
+        return tuple(min(shingle ^ mask for shingle in shingles) for mask in self._masks)
+
+    @staticmethod
+    def similarity(left: Signature, right: Signature) -> float:
+        return sum(map(operator.eq, left, right)) / len(left)
+
+    def best_match(self, signature: Signature) -> float:
+        return max((self.similarity(signature, other) for other in self._signatures), default=0.0)
+
+    def add(self, signature: Signature) -> None:
+        self._signatures.append(signature)
+
+    def is_duplicate(self, text: str, record: bool = True) -> bool:
+        """
+        Check ``text`` against the index and count the lookup. The text is
+        added to the index afterwards when ``record`` is set.
+        """
+        signature = self.signature(text)
+        similarity = self.best_match(signature)
+        duplicate = similarity >= self.threshold
+
+        self.stats.lookups += 1
+        self.stats.last_similarity = similarity
+        if duplicate:
+            self.stats.hits += 1
+        if record:
+            self.add(signature)
+        return duplicate
+
+
+class NarrationDeduplicator:
+    """
+    Skips narrating event windows that are near-duplicates of recent ones.
+
+    Skipped events stay in the narration context, so they are merged into the
+    next window that does get narrated. After ``max_consecutive_skips`` the
+    next window is narrated regardless, so a repetitive run never goes silent.
+    Spoken commentary is indexed too, to report how often the model repeats itself.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_consecutive_skips: int = 3):
+        self.windows = SimilarityIndex(threshold=threshold)
+        self.commentary = SimilarityIndex(threshold=threshold)
+        self.max_consecutive_skips = max_consecutive_skips
+        self.skipped = 0
+        self._consecutive_skips = 0
+
+    def should_skip_window(self, window_text: str) -> bool:
+        duplicate = self.windows.is_duplicate(window_text)
+        if duplicate and self._consecutive_skips < self.max_consecutive_skips:
+            self._consecutive_skips += 1
+            self.skipped += 1
+            return True
+        self._consecutive_skips = 0
+        return False
+
+    def record_commentary(self, text: str) -> bool:
+        """Index spoken commentary; returns True if it repeated something recent."""
+        return self.commentary.is_duplicate(text)
+
+    def summary(self) -> str:
+        return (f"window hit rate {self.windows.stats.hit_rate:.0%} "
+                f"({self.skipped} skipped), commentary repeat rate "
+                f"{self.commentary.stats.hit_rate:.0%}")
@@ -0,0 +1,375 @@
+import asyncio
+import atexit
+import json
+import os
+import socket
+import struct
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from commentator_agent.events import BroadcastEvent, event_from_dict
+from commentator_agent.publisher import EventPublisher
+
+EVENT_BUS_ADDRESS = os.getenv("EVENT_BUS_ADDRESS", "")  # unix:<path> or tcp:<host>:<port>; empty runs in-process
+BUS_BUFFER_EVENTS = 10000  # unacknowledged events a producer keeps for resending; beyond that the oldest are lost
+MAX_IN_FLIGHT = 1000  # events sent but not yet acknowledged before the producer stops sending
+BATCH_MAX_EVENTS = 256  # events per frame
+BATCH_DELAY_S = 0.002  # how long a lone event waits for company before it is sent
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+RECONNECT_MIN_S = 0.1
+RECONNECT_MAX_S = 2.0
+FLUSH_TIMEOUT_S = 2.0  # how long a producer waits at exit for the commentator to acknowledge its events
+
+_HEADER = struct.Struct(">I")
+
+
+def _frame(message: Dict[str, Any]) -> bytes:
+    """A length-prefixed JSON message."""
+    payload = json.dumps(message, default=str, separators=(",", ":")).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"frame of {size} bytes exceeds {MAX_FRAME_BYTES}")
+    return json.loads(await reader.readexactly(size))
+
+
+def _parse_address(address: str) -> Tuple[str, Any]:
+    scheme, _, rest = address.partition(":")
+    if scheme == "unix" and rest:
+        return "unix", rest
+    if scheme == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"Event bus address must be unix:<path> or tcp:<host>:<port>, not {address!r}")
+
+
+async def _open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    kind, target = _parse_address(address)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(target)
+    return await asyncio.open_connection(*target)
+
+
+@dataclass
+class BusClientStats:
+    connects: int = 0
+    frames: int = 0
+    sent: int = 0
+    resent: int = 0
+    acked: int = 0
+    dropped: int = 0  # lost to a full buffer while the commentator was unreachable or too slow
+
+
+class EventBusClient:
+    """
+    Producer end of the event bus, for agents whose commentator runs in
+    another process or on another host.
+
+    ``publish`` is the EventPublisher handoff, so it is safe from any thread
+    or event loop and never blocks. Events go into a sequence-numbered
+    outbox owned by the client's own thread and loop, are sent in batched
+    frames, and stay there until the commentator acknowledges them. After a
+    reconnect everything unacknowledged is resent and the commentator drops
+    what it has already seen, so a dropped connection or a restarted
+    commentator loses nothing that was buffered.
+
+    Backpressure: at most ``MAX_IN_FLIGHT`` events are unacknowledged on the
+    wire; past that the outbox grows, and past ``buffer_events`` its oldest
+    events are dropped rather than ever stalling the agents.
+    """
+
+    def __init__(self, address: str = EVENT_BUS_ADDRESS, buffer_events: int = BUS_BUFFER_EVENTS):
+        _parse_address(address)
+        self.address = address
+        self.producer_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.buffer_events = buffer_events
+        self.stats = BusClientStats()
+        self.publisher = EventPublisher(self)
+        self._outbox: Deque[Tuple[int, Dict[str, Any]]] = deque()
+        self._next_seq = 1
+        self._acked = 0  # highest sequence number the commentator confirmed
+        self._sent = 0  # highest sequence number written on the current connection
+        self._closing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Events not yet acknowledged by the commentator."""
+        return self.publisher.pending + len(self._outbox)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="event-bus", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self.publisher.bind()
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, event: BroadcastEvent) -> None:
+        self.publisher.publish(event)
+
+    def close(self, timeout: float = FLUSH_TIMEOUT_S) -> None:
+        """Give the commentator up to ``timeout`` to acknowledge what is buffered, then stop."""
+        if self._thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._flush(timeout), self._loop).result(timeout + 1)
+        except Exception as e:
+            logger.debug(f"🚌 Event bus flush failed: {e}")
+        if self.pending:
+            logger.warning(f"🚌 {self.pending} events never reached the commentator at {self.address}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    async def _flush(self, timeout: float) -> None:
+        self._closing = True
+        self._wakeup.set()
+        if not self._outbox:
+            self._task.cancel()  # nothing to deliver, don't wait out a reconnect backoff
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+
+    def put_nowait(self, event: Any) -> None:
+        """Runs on the client loop: the EventPublisher's sink."""
+        if len(self._outbox) >= self.buffer_events:
+            self._outbox.popleft()
+            self.stats.dropped += 1
+        data = event.to_dict() if isinstance(event, BroadcastEvent) else event
+        self._outbox.append((self._next_seq, data))
+        self._next_seq += 1
+        self._wakeup.set()
+
+    def _on_ack(self, seq: int) -> None:
+        if seq <= self._acked:
+            return
+        self._acked = seq
+        while self._outbox and self._outbox[0][0] <= seq:
+            self._outbox.popleft()
+            self.stats.acked += 1
+
+    def _unsent_batch(self) -> List[Tuple[int, Dict[str, Any]]]:
+        room = min(BATCH_MAX_EVENTS, MAX_IN_FLIGHT - (self._sent - self._acked))
+        if room <= 0 or not self._outbox:
+            return []
+        start = max(0, self._sent + 1 - self._outbox[0][0])
+        return list(islice(self._outbox, start, start + room))
+
+    async def _run(self) -> None:
+        backoff = RECONNECT_MIN_S
+        while not (self._closing and not self._outbox):
+            try:
+                reader, writer = await _open_connection(self.address)
+            except OSError as e:
+                logger.debug(f"🚌 Commentator at {self.address} unreachable ({e}), retrying in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_S)
+                continue
+
+            self.stats.connects += 1
+            try:
+                await self._session(reader, writer)
+                backoff = RECONNECT_MIN_S
+            except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+                backoff = RECONNECT_MIN_S
+                logger.debug(f"🚌 Event bus connection lost ({e}), {len(self._outbox)} events to resend")
+            except (KeyError, TypeError, ValueError) as e:
+                # a reply we cannot read (no "ack", not JSON, ...): reconnect, backing off in case it persists
+                logger.warning(f"🚌 Bad reply from commentator at {self.address} ({e!r}), reconnecting "
+                               f"in {backoff:.1f}s with {len(self._outbox)} events to resend")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_S)
+            finally:
+                writer.close()
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(_frame({"hello": self.producer_id}))
+        self._on_ack((await _read_frame(reader))["ack"])
+        resend_from = self._sent
+        self._sent = self._acked  # resend everything the commentator has not confirmed
+        logger.debug(f"🚌 Connected to commentator at {self.address}, resuming after event {self._acked}")
+
+        acks = asyncio.create_task(self._read_acks(reader))
+        try:
+            while True:
+                if acks.done():
+                    acks.result()
+                    raise ConnectionError("commentator closed the connection")
+                batch = self._unsent_batch()
+                if batch:
+                    writer.write(_frame({"seq": batch[0][0], "events": [data for _, data in batch]}))
+                    self.stats.resent += max(0, min(batch[-1][0], resend_from) - batch[0][0] + 1)
+                    self._sent = batch[-1][0]
+                    self.stats.frames += 1
+                    self.stats.sent += len(batch)
+                    await writer.drain()
+                    continue
+                if self._closing and not self._outbox:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                if len(self._outbox) < BATCH_MAX_EVENTS and not self._closing:
+                    await asyncio.sleep(BATCH_DELAY_S)  # let a burst of small events share a frame
+        finally:
+            acks.cancel()
+
+    async def _read_acks(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                self._on_ack((await _read_frame(reader))["ack"])
+                self._wakeup.set()  # the in-flight window has room again
+        finally:
+            self._wakeup.set()
+
+
+# Global bus client, started on first publish
+_bus_client: Optional[EventBusClient] = None
+
+
+def bus_client() -> EventBusClient:
+    global _bus_client
+    if _bus_client is None:
+        _bus_client = EventBusClient()
+        _bus_client.start()
+        atexit.register(_bus_client.close)
+    return _bus_client
+
+
+@dataclass
+class BusServerStats:
+    connections: int = 0
+    frames: int = 0
+    events: int = 0
+    duplicates: int = 0  # resent after a reconnect but already delivered
+    rejected: int = 0  # undecodable or not an event object
+
+
+class EventBusServer:
+    """
+    Commentator end of the event bus: accepts producers on ``address`` and
+    hands every event they send to ``publish`` on the commentator's loop.
+
+    Tracks the last sequence number delivered per producer, so the events a
+    reconnecting producer resends are delivered exactly once, and acknowledges
+    each frame once its events have been handed on.
+    """
+
+    def __init__(self, publish: Callable[[BroadcastEvent], None], address: str = EVENT_BUS_ADDRESS):
+        _parse_address(address)
+        self.address = address
+        self.stats = BusServerStats()
+        self._publish = publish
+        self._delivered: Dict[str, int] = {}  # producer -> last sequence number handed on
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        kind, target = _parse_address(self.address)
+        if kind == "unix":
+            self._server = await asyncio.start_unix_server(self._handle, target)
+        else:
+            self._server = await asyncio.start_server(self._handle, *target)
+        logger.info(f"🚌 Commentator listening for agent events on {self.address}")
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.transport.abort()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        producer = None
+        try:
+            producer = (await _read_frame(reader))["hello"]
+            self.stats.connections += 1
+            writer.write(_frame({"ack": self._delivered.get(producer, 0)}))
+            logger.debug(f"🚌 Producer {producer} connected")
+            while True:
+                message = await _read_frame(reader)
+                writer.write(_frame({"ack": self._deliver(producer, message["seq"], message["events"])}))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, KeyError, ValueError) as e:
+            if producer is not None and not isinstance(e, asyncio.IncompleteReadError):
+                logger.debug(f"🚌 Dropping producer {producer}: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            logger.debug(f"🚌 Producer {producer} disconnected")
+
+    def _deliver(self, producer: str, first_seq: int, events: List[Dict[str, Any]]) -> int:
+        delivered = self._delivered.get(producer, 0)
+        self.stats.frames += 1
+        for seq, data in enumerate(events, start=first_seq):
+            if seq <= delivered:
+                self.stats.duplicates += 1
+                continue
+            if not isinstance(data, dict):
+                self.stats.rejected += 1
+                logger.debug(f"🚌 Non-object event from {producer}: {data!r:.80}")
+                continue
+            try:
+                event = event_from_dict(data)
+            except (ValueError, TypeError) as e:
+                self.stats.rejected += 1
+                logger.debug(f"🚌 Undecodable event from {producer}: {e}")
+                continue
+            self._publish(event)
+            self.stats.events += 1
+        last = first_seq + len(events) - 1
+        if last > delivered:
+            self._delivered[producer] = last
+        return self._delivered.get(producer, 0)
+
+
+if __name__ == "__main__":
+    # A frame with malformed items is acknowledged whole: bad items are rejected, the rest delivered
+    import tempfile
+    from commentator_agent.events import ToolCallEvent
+
+    async def main() -> None:
+        received: List[BroadcastEvent] = []
+        address = f"unix:{os.path.join(tempfile.mkdtemp(), 'bus.sock')}"
+        server = EventBusServer(received.append, address)
+        await server.start()
+        reader, writer = await _open_connection(address)
+        writer.write(_frame({"hello": "demo"}))
+        assert (await _read_frame(reader))["ack"] == 0
+        good = ToolCallEvent("Agent", "search", {"q": "x"}, session_id="demo").to_dict()
+        writer.write(_frame({"seq": 1, "events": [good, [1], "x", None, {"event_type": "bogus"}, good]}))
+        await writer.drain()
+        assert (await _read_frame(reader))["ack"] == 6
+        writer.close()
+        await writer.wait_closed()
+        while server._writers:  # let the handler see the disconnect before the server goes away
+            await asyncio.sleep(0.01)
+        await server.close()
+        assert len(received) == 2 and server.stats.rejected == 4, (received, server.stats)
+        print(f"🚌 bad items rejected, connection kept: {server.stats}")
+
+    asyncio.run(main())
@@ -0,0 +1,287 @@
+import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from commentator_agent.events import (
+    CollapsedEvent, ReasoningEvent, RunCompleteEvent, ToolCompleteEvent
+)
+
+CHANNEL_CAPACITY = 200  # events held across all priority classes
+RUN_COMPLETE = RunCompleteEvent.event_type  # event_type of the end-of-run sentinel
+URGENT_ALERT_TOOLS = ("emergency_alert_scan",)
+URGENT_ALERT_LEVELS = ("CRITICAL", "EXTREME")  # alert severities that interrupt running commentary
+
+
+class EventPriority(IntEnum):
+    """Lower value is served first."""
+    CRITICAL = 0  # tool completions, tool errors and end-of-run sentinels
+    NORMAL = 1  # impending tool calls
+    LOW = 2  # LLM reasoning dumps
+
+
+class DropPolicy(str, Enum):
+    """What to do with an event of a given class when the channel is full."""
+    DROP_OLDEST = "drop_oldest"  # evict the oldest queued event of the same class
+    DROP_LOWEST_PRIORITY = "drop_lowest_priority"  # evict from the least important non-empty class
+    SUMMARIZE = "summarize"  # collapse the queued events of the class into one summary event
+
+
+DEFAULT_DROP_POLICIES: Dict[EventPriority, DropPolicy] = {
+    EventPriority.CRITICAL: DropPolicy.DROP_LOWEST_PRIORITY,
+    EventPriority.NORMAL: DropPolicy.DROP_LOWEST_PRIORITY,
+    EventPriority.LOW: DropPolicy.SUMMARIZE,
+}
+
+
+def is_tool_error(event: Any) -> bool:
+    """A tool completion whose response reports a failure (an ``error`` key or ``status: error``)."""
+    if not isinstance(event, ToolCompleteEvent):
+        return False
+    response = event.tool_response
+    return isinstance(response, dict) and ("error" in response or response.get("status") == "error")
+
+
+def is_run_complete(event: Any) -> bool:
+    return isinstance(event, RunCompleteEvent)
+
+
+def is_never_dropped(event: Any) -> bool:
+    """Tool errors and end-of-run sentinels: admitted when full and never evicted."""
+    return is_tool_error(event) or is_run_complete(event)
+
+
+def classify(event: Any) -> EventPriority:
+    """Map a broadcast event to its priority class."""
+    if is_never_dropped(event) or isinstance(event, ToolCompleteEvent):
+        return EventPriority.CRITICAL
+    if isinstance(event, (ReasoningEvent, CollapsedEvent)):
+        return EventPriority.LOW
+    return EventPriority.NORMAL
+
+
+def is_urgent_alert(event: Any) -> bool:
+    """A completed alert scan reporting a severity that should cut into current commentary."""
+    if not isinstance(event, ToolCompleteEvent) or event.tool not in URGENT_ALERT_TOOLS:
+        return False
+    response = event.tool_response
+    alerts = response.get("alerts", "") if isinstance(response, dict) else response
+    return str(alerts).lstrip().upper().startswith(URGENT_ALERT_LEVELS)
+
+
+def collapse_events(events: List[Any]) -> CollapsedEvent:
+    """Summarise several events of one class into a single event; earlier summaries count for what they stand for."""
+    agents = Counter()
+    for event in events:
+        agents[getattr(event, "agent", None) or "unknown"] += event.count if isinstance(event, CollapsedEvent) else 1
+    total = sum(agents.values())
+    by_agent = ", ".join(f"{agent} x{count}" for agent, count in agents.most_common())
+    return CollapsedEvent(
+        agents.most_common(1)[0][0] if agents else "unknown",
+        total,
+        f"{total} queued events collapsed ({by_agent or 'unknown agents'})",
+        session_id=next((event.session_id for event in events if getattr(event, "session_id", "")), "")
+    )
+
+
+@dataclass
+class ClassMetrics:
+    enqueued: int = 0
+    dequeued: int = 0
+    dropped: int = 0
+    collapsed: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+    @property
+    def avg_wait_s(self) -> float:
+        return self.total_wait_s / self.dequeued if self.dequeued else 0.0
+
+
+@dataclass
+class ChannelMetrics:
+    """Depth, drop and wait-time counters per priority class."""
+    classes: Dict[EventPriority, ClassMetrics] = field(
+        default_factory=lambda: {priority: ClassMetrics() for priority in EventPriority})
+    max_depth: int = 0
+
+    def snapshot(self, depths: Dict[EventPriority, int]) -> Dict[str, Any]:
+        return {
+            "max_depth": self.max_depth,
+            "classes": {
+                priority.name.lower(): {
+                    "depth": depths[priority],
+                    "enqueued": metrics.enqueued,
+                    "dequeued": metrics.dequeued,
+                    "dropped": metrics.dropped,
+                    "collapsed": metrics.collapsed,
+                    "avg_wait_s": round(metrics.avg_wait_s, 4),
+                    "max_wait_s": round(metrics.max_wait_s, 4),
+                }
+                for priority, metrics in self.classes.items()
+            },
+        }
+
+
+class PriorityEventChannel:
+    """
+    Bounded, priority-ordered replacement for the commentator's ``asyncio.Queue``.
+
+    Exposes the subset of the ``asyncio.Queue`` API the commentator and the
+    broadcast callbacks use (``put_nowait``, ``get``, ``get_nowait``,
+    ``empty``, ``qsize``). ``put_nowait`` never raises when full; the event's
+    class drop policy decides what gets discarded instead. Tool errors and
+    the end-of-run sentinel are never dropped: they are always admitted,
+    over capacity if nothing queued can be evicted, and no policy evicts or
+    collapses them once queued. So failures are always narrated, and the
+    commentator never waits out its idle timeout for the sentinel.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = CHANNEL_CAPACITY,
+            drop_policies: Optional[Dict[EventPriority, DropPolicy]] = None
+    ):
+        self.maxsize = maxsize
+        self.drop_policies = {**DEFAULT_DROP_POLICIES, **(drop_policies or {})}
+        self.metrics = ChannelMetrics()
+        self._queues: Dict[EventPriority, Deque[Tuple[float, Any]]] = {
+            priority: deque() for priority in EventPriority
+        }
+        self._size = 0
+        self._getters: Deque[asyncio.Future] = deque()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return self._size >= self.maxsize
+
+    def depths(self) -> Dict[EventPriority, int]:
+        return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(self.depths())
+
+    def _evict_oldest(self, priority: EventPriority) -> bool:
+        """Evict the oldest event of the class that may be dropped. Returns False if there is none."""
+        queue = self._queues[priority]
+        for index, (_, queued) in enumerate(queue):
+            if not is_never_dropped(queued):
+                del queue[index]
+                self._size -= 1
+                self.metrics.classes[priority].dropped += 1
+                return True
+        return False
+
+    def _make_room(self, priority: EventPriority, event: Any) -> bool:
+        """Apply ``priority``'s drop policy. Returns False if ``event`` itself should be dropped."""
+        policy = self.drop_policies[priority]
+
+        queue = self._queues[priority]
+        if policy is DropPolicy.SUMMARIZE and any(not is_never_dropped(queued) for _, queued in queue):
+            kept = [(enqueued_at, queued) for enqueued_at, queued in queue if is_never_dropped(queued)]
+            collapsible = [(enqueued_at, queued) for enqueued_at, queued in queue if not is_never_dropped(queued)]
+            events = [queued for _, queued in collapsible] + [event]
+            self._size -= len(collapsible)
+            self.metrics.classes[priority].collapsed += len(events)
+            queue.clear()
+            queue.extend(sorted(kept + [(collapsible[0][0], collapse_events(events))], key=lambda item: item[0]))
+            self._size += 1
+            return False
+
+        if policy is DropPolicy.DROP_OLDEST and self._evict_oldest(priority):
+            return True
+
+        # DROP_LOWEST_PRIORITY, or the class has nothing of its own to give up
+        for candidate in sorted(EventPriority, reverse=True):
+            if candidate < priority:
+                break
+            if self._evict_oldest(candidate):
+                return True
+        self.metrics.classes[priority].dropped += 1
+        return False
+
+    def _make_room_for_kept(self) -> None:
+        """Evict the oldest droppable event of the least important class that has one, if any."""
+        for candidate in sorted(EventPriority, reverse=True):
+            if self._evict_oldest(candidate):
+                return
+
+    def put_nowait(self, event: Any) -> None:
+        priority = classify(event)
+        self.metrics.classes[priority].enqueued += 1
+
+        if self.full() and is_never_dropped(event):
+            self._make_room_for_kept()
+        elif self.full() and not self._make_room(priority, event):
+            logger.debug(f"📉 Channel full, {priority.name} event dropped or collapsed")
+            self._wake_getter()
+            return
+
+        self._queues[priority].append((time.monotonic(), event))
+        self._size += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self._size)
+        self._wake_getter()
+
+    def _wake_getter(self) -> None:
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
+
+    def get_nowait(self) -> Any:
+        for priority, queue in self._queues.items():
+            if queue:
+                enqueued_at, event = queue.popleft()
+                self._size -= 1
+                wait = time.monotonic() - enqueued_at
+                metrics = self.metrics.classes[priority]
+                metrics.dequeued += 1
+                metrics.total_wait_s += wait
+                metrics.max_wait_s = max(metrics.max_wait_s, wait)
+                return event
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> Any:
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except asyncio.CancelledError:
+                getter.cancel()
+                # pass the wake-up on if we were woken and cancelled at once
+                if not self.empty():
+                    self._wake_getter()
+                raise
+        return self.get_nowait()
+
+
+if __name__ == "__main__":
+    # Tool errors and the sentinel survive a channel flooded with critical completions
+    from commentator_agent.events import ToolCallEvent
+
+    channel = PriorityEventChannel(maxsize=10)
+    for n in range(30):
+        channel.put_nowait(ToolCompleteEvent("AlertMonitor", "emergency_alert_scan", {"n": n}, {"alerts": "ok"}))
+        channel.put_nowait(ToolCallEvent("AlertMonitor", "emergency_alert_scan", {"n": n}))
+        if n % 4 == 0:
+            channel.put_nowait(ToolCompleteEvent("ResourceCoordinator", "resource_lookup", {"n": n},
+                                                 {"status": "error", "error_message": f"timeout {n}"}))
+    channel.put_nowait(RunCompleteEvent("CrisisCoordinator"))
+    assert classify(ToolCompleteEvent("A", "t", {}, {"error": "boom"})) is EventPriority.CRITICAL
+    assert not is_tool_error(ToolCompleteEvent("A", "t", {}, "error in the text is not a failure"))
+    drained = [channel.get_nowait() for _ in range(channel.qsize())]
+    errors = [event for event in drained if is_tool_error(event)]
+    assert len(errors) == 8 and any(map(is_run_complete, drained)), drained
+    print(f"📉 {len(drained)} events kept of capacity {channel.maxsize}: {len(errors)} tool errors and the sentinel; "
+          f"{channel.snapshot()['classes']['critical']['dropped']} other completions dropped")
@@ -0,0 +1,347 @@
+import json
+import reprlib
+import time
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Iterator, Optional
+
+MAX_FIELD_CHARS = 160  # per args/response field in a rendered event line
+MAX_PAYLOAD_CHARS = 2000  # per payload field in the JSON form of an event
+
+# Fallback for objects _bounded_repr does not walk itself
+_short = reprlib.Repr()
+_short.maxstring = MAX_FIELD_CHARS
+_short.maxother = MAX_FIELD_CHARS
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _bounded_repr(value: Any, limit: int) -> str:
+    """repr() that stops once ``limit`` characters are produced instead of stringifying everything."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return repr(value) if len(value) <= limit else repr(value[:limit]) + "…"
+    if isinstance(value, dict):
+        pieces = (f"{_bounded_repr(k, limit)}: {_bounded_repr(v, limit)}" for k, v in value.items())
+        return _join_bounded(pieces, "{", "}", limit)
+    if isinstance(value, (list, tuple)):
+        opener, closer = ("[", "]") if isinstance(value, list) else ("(", ")")
+        return _join_bounded((_bounded_repr(item, limit) for item in value), opener, closer, limit)
+    return _short.repr(value)
+
+
+def _join_bounded(pieces: Iterator[str], opener: str, closer: str, limit: int) -> str:
+    kept = []
+    size = 2
+    for piece in pieces:
+        if size >= limit:
+            kept.append("…")
+            break
+        kept.append(piece)
+        size += len(piece) + 2
+    return _truncate(opener + ", ".join(kept) + closer, limit)
+
+
+def _format_args(args: Any, limit: int = MAX_FIELD_CHARS) -> str:
+    if isinstance(args, dict):
+        return _truncate(", ".join(f"{k}={_bounded_repr(v, limit)}" for k, v in args.items()), limit)
+    return _bounded_repr(args, limit)
+
+
+def _content_text(content: Any, limit: int) -> str:
+    """Flatten a genai Content (or anything else) into short readable text, stopping at ``limit``."""
+    parts = getattr(content, "parts", None)
+    if not parts:
+        return _truncate(content if isinstance(content, str) else _bounded_repr(content, limit), limit)
+    pieces = []
+    size = 0
+    for part in parts:
+        text = getattr(part, "text", None)
+        function_call = getattr(part, "function_call", None)
+        function_response = getattr(part, "function_response", None)
+        if text:
+            piece = _truncate(text.strip(), limit)
+        elif function_call is not None:
+            piece = f"calls {function_call.name}({_format_args(function_call.args or {})})"
+        elif function_response is not None:
+            piece = f"{function_response.name} returned {_bounded_repr(function_response.response, limit)}"
+        else:
+            continue
+        pieces.append(piece)
+        size += len(piece) + 1
+        if size >= limit:
+            break
+    return _truncate(" ".join(pieces), limit)
+
+
+def _jsonable(value: Any) -> Any:
+    """A JSON-safe, size-bounded stand-in for a payload value."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return _truncate(value, MAX_PAYLOAD_CHARS)
+    if getattr(value, "parts", None):
+        return _content_text(value, MAX_PAYLOAD_CHARS)
+    return _bounded_repr(value, MAX_PAYLOAD_CHARS)
+
+
+class BroadcastEvent:
+    """
+    Shared schema of everything the broadcast callbacks publish.
+
+    Records are slotted and hold payloads by reference; nothing is
+    stringified when the callback fires. ``render`` (the compact line the
+    commentator prompts with) and ``to_dict``/``to_json`` are computed on
+    first use, cached, and cap every payload field by size.
+    """
+
+    __slots__ = ("agent", "session_id", "invocation_id", "timestamp", "_line", "_dict", "_json")
+    event_type: ClassVar[str] = "event"
+
+    def __init__(self, agent: Optional[str], session_id: str = "", invocation_id: str = "",
+                 timestamp: Optional[float] = None):
+        self.agent = agent or "unknown"
+        self.session_id = session_id
+        self.invocation_id = invocation_id
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._line = self._dict = self._json = None  # rendered on first use
+
+    def _body(self) -> str:
+        return f"{self.agent} {self.event_type}"
+
+    def _payload(self) -> Dict[str, Any]:
+        return {}
+
+    def render(self, session_start: Optional[float] = None) -> str:
+        """One compact line, prefixed with the time since ``session_start`` when given."""
+        if self._line is None:
+            self._line = self._body()
+        if session_start is None:
+            return self._line
+        return f"t+{self.timestamp - session_start:.1f}s {self._line}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._dict is None:
+            self._dict = {
+                "event_type": self.event_type,
+                "agent": self.agent,
+                "session_id": self.session_id,
+                "invocation_id": self.invocation_id,
+                "timestamp": self.timestamp,
+                **self._payload(),
+            }
+        return self._dict
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), default=str)
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.render()})"
+
+
+class ToolCallEvent(BroadcastEvent):
+    """A tool is about to run."""
+
+    __slots__ = ("tool", "args", "span_id")
+    event_type = "tool_call"
+
+    def __init__(self, agent: Optional[str], tool: str, args: Any, session_id: str = "",
+                 invocation_id: str = "", timestamp: Optional[float] = None, span_id: str = ""):
+        BroadcastEvent.__init__(self, agent, session_id, invocation_id, timestamp)
+        self.tool = tool
+        self.args = args
+        self.span_id = span_id
+
+    @property
+    def execution_id(self) -> str:
+        """The tool span shared by the call and its completion; derived from the timestamp if untraced."""
+        return self.span_id or f"{self.agent}_{self.tool}_{int(self.timestamp * 1000)}"
+
+    @property
+    def start_time(self) -> str:
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
+    def _body(self) -> str:
+        return f"{self.agent} ▶ {self.tool}({_format_args(self.args)})"
+
+    def _payload(self) -> Dict[str, Any]:
+        return {"tool": self.tool, "args": _jsonable_args(self.args), "execution_id": self.execution_id}
+
+
+class ToolCompleteEvent(ToolCallEvent):
+    """A tool returned."""
+
+    __slots__ = ("tool_response",)
+    event_type = "tool_complete"
+
+    def __init__(self, agent: Optional[str], tool: str, args: Any, tool_response: Any, session_id: str = "",
+                 invocation_id: str = "", timestamp: Optional[float] = None, span_id: str = ""):
+        ToolCallEvent.__init__(self, agent, tool, args, session_id, invocation_id, timestamp, span_id)
+        self.tool_response = tool_response
+
+    def _body(self) -> str:
+        response = _bounded_repr(self.tool_response, MAX_FIELD_CHARS)
+        return f"{self.agent} ✔ {self.tool}({_format_args(self.args)}) → {response}"
+
+    def _payload(self) -> Dict[str, Any]:
+        return {**super()._payload(), "tool_response": _jsonable(self.tool_response)}
+
+
+class ReasoningEvent(BroadcastEvent):
+    """A model response, i.e. what an agent decided and why."""
+
+    __slots__ = ("model_response", "token_usage")
+    event_type = "llm_decision"
+
+    def __init__(self, agent: Optional[str], model_response: Any,
+                 token_usage: Optional[Dict[str, Optional[int]]] = None, session_id: str = "",
+                 invocation_id: str = "", timestamp: Optional[float] = None):
+        BroadcastEvent.__init__(self, agent, session_id, invocation_id, timestamp)
+        self.model_response = model_response
+        self.token_usage = token_usage
+
+    def _body(self) -> str:
+        return f"{self.agent} 🧠 {_content_text(self.model_response, MAX_FIELD_CHARS * 2)}"
+
+    def _payload(self) -> Dict[str, Any]:
+        return {"model_response": _jsonable(self.model_response), "token_usage": self.token_usage}
+
+
+class RunCompleteEvent(BroadcastEvent):
+    """End-of-run sentinel: the observed agent has finished."""
+
+    __slots__ = ()
+    event_type = "run_complete"
+
+    def _body(self) -> str:
+        return f"{self.agent} finished"
+
+
+class CollapsedEvent(BroadcastEvent):
+    """Stands in for several queued events the channel had to summarise."""
+
+    __slots__ = ("count", "summary")
+    event_type = "collapsed"
+
+    def __init__(self, agent: Optional[str], count: int, summary: str, session_id: str = "",
+                 timestamp: Optional[float] = None):
+        BroadcastEvent.__init__(self, agent, session_id, "", timestamp)
+        self.count = count
+        self.summary = summary
+
+    def _body(self) -> str:
+        return f"{self.agent} … {self.summary}"
+
+    def _payload(self) -> Dict[str, Any]:
+        return {"count": self.count, "summary": self.summary}
+
+
+def _jsonable_args(args: Any) -> Any:
+    if isinstance(args, dict):
+        return {str(key): _jsonable(value) for key, value in args.items()}
+    return _jsonable(args)
+
+
+def event_from_dict(data: Dict[str, Any]) -> BroadcastEvent:
+    """Rebuild a record from its ``to_dict`` form, e.g. one received over the event bus."""
+    kind = data.get("event_type")
+    agent = data.get("agent")
+    ids = {
+        "session_id": data.get("session_id", ""),
+        "invocation_id": data.get("invocation_id", ""),
+        "timestamp": data.get("timestamp"),
+    }
+    if kind == ToolCompleteEvent.event_type:
+        return ToolCompleteEvent(agent, data.get("tool", ""), data.get("args"), data.get("tool_response"),
+                                 span_id=data.get("execution_id", ""), **ids)
+    if kind == ToolCallEvent.event_type:
+        return ToolCallEvent(agent, data.get("tool", ""), data.get("args"), span_id=data.get("execution_id", ""),
+                             **ids)
+    if kind == ReasoningEvent.event_type:
+        return ReasoningEvent(agent, data.get("model_response"), data.get("token_usage"), **ids)
+    if kind == RunCompleteEvent.event_type:
+        return RunCompleteEvent(agent, **ids)
+    if kind == CollapsedEvent.event_type:
+        return CollapsedEvent(agent, data.get("count", 0), data.get("summary", ""),
+                              session_id=ids["session_id"], timestamp=ids["timestamp"])
+    raise ValueError(f"Unknown event type {kind!r}")
+
+
+if __name__ == "__main__":
+    # Microbenchmark: old dict events + str() rendering vs slotted records + cached lazy rendering
+    import timeit
+    import tracemalloc
+
+    class _Ctx:
+        agent_name = "AlertMonitor"
+        invocation_id = "inv-1"
+
+    class _Tool:
+        name = "emergency_alert_scan"
+
+    ctx, tool = _Ctx(), _Tool()
+    args = {"location": "Santa Rosa, CA", "alert_type": "wildfire"}
+    response = {"alerts": "CRITICAL: Infrastructure damage reported " * 200, "timestamp": time.time()}
+    from google.genai.types import Content, Part
+    thought = Content(role="model", parts=[Part(text="Assessing evacuation capacity. " * 300)])
+
+    def legacy_events():
+        event = {
+            "agent": ctx.agent_name,
+            "tool": tool.name,
+            "args": args,
+            "timestamp": time.time(),
+            "session_id": "s",
+            "start_time": datetime.now().isoformat(),
+            "execution_id": f"{ctx.agent_name}_{tool.name}_{int(time.time() * 1000)}",
+            "agent_state": getattr(ctx, 'agent_state', None),
+            "previous_tools": getattr(ctx, 'tool_history', [])[-10:],
+            "workflow_stage": getattr(ctx, 'workflow_stage', 'unknown'),
+            "session_context": {
+                "total_tools_called": getattr(ctx, 'tool_count', 0),
+                "session_duration": time.time() - getattr(ctx, 'session_start', time.time())
+            },
+            "workflow_context": {
+                "current_goal": getattr(ctx, 'current_objective', 'unknown'),
+                "progress_stage": getattr(ctx, 'progress_percentage', 0),
+                "parallel_agents": getattr(ctx, 'active_agents', []),
+                "dependencies": getattr(tool, 'depends_on', []),
+                "expected_next_tools": getattr(ctx, 'planned_tools', [])
+            }
+        }
+        done = {"event_type": "tool_complete", "agent": ctx.agent_name, "tool": tool.name, "args": args,
+                "tool_response": response, "timestamp": time.time(), "session_id": "s"}
+        reasoning = {"agent": ctx.agent_name, "model_response": thought, "reasoning_type": "llm_decision",
+                     "timestamp": "now", "session_id": "s", "invocation_id": ctx.invocation_id}
+        return event, done, reasoning
+
+    def legacy_render(events):
+        event, done, reasoning = events
+        return (_truncate(str(event.get("args")), 160), _truncate(str(done.get("tool_response")), 160),
+                _truncate(str(reasoning.get("model_response")), 320))
+
+    def record_events():
+        event = ToolCallEvent(ctx.agent_name, tool.name, args, session_id="s", invocation_id=ctx.invocation_id)
+        done = ToolCompleteEvent(ctx.agent_name, tool.name, args, response, session_id="s")
+        reasoning = ReasoningEvent(ctx.agent_name, thought, session_id="s", invocation_id=ctx.invocation_id)
+        return event, done, reasoning
+
+    def record_render(events):
+        return tuple(event.render(0.0) for event in events)
+
+    n = 20000
+    for name, build, render in (("dict + str()", legacy_events, legacy_render),
+                                ("slotted records", record_events, record_render)):
+        publish_s = timeit.timeit(build, number=n) / n
+        render_s = timeit.timeit(lambda: render(build()), number=n) / n - publish_s
+        tracemalloc.start()
+        queued = [build() for _ in range(1000)]  # as they would sit in the event channel
+        queued_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del queued
+        print(f"{name:16s} publish {publish_s * 1e6:6.2f}µs, render {render_s * 1e6:6.2f}µs "
+              f"per call/complete/reasoning triple, {queued_bytes / 1000:6.0f}B per queued triple")
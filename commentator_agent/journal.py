@@ -0,0 +1,349 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from commentator_agent.events import BroadcastEvent, event_from_dict
+
+EVENT_JOURNAL_DIR = os.getenv("EVENT_JOURNAL_DIR", "")  # empty disables the journal
+SEGMENT_BYTES = 64 * 1024 * 1024  # a new segment file is started past this size
+FSYNC_INTERVAL_S = 0.5  # written records are fsynced at most this often, not one by one
+WRITE_BUFFER_BYTES = 1024 * 1024
+MAGIC = b"EVJ1"  # first bytes of a segment that starts a run
+CONTINUED_MAGIC = b"EVJ+"  # ... or of one that continues the previous segment's run after a rollover
+SEGMENT_GLOB = "segment-*.evj"
+
+# Record: payload length, CRC32 of the payload, event timestamp; then the payload,
+# the event's to_dict() form minus its timestamp as compact JSON
+_RECORD = struct.Struct("<IId")
+
+
+def _encode(event: BroadcastEvent) -> bytes:
+    data = dict(event.to_dict())
+    timestamp = data.pop("timestamp")
+    payload = json.dumps(data, default=str, separators=(",", ":"), ensure_ascii=False).encode()
+    return _RECORD.pack(len(payload), zlib.crc32(payload), timestamp) + payload
+
+
+def _segment_index(path: Path) -> int:
+    return int(path.stem.split("-")[1])
+
+
+def _segments(directory: Path) -> List[Path]:
+    return sorted(directory.glob(SEGMENT_GLOB), key=_segment_index)
+
+
+def _magic(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC))
+
+
+def runs_of(segments: List[Path]) -> List[List[Path]]:
+    """``segments`` grouped by run; a run is one process's worth of events, rolled over into more segments."""
+    grouped: List[List[Path]] = []
+    for path in segments:
+        if (grouped and _segment_index(path) == _segment_index(grouped[-1][-1]) + 1
+                and _magic(path) == CONTINUED_MAGIC):
+            grouped[-1].append(path)
+        else:
+            grouped.append([path])
+    return grouped
+
+
+def runs(directory: str) -> List[List[Path]]:
+    """Every run in the journal, oldest first."""
+    return runs_of(_segments(Path(directory)))
+
+
+def select_segments(directory: str, run: Optional[int] = None,
+                    segments: Optional[Tuple[int, int]] = None) -> List[Path]:
+    """
+    The segments of one run (0-based, negative counts from the latest), or
+    those numbered ``first..last`` inclusive, or every segment.
+    """
+    if run is not None:
+        grouped = runs(directory)
+        if not -len(grouped) <= run < len(grouped):
+            raise ValueError(f"{directory} holds {len(grouped)} runs, there is no run {run}")
+        return grouped[run]
+    if segments is not None:
+        first, last = segments
+        return [path for path in _segments(Path(directory)) if first <= _segment_index(path) <= last]
+    return _segments(Path(directory))
+
+
+@dataclass
+class JournalStats:
+    records: int = 0
+    bytes: int = 0
+    fsyncs: int = 0
+    segments: int = 0
+
+
+class EventJournal:
+    """
+    Append-only, segmented binary journal of broadcast events.
+
+    ``append`` only queues the event (safe from any thread, never blocks);
+    a writer thread encodes it as a length-prefixed, CRC-checked record,
+    writes through a buffer and fsyncs at most every ``fsync_interval_s``,
+    so a crash loses at most that much. Each run starts a new segment and
+    segments roll over at ``segment_bytes``, so a torn write can only ever
+    be at the end of the last segment.
+    """
+
+    def __init__(self, directory: str = EVENT_JOURNAL_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 fsync_interval_s: float = FSYNC_INTERVAL_S):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync_interval_s = fsync_interval_s
+        self.stats = JournalStats()
+        self._queue: Deque[BroadcastEvent] = deque()
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._file = None
+        self._segment_size = 0
+        self._next_segment = None
+        self._thread = threading.Thread(target=self._run, name="event-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, event: Any) -> None:
+        if isinstance(event, BroadcastEvent):
+            self._queue.append(event)
+            self._wakeup.set()
+
+    def close(self) -> None:
+        """Write and fsync everything appended so far."""
+        if self._closing:
+            return
+        self._closing = True
+        self._wakeup.set()
+        self._thread.join()
+        logger.debug(f"📓 Journal closed: {self.stats}")
+
+    def _open_segment(self) -> None:
+        continued = self._file is not None
+        if continued:
+            self._sync()
+            self._file.close()
+        if self._next_segment is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            existing = _segments(self.directory)
+            self._next_segment = _segment_index(existing[-1]) + 1 if existing else 1
+        path = self.directory / f"segment-{self._next_segment:06d}.evj"
+        self._next_segment += 1
+        self._file = open(path, "xb", buffering=WRITE_BUFFER_BYTES)
+        self._file.write(CONTINUED_MAGIC if continued else MAGIC)
+        self._segment_size = len(MAGIC)
+        self.stats.segments += 1
+        logger.debug(f"📓 Journaling events to {path}")
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.stats.fsyncs += 1
+
+    def _run(self) -> None:
+        dirty = False
+        last_sync = time.monotonic()
+        while True:
+            self._wakeup.wait(timeout=self.fsync_interval_s)
+            self._wakeup.clear()
+            while self._queue:
+                record = _encode(self._queue.popleft())
+                if self._file is None or self._segment_size + len(record) > self.segment_bytes:
+                    self._open_segment()
+                self._file.write(record)
+                self._segment_size += len(record)
+                self.stats.records += 1
+                self.stats.bytes += len(record)
+                dirty = True
+            if dirty and (self._closing or time.monotonic() - last_sync >= self.fsync_interval_s):
+                self._sync()
+                dirty = False
+                last_sync = time.monotonic()
+            if self._closing and not self._queue:
+                break
+        if self._file is not None:
+            self._file.close()
+
+
+def read_records(directory: str, segments: Optional[List[Path]] = None) -> Iterator[Tuple[float, memoryview]]:
+    """
+    Every (timestamp, payload) in the journal (or in ``segments`` of it), in
+    order, read through a memory map without copying; a payload is only
+    valid until the next one is read. Stops a segment at a torn or corrupt
+    record.
+    """
+    for path in _segments(Path(directory)) if segments is None else segments:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= len(MAGIC):
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    if view[:len(MAGIC)] not in (MAGIC, CONTINUED_MAGIC):
+                        logger.warning(f"📓 {path} is not an event journal segment, skipped")
+                        continue
+                    offset = len(MAGIC)
+                    while offset + _RECORD.size <= size:
+                        length, crc, timestamp = _RECORD.unpack_from(view, offset)
+                        start = offset + _RECORD.size
+                        payload = view[start:start + length]
+                        if len(payload) < length or zlib.crc32(payload) != crc:
+                            payload.release()
+                            logger.warning(f"📓 {path}: torn or corrupt record at byte {offset}, rest skipped")
+                            break
+                        try:
+                            yield timestamp, payload
+                        finally:
+                            payload.release()  # so the map can close, even if the reader stops here
+                        offset = start + length
+                finally:
+                    view.release()
+
+
+def read_events(directory: str, segments: Optional[List[Path]] = None) -> Iterator[BroadcastEvent]:
+    for timestamp, payload in read_records(directory, segments):
+        yield _decode(payload, timestamp)
+
+
+def _decode(payload: memoryview, timestamp: float) -> BroadcastEvent:
+    data = json.loads(bytes(payload))
+    data["timestamp"] = timestamp
+    return event_from_dict(data)
+
+
+async def replay(directory: str, publish: Callable[[BroadcastEvent], None], speed: Optional[float] = 1.0,
+                 segments: Optional[List[Path]] = None) -> int:
+    """
+    Feed the journal (or ``segments`` of it) to ``publish`` (e.g. the
+    commentator's event publisher) with the original gaps between events
+    divided by ``speed``, or as fast as possible when ``speed`` is None.
+    Each run picks up straight after the one before, not after the hours
+    that may have passed between them. Timestamps are moved to replay time
+    so narration sees the pacing it is being fed. Returns the number of
+    events.
+    """
+    selected = _segments(Path(directory)) if segments is None else segments
+    started = time.time()
+    count = 0
+    for run in runs_of(selected):
+        first = None
+        run_started = started
+        for timestamp, payload in read_records(directory, run):
+            if first is None:
+                first = timestamp
+            offset = (timestamp - first) / speed if speed else 0.0
+            if speed:
+                delay = run_started + offset - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % 256 == 0:
+                await asyncio.sleep(0)  # let the consumer keep up with a flat-out replay
+            publish(_decode(payload, run_started + offset))
+            count += 1
+            started = run_started + offset
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from itertools import islice
+
+    parser = argparse.ArgumentParser(description="Replay or benchmark the event journal")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="show the runs in a journal")
+    list_parser.add_argument("directory", nargs="?", default=EVENT_JOURNAL_DIR)
+    replay_parser = commands.add_parser("replay", help="narrate a journaled run again")
+    replay_parser.add_argument("directory", nargs="?", default=EVENT_JOURNAL_DIR)
+    which = replay_parser.add_mutually_exclusive_group()
+    which.add_argument("--run", type=int, default=-1, help="run to replay, as numbered by `list` (default: latest)")
+    which.add_argument("--segments", metavar="FIRST[-LAST]", help="replay these segment numbers instead")
+    which.add_argument("--all", action="store_true", help="replay every run, one after another")
+    pace = replay_parser.add_mutually_exclusive_group()
+    pace.add_argument("--speed", type=float, default=1.0, help="replay this many times faster than recorded")
+    pace.add_argument("--max", action="store_true", help="replay as fast as the commentator takes events")
+    bench_parser = commands.add_parser("bench", help="journal write and replay throughput")
+    bench_parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for number, run in enumerate(runs(args.directory)):
+            timestamps = [timestamp for timestamp, _ in read_records(args.directory, run)]
+            span = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamps[0]))}, " \
+                   f"{timestamps[-1] - timestamps[0]:.0f}s" if timestamps else "empty"
+            print(f"run {number}: segments {_segment_index(run[0])}-{_segment_index(run[-1])}, "
+                  f"{len(timestamps)} events, {span}")
+    elif args.command == "replay":
+        if args.segments:
+            first, _, last = args.segments.partition("-")
+            selected = select_segments(args.directory, segments=(int(first), int(last or first)))
+        else:
+            selected = select_segments(args.directory, run=None if args.all else args.run)
+
+        async def narrate() -> None:
+            from commentator_agent.commentator import event_journal, event_publisher
+            from commentator_agent.remote import CommentatorHost
+            if event_journal is not None:
+                # replayed events must not be journaled again, least of all into the journal being replayed
+                event_publisher.taps.remove(event_journal.append)
+            host = CommentatorHost()
+            count = await replay(args.directory, host.publish, None if args.max else args.speed, selected)
+            print(f"📓 Replayed {count} events, waiting for the commentary to finish")
+            await host.wait_idle()
+
+        asyncio.run(narrate())
+    else:
+        from commentator_agent.events import ToolCallEvent, ToolCompleteEvent
+        from commentator_agent.publisher import EventPublisher
+        from commentator_agent.routing import SessionEventRouter
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal = EventJournal(directory, segment_bytes=16 * 1024 * 1024)
+            response = {"alerts": "CRITICAL: Infrastructure damage reported " * 20}
+            started = time.perf_counter()
+            for n in range(args.events):
+                journal.append(ToolCallEvent("AlertMonitor", "emergency_alert_scan", {"n": n}, session_id="bench"))
+                journal.append(ToolCompleteEvent("AlertMonitor", "emergency_alert_scan", {"n": n}, response,
+                                                 session_id="bench"))
+            appended = time.perf_counter() - started
+            journal.close()
+            written = time.perf_counter() - started
+            records = journal.stats.records
+            print(f"📓 append {appended / records * 1e6:.2f}µs/event on the caller, "
+                  f"{records / written:,.0f} records/s to disk ({journal.stats.bytes / written / 1e6:.0f} MB/s), "
+                  f"{journal.stats.bytes / records:.0f}B/record, {journal.stats.fsyncs} fsyncs, "
+                  f"{journal.stats.segments} segments")
+
+            started = time.perf_counter()
+            scanned = sum(1 for _ in read_records(directory))
+            scan = time.perf_counter() - started
+            early = read_records(directory)
+            next(early)
+            early.close()  # a reader that stops early must not leave the map pinned open
+            assert len(list(islice(read_events(directory), 3))) == 3
+
+            async def flat_out() -> Tuple[int, float]:
+                router = SessionEventRouter()
+                publisher = EventPublisher(router)
+                publisher.bind()
+                replay_started = time.perf_counter()
+                replayed = await replay(directory, publisher.publish, speed=None)
+                return replayed, time.perf_counter() - replay_started
+
+            replayed, replay_s = asyncio.run(flat_out())
+            print(f"📓 mmap scan {scanned / scan:,.0f} records/s, "
+                  f"max-speed replay into the router {replayed / replay_s:,.0f} events/s")
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import struct
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Set
+
+from loguru import logger
+
+from commentator_agent.transcript import PCM_BYTES_PER_SECOND
+
+LISTEN_HOST = os.getenv("COMMENTARY_STREAM_HOST", "127.0.0.1")
+LISTEN_PORT = int(os.getenv("COMMENTARY_STREAM_PORT", "0"))  # 0 disables the server
+CLIENT_BUFFER_SECONDS = 5.0  # audio a listener may fall behind before its oldest chunks are dropped
+SAMPLE_RATE = PCM_BYTES_PER_SECOND // 2
+MAX_REQUEST_BYTES = 8192
+
+
+def _wav_header(sample_rate: int = SAMPLE_RATE) -> bytes:
+    """WAV header for a stream of unknown length (sizes set to the maximum, as streaming players expect)."""
+    unknown = 0xFFFFFFFF
+    return (b"RIFF" + struct.pack("<I", unknown) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b"data" + struct.pack("<I", unknown))
+
+
+@dataclass
+class ListenerStats:
+    connected: int = 0
+    disconnected: int = 0
+    sent_bytes: int = 0
+    dropped_bytes: int = 0
+    dropped_chunks: int = 0
+
+
+class _Listener:
+    """One connected client: a bounded byte queue drained by its own writer task."""
+
+    def __init__(self, writer: asyncio.StreamWriter, max_bytes: int):
+        self.writer = writer
+        self.max_bytes = max_bytes
+        self.chunks: Deque[bytes] = deque()
+        self.buffered = 0
+        self.dropped_bytes = 0
+        self.closing = False
+        self.wakeup = asyncio.Event()
+        self.peer = writer.get_extra_info("peername")
+
+    def offer(self, chunk: bytes) -> int:
+        """Queue ``chunk``, dropping this listener's oldest audio if it is over budget; returns bytes dropped."""
+        self.chunks.append(chunk)
+        self.buffered += len(chunk)
+        dropped = 0
+        while self.buffered > self.max_bytes and len(self.chunks) > 1:
+            old = self.chunks.popleft()
+            self.buffered -= len(old)
+            dropped += len(old)
+        self.dropped_bytes += dropped
+        self.wakeup.set()
+        return dropped
+
+
+class CommentaryStreamServer:
+    """
+    Serves the commentary PCM to any number of local listeners over HTTP
+    chunked transfer: ``GET /`` is raw 24 kHz mono s16le (``audio/L16``),
+    ``GET /wav`` the same audio behind a streaming WAV header, e.g.
+    ``ffplay http://127.0.0.1:8765/wav``.
+
+    ``publish`` never waits on a client. Each listener has its own bounded
+    buffer and writer task; a listener that falls more than
+    ``CLIENT_BUFFER_SECONDS`` behind loses its oldest audio, so it can never
+    stall the commentator or the other listeners.
+    """
+
+    def __init__(self, host: str = LISTEN_HOST, port: int = LISTEN_PORT,
+                 buffer_seconds: float = CLIENT_BUFFER_SECONDS):
+        self.host = host
+        self.port = port
+        self.max_client_bytes = int(PCM_BYTES_PER_SECOND * buffer_seconds)
+        self.stats = ListenerStats()
+        self._listeners: Set[_Listener] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def listeners(self) -> int:
+        return len(self._listeners)
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📡 Commentary audio stream on http://{self.host}:{self.port}/ (raw) and /wav")
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for listener in list(self._listeners):
+            listener.closing = True  # its writer task sends nothing more and exits
+            listener.wakeup.set()
+            listener.writer.transport.abort()  # also releases a writer stuck on a stalled client
+        await self._server.wait_closed()
+        self._server = None
+
+    def publish(self, chunk: bytes) -> None:
+        """Fan a PCM chunk out to every listener. Safe to call from the event loop thread only."""
+        if not chunk:
+            return
+        for listener in self._listeners:
+            dropped = listener.offer(chunk)
+            if dropped:
+                self.stats.dropped_bytes += dropped
+                self.stats.dropped_chunks += 1
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[str]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            return None
+        if len(head) > MAX_REQUEST_BYTES:
+            return None
+        parts = head.split(b"\r\n", 1)[0].decode("latin-1").split()
+        if len(parts) != 3 or parts[0] != "GET":
+            return None
+        return parts[1].split("?", 1)[0]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        path = await self._read_request(reader)
+        if path not in ("/", "/wav"):
+            try:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+
+        content_type = "audio/wav" if path == "/wav" else f"audio/L16;rate={SAMPLE_RATE};channels=1"
+        writer.write((f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                      f"Transfer-Encoding: chunked\r\nCache-Control: no-cache\r\n"
+                      f"Connection: close\r\n\r\n").encode())
+        if path == "/wav":
+            header = _wav_header()
+            writer.write(b"%x\r\n%b\r\n" % (len(header), header))  # never subject to dropping
+        listener = _Listener(writer, self.max_client_bytes)
+        self._listeners.add(listener)
+        self.stats.connected += 1
+        logger.debug(f"📡 Listener {listener.peer} connected ({self.listeners} listening)")
+
+        try:
+            while not listener.closing:
+                await listener.wakeup.wait()
+                listener.wakeup.clear()
+                while listener.chunks and not listener.closing:
+                    chunk = listener.chunks.popleft()
+                    listener.buffered -= len(chunk)
+                    writer.write(b"%x\r\n%b\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+                    self.stats.sent_bytes += len(chunk)
+        except ConnectionError:
+            pass
+        finally:
+            self._listeners.discard(listener)
+            self.stats.disconnected += 1
+            writer.close()
+            logger.debug(f"📡 Listener {listener.peer} left after losing {listener.dropped_bytes} bytes "
+                         f"to slow consumption ({self.listeners} listening)")
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Optional
+
+from google.genai import Client  # Gemini SDK
+from google.genai.types import Content, Part, LiveConnectConfig
+from loguru import logger
+
+MAX_SESSION_AGE = 540.0  # Live sessions are cut server-side after ~10 minutes
+MAX_TURNS_PER_SESSION = 40  # recycle before the session context window fills up
+
+
+@dataclass
+class LiveSessionStats:
+    """Connection and reuse counters for a LiveSessionManager."""
+    connects: int = 0
+    reconnects: int = 0
+    turns: int = 0
+    reused_turns: int = 0
+    last_connect_s: float = 0.0
+    avg_connect_s: float = 0.0
+    last_turn_saved_s: float = 0.0
+    total_saved_s: float = 0.0
+
+    def record_connect(self, elapsed: float) -> None:
+        self.connects += 1
+        self.last_connect_s = elapsed
+        # exponential moving average of the handshake cost we avoid on reuse
+        if self.avg_connect_s == 0.0:
+            self.avg_connect_s = elapsed
+        else:
+            self.avg_connect_s = 0.8 * self.avg_connect_s + 0.2 * elapsed
+
+    def record_turn(self, reused: bool) -> None:
+        self.turns += 1
+        self.last_turn_saved_s = self.avg_connect_s if reused else 0.0
+        if reused:
+            self.reused_turns += 1
+            self.total_saved_s += self.last_turn_saved_s
+
+
+class LiveSessionManager:
+    """
+    Keeps a single Gemini Live session open and sends every narration as a
+    new turn on it, reconnecting when the session expires or errors.
+    """
+
+    def __init__(
+            self,
+            model: str,
+            config: LiveConnectConfig,
+            api_key: Optional[str] = None,
+            max_session_age: float = MAX_SESSION_AGE,
+            max_turns: int = MAX_TURNS_PER_SESSION
+    ):
+        self.model = model
+        self.config = config
+        self.max_session_age = max_session_age
+        self.max_turns = max_turns
+        self.stats = LiveSessionStats()
+        self._api_key = api_key
+        self._client: Optional[Client] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._session: Any = None
+        self._connected_at = 0.0
+        self._session_turns = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._session is not None
+
+    def _is_stale(self) -> bool:
+        age = time.monotonic() - self._connected_at
+        return age > self.max_session_age or self._session_turns >= self.max_turns
+
+    async def _connect(self) -> None:
+        if self._client is None:
+            self._client = Client(api_key=self._api_key or os.getenv("GOOGLE_API_KEY"))
+
+        started = time.monotonic()
+        stack = AsyncExitStack()
+        try:
+            self._session = await stack.enter_async_context(
+                self._client.aio.live.connect(model=self.model, config=self.config)
+            )
+        except Exception:
+            await stack.aclose()
+            raise
+        self._stack = stack
+        self._connected_at = time.monotonic()
+        self._session_turns = 0
+        self.stats.record_connect(self._connected_at - started)
+        logger.debug(f"🔌 Gemini Live session opened in {self.stats.last_connect_s:.3f}s")
+
+    async def _disconnect(self) -> None:
+        stack, self._stack, self._session = self._stack, None, None
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception as e:
+                logger.debug(f"🔌 Ignoring error while closing Live session: {e}")
+
+    async def start(self) -> None:
+        """Pre-warm the connection so the first narration skips the handshake."""
+        async with self._lock:
+            if not self.is_connected:
+                await self._connect()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+    async def send_turn(self, text: str) -> AsyncGenerator[Any, None]:
+        """
+        Send ``text`` as a new user turn and yield the server messages of the
+        model's reply. A dead or expired session is replaced transparently as
+        long as nothing has been yielded yet for this turn.
+        """
+        async with self._lock:
+            if self.is_connected and self._is_stale():
+                logger.debug("🔌 Recycling expired Gemini Live session")
+                await self._disconnect()
+
+            for attempt in range(2):
+                reused = self.is_connected
+                if not reused:
+                    if self.stats.connects:
+                        self.stats.reconnects += 1
+                    await self._connect()
+
+                received_any = False
+                try:
+                    await self._session.send_client_content(
+                        turns=Content(role="user", parts=[Part(text=text)])
+                    )
+                    self._session_turns += 1
+                    self.stats.record_turn(reused)
+                    # receive() stops on its own once the turn is complete
+                    async for response in self._session.receive():
+                        received_any = True
+                        yield response
+                    return
+                except (asyncio.CancelledError, GeneratorExit):
+                    # an abandoned turn leaves unread messages on the session
+                    await self._disconnect()
+                    raise
+                except Exception as e:
+                    await self._disconnect()
+                    if received_any or attempt == 1:
+                        raise
+                    logger.warning(f"🔌 Gemini Live session failed ({e}), reconnecting")
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from loguru import logger
+
+NARRATION_CACHE_DIR = os.getenv("NARRATION_CACHE_DIR", ".narration_cache")
+NARRATION_CACHE_MAX_BYTES = int(os.getenv("NARRATION_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_CHUNK_BYTES = 24000  # 0.5s of 24 kHz mono int16 per chunk handed to the player
+
+# Parts of a prompt that differ between otherwise identical replays
+_VOLATILE = re.compile(r"t\+\d+(?:\.\d+)?s|Duration: \d+(?:\.\d+)?s")
+
+
+def cache_key(prompt: str, model: str, persona: str) -> str:
+    """Content address of a narration: prompt, model and persona, minus run-specific timings."""
+    digest = hashlib.sha256()
+    for part in (model, persona, _VOLATILE.sub("", prompt)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedNarration:
+    key: str
+    transcription: str
+    audio_path: Path
+    audio_bytes: int
+
+    def iter_audio(self, chunk_size: int = CACHE_CHUNK_BYTES) -> Iterator[bytes]:
+        with open(self.audio_path, "rb") as audio:
+            while chunk := audio.read(chunk_size):
+                yield chunk
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class NarrationCache:
+    """
+    On-disk, size-bounded LRU cache of generated narrations.
+
+    Each entry is ``<key>.pcm`` (raw audio as received from Gemini Live) plus
+    ``<key>.json`` (transcription and metadata). Recency is kept in memory and
+    mirrored to file mtimes, so LRU order survives restarts.
+    """
+
+    def __init__(self, directory: str = NARRATION_CACHE_DIR, max_bytes: int = NARRATION_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, least recent first
+        self._total_bytes = 0
+        self._load()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.pcm", self.directory / f"{key}.json"
+
+    def _load(self) -> None:
+        if not self.directory.is_dir():
+            return
+        found = []
+        for meta_path in self.directory.glob("*.json"):
+            audio_path = meta_path.with_suffix(".pcm")
+            if audio_path.exists():
+                stat = audio_path.stat()
+                found.append((stat.st_mtime, meta_path.stem, stat.st_size + meta_path.stat().st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[CachedNarration]:
+        if key not in self._entries:
+            self.stats.misses += 1
+            return None
+        audio_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            now = time.time()
+            os.utime(audio_path, (now, now))
+        except (OSError, ValueError) as e:
+            logger.warning(f"💾 Dropping unreadable cache entry {key[:12]}: {e}")
+            self._remove(key)
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return CachedNarration(key, meta.get("transcription", ""), audio_path, meta.get("audio_bytes", 0))
+
+    def put(self, key: str, audio: bytes, transcription: str, model: str, persona: str) -> None:
+        if not audio:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        audio_path, meta_path = self._paths(key)
+        meta = json.dumps({
+            "transcription": transcription,
+            "model": model,
+            "persona": persona,
+            "audio_bytes": len(audio),
+            "created": time.time(),
+        })
+        # write under temp names first so a crash never leaves a half entry behind
+        try:
+            tmp_audio, tmp_meta = audio_path.with_suffix(".pcm.tmp"), meta_path.with_suffix(".json.tmp")
+            tmp_audio.write_bytes(audio)
+            tmp_meta.write_text(meta)
+            os.replace(tmp_audio, audio_path)
+            os.replace(tmp_meta, meta_path)
+        except OSError as e:
+            logger.warning(f"💾 Could not store narration in cache: {e}")
+            return
+
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)
+        size = len(audio) + len(meta)
+        self._entries[key] = size
+        self._total_bytes += size
+        self.stats.stores += 1
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        self._total_bytes -= self._entries.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats.evictions += 1
+
+    def describe(self) -> str:
+        return (f"{len(self)} entries, {self._total_bytes / 1e6:.1f}MB, hit rate {self.stats.hit_rate:.0%} "
+                f"({self.stats.hits} hits, {self.stats.misses} misses, {self.stats.evictions} evictions)")
@@ -0,0 +1,256 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+PENDING_CAPACITY = 10000  # events held for handoff; beyond that the oldest are lost
+LATENCY_SAMPLES = 1024  # recent enqueue latencies kept per producer for percentiles
+DROP_WARNING_EVERY = 1000  # after the first, warn again every this many events lost
+
+
+@dataclass
+class ProducerStats:
+    """Enqueue latency of one producer thread: publish call to event in the channel."""
+    delivered: int = 0
+    handed_off: int = 0  # of those, published from another thread or event loop
+    dropped: int = 0  # pushed out of a full handoff queue before the commentator took them
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def record(self, latency: float, handed_off: bool) -> None:
+        self.delivered += 1
+        self.handed_off += handed_off
+        self.total_latency_s += latency
+        self.max_latency_s = max(self.max_latency_s, latency)
+        self.recent.append(latency)
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.total_latency_s / self.delivered * 1000 if self.delivered else 0.0
+
+    def percentile_ms(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "delivered": self.delivered,
+            "handed_off": self.handed_off,
+            "dropped": self.dropped,
+            "avg_ms": round(self.avg_latency_ms, 3),
+            "p99_ms": round(self.percentile_ms(0.99), 3),
+            "max_ms": round(self.max_latency_s * 1000, 3),
+        }
+
+
+class EventPublisher:
+    """
+    Thread- and loop-safe front door to the commentator's event router.
+
+    The router and its channels belong to the commentator's event loop and
+    are not thread-safe. ``publish`` works out where it is being called from:
+    on that loop it enqueues directly; from a worker thread, another event
+    loop, or before the commentator has started, the event goes onto a
+    deque (appends are atomic, no lock) and one ``call_soon_threadsafe``
+    wake-up per burst drains it into the router on the commentator's loop.
+
+    Latency from ``publish`` to the event being in its channel is tracked per
+    producer thread. If the handoff queue fills up (published before the
+    commentator started, or while its loop is stalled) the oldest events
+    are dropped, counted and warned about. ``taps`` see every event as it is published, on the
+    producer's thread (e.g. the event journal); they must not block.
+    """
+
+    def __init__(self, sink: Any, pending_capacity: int = PENDING_CAPACITY):
+        self.sink = sink  # anything with put_nowait, normally the SessionEventRouter
+        self.stats: Dict[str, ProducerStats] = {}  # only touched on the commentator's loop
+        self.taps: List[Callable[[Any], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Deque[Tuple[float, str, Any]] = deque(maxlen=pending_capacity)
+        self._drain_scheduled = False
+        self.dropped = 0
+        self._drops: Dict[str, int] = {}  # producer -> dropped, until the loop folds them into stats
+        self._drop_lock = threading.Lock()  # drops happen on producer threads; rare, so a lock is fine
+
+    @property
+    def pending(self) -> int:
+        """Events published from elsewhere that have not reached the router yet."""
+        return len(self._pending)
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Deliver into ``loop`` (default: the running loop). Anything published before is handed over now."""
+        loop = loop or asyncio.get_running_loop()
+        if loop is not self._loop:
+            logger.debug(f"📮 Event publisher bound to loop {id(loop):#x} ({self.pending} pending)")
+            self._loop = loop
+            self._drain_scheduled = False  # a wake-up sent to a previous loop may never run
+        if self._pending:
+            if _running_loop() is loop:
+                self._drain()  # before anything this loop publishes directly
+            else:
+                self._schedule_drain()
+
+    def publish(self, event: Any) -> None:
+        """Enqueue ``event`` for the commentator. Never blocks; safe from any thread or event loop."""
+        started = time.perf_counter()
+        for tap in self.taps:
+            tap(event)
+        loop = self._loop
+        if loop is not None and _running_loop() is loop:
+            self.sink.put_nowait(event)
+            self._record(threading.current_thread().name, time.perf_counter() - started, False)
+            return
+
+        pending = self._pending
+        if len(pending) >= pending.maxlen:
+            self._count_drop(pending)
+        pending.append((started, threading.current_thread().name, event))
+        if loop is not None and not self._drain_scheduled:
+            self._schedule_drain()
+
+    def _count_drop(self, pending: Deque[Tuple[float, str, Any]]) -> None:
+        """The append about to happen pushes the oldest pending event out."""
+        try:
+            producer = pending[0][1]
+        except IndexError:
+            return  # drained meanwhile
+        with self._drop_lock:
+            self._drops[producer] = self._drops.get(producer, 0) + 1
+            self.dropped += 1
+            dropped = self.dropped
+        if dropped == 1 or dropped % DROP_WARNING_EVERY == 0:
+            waiting = "the commentator has not started" if self._loop is None else "the commentator's loop is behind"
+            logger.warning(f"📮 Handoff queue full ({pending.maxlen} events, {waiting}): "
+                           f"dropping the oldest, {dropped} lost so far")
+
+    def _schedule_drain(self) -> None:
+        self._drain_scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            # the loop has closed; keep the events until the next commentator run binds a new one
+            self._drain_scheduled = False
+            logger.debug(f"📮 Commentator loop closed, holding {self.pending} events")
+
+    def _drain(self) -> None:
+        """Runs on the commentator's loop. Cleared first so a publish racing with it schedules another drain."""
+        self._drain_scheduled = False
+        if self._drops:
+            with self._drop_lock:
+                drops, self._drops = self._drops, {}
+            for producer, count in drops.items():
+                self._producer_stats(producer).dropped += count
+        pending = self._pending
+        while pending:
+            try:
+                started, producer, event = pending.popleft()
+            except IndexError:
+                break
+            self.sink.put_nowait(event)
+            self._record(producer, time.perf_counter() - started, True)
+
+    def _producer_stats(self, producer: str) -> ProducerStats:
+        stats = self.stats.get(producer)
+        if stats is None:
+            stats = self.stats[producer] = ProducerStats()
+        return stats
+
+    def _record(self, producer: str, latency: float, handed_off: bool) -> None:
+        self._producer_stats(producer).record(latency, handed_off)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "dropped": self.dropped,
+            "producers": {producer: stats.snapshot() for producer, stats in self.stats.items()},
+        }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+if __name__ == "__main__":
+    # Stress test: several threads plus a foreign event loop publishing into one commentator loop
+    from commentator_agent.event_channel import PriorityEventChannel
+    from commentator_agent.events import ToolCallEvent
+    from commentator_agent.routing import SessionEventRouter
+
+    THREADS = 6
+    RATE = 2000  # events per second per thread
+    DURATION_S = 3.0
+    per_thread = int(RATE * DURATION_S)
+
+    router = SessionEventRouter(lambda: PriorityEventChannel(maxsize=10_000_000))
+    publisher = EventPublisher(router, pending_capacity=10_000_000)
+
+    def produce(index: int) -> None:
+        start = time.perf_counter()
+        for n in range(per_thread):
+            # pace to RATE so latencies reflect a loaded system rather than one burst
+            delay = start + n / RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            publisher.publish(ToolCallEvent(f"agent{index}", "stress", {"n": n}, session_id="stress"))
+
+    def produce_on_own_loop() -> None:
+        async def main() -> None:
+            for n in range(per_thread):
+                publisher.publish(ToolCallEvent("loop-agent", "stress", {"n": n}, session_id="stress"))
+                if n % 20 == 0:
+                    await asyncio.sleep(20 / RATE)
+        asyncio.run(main())
+
+    async def consume() -> None:
+        publisher.bind()
+        channel = router.channel("stress")
+        threads = [threading.Thread(target=produce, args=(i,), name=f"producer-{i}") for i in range(THREADS)]
+        threads.append(threading.Thread(target=produce_on_own_loop, name="foreign-loop"))
+        # the commentator's own loop publishes too, as same-loop ADK callbacks do
+        async def local() -> None:
+            for n in range(per_thread):
+                publisher.publish(ToolCallEvent("local-agent", "stress", {"n": n}, session_id="stress"))
+                if n % 20 == 0:
+                    await asyncio.sleep(20 / RATE)
+
+        expected = per_thread * (len(threads) + 1)
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        local_task = asyncio.create_task(local())
+        received = 0
+        last: Dict[str, int] = {}
+        in_order = True
+        while received < expected:
+            event = await channel.get()
+            received += 1
+            n = event.args["n"]
+            in_order &= n == last.get(event.agent, -1) + 1
+            last[event.agent] = n
+        elapsed = time.perf_counter() - started
+        await local_task
+        for thread in threads:
+            thread.join()
+
+        print(f"📮 {received}/{expected} events in {elapsed:.2f}s ({received / elapsed:,.0f}/s), "
+              f"per-producer order {'kept' if in_order else 'BROKEN'}, {publisher.pending} left pending")
+        for producer, stats in sorted(publisher.stats.items()):
+            snap = stats.snapshot()
+            print(f"  {producer:14s} {snap['delivered']:6d} events  avg {snap['avg_ms']:7.3f}ms  "
+                  f"p99 {snap['p99_ms']:7.3f}ms  max {snap['max_ms']:7.3f}ms")
+
+    asyncio.run(consume())
@@ -0,0 +1,81 @@
+"""
+Runs the commentator in its own process: ``python -m commentator_agent.remote``.
+
+Agents publish to it over the event bus when they run with the same
+``EVENT_BUS_ADDRESS`` (e.g. ``unix:/tmp/commentator-events.sock``, or
+``tcp:0.0.0.0:7878`` to narrate agents on another host). Each session
+seen on the bus gets its own commentator run, which ends with that
+session's end-of-run sentinel, as it does in-process.
+"""
+import argparse
+import asyncio
+from typing import Dict
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+from loguru import logger
+
+from commentator_agent.commentator import LiveCommentator, commentator_queue, event_publisher
+from commentator_agent.event_bus import EVENT_BUS_ADDRESS, EventBusServer
+from commentator_agent.events import BroadcastEvent
+from commentator_agent.routing import session_key
+
+APP_NAME = "CRISIS_AI_COMMENTARY"
+USER_ID = "REMOTE_OBSERVER"
+
+
+class CommentatorHost:
+    """
+    Runs a LiveCommentator without the agents it narrates: ``publish`` hands
+    an event on and starts a commentator run for its session if none is going.
+    Must be used on the event loop the commentator runs on.
+    """
+
+    def __init__(self):
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(agent=LiveCommentator(), app_name=APP_NAME, session_service=self.session_service)
+        self._observing: Dict[str, asyncio.Task] = {}
+        event_publisher.bind(asyncio.get_running_loop())
+
+    async def _observe(self, session_id: str) -> None:
+        if await self.session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id) is None:
+            await self.session_service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+        prompt = Content(role="user", parts=[Part(text=f"Narrate session {session_id}")])
+        async for _ in self.runner.run_async(user_id=USER_ID, session_id=session_id, new_message=prompt):
+            pass
+
+    def publish(self, event: BroadcastEvent) -> None:
+        session_id = session_key(event)
+        if session_id not in self._observing:
+            logger.info(f"🚌 Narrating session {session_id}")
+            commentator_queue.channel(session_id)  # reopen a session released by an earlier run first
+            task = self._observing[session_id] = asyncio.create_task(self._observe(session_id))
+            task.add_done_callback(lambda _: self._observing.pop(session_id, None))
+        event_publisher.publish(event)
+
+    async def wait_idle(self) -> None:
+        """Until every session's commentary has finished."""
+        while self._observing:
+            await asyncio.gather(*self._observing.values(), return_exceptions=True)
+
+
+async def serve(address: str) -> None:
+    host = CommentatorHost()
+    server = EventBusServer(host.publish, address)
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        logger.info(f"🚌 Event bus stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the live commentator as its own process")
+    parser.add_argument("--listen", default=EVENT_BUS_ADDRESS or "unix:/tmp/commentator-events.sock",
+                        help="unix:<path> or tcp:<host>:<port> (default: $EVENT_BUS_ADDRESS)")
+    try:
+        asyncio.run(serve(parser.parse_args().listen))
+    except KeyboardInterrupt:
+        print("Commentator stopped")
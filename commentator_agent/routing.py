@@ -0,0 +1,133 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from loguru import logger
+
+from commentator_agent.event_channel import PriorityEventChannel
+from commentator_agent.events import BroadcastEvent
+
+DEFAULT_SESSION = "default"  # events that carry no session id land here
+MAX_RELEASED_SESSIONS = 10_000  # released session ids remembered, so their late events can be dropped
+MAX_CONCURRENT_NARRATIONS = 1  # narrations in flight across all sessions; they share the one audio player
+
+
+def session_key(event: Any) -> str:
+    """The routing key of a broadcast event: its session id, else its invocation id."""
+    if isinstance(event, BroadcastEvent):
+        for value in (event.session_id, event.invocation_id):
+            if value and value != "unknown":
+                return value
+    return DEFAULT_SESSION
+
+
+class SessionEventRouter:
+    """
+    Routes broadcast events into one PriorityEventChannel per session.
+
+    Drop-in for the old global queue on the producer side: callbacks keep
+    calling ``put_nowait``. Each commentator run attaches to the channel of
+    the session it observes and releases it when done. Events for a session
+    whose commentator has not attached yet are buffered in its channel;
+    events that arrive after their session was released are dropped, as
+    nothing would ever read them.
+    """
+
+    def __init__(self, channel_factory: Callable[[], PriorityEventChannel] = PriorityEventChannel,
+                 max_released: int = MAX_RELEASED_SESSIONS):
+        self._channel_factory = channel_factory
+        self._channels: Dict[str, PriorityEventChannel] = {}
+        self._released: "OrderedDict[str, None]" = OrderedDict()  # oldest first
+        self._max_released = max_released
+        self.late_dropped = 0  # events for already released sessions
+
+    def channel(self, session_id: str) -> PriorityEventChannel:
+        """The session's channel; attaching to a released session opens it again."""
+        self._released.pop(session_id, None)
+        channel = self._channels.get(session_id)
+        if channel is None:
+            channel = self._channels[session_id] = self._channel_factory()
+            logger.debug(f"🧭 Opened event channel for session {session_id}")
+        return channel
+
+    def release(self, session_id: str) -> None:
+        channel = self._channels.pop(session_id, None)
+        self._released[session_id] = None
+        if len(self._released) > self._max_released:
+            self._released.popitem(last=False)
+        if channel is not None and not channel.empty():
+            logger.debug(f"🧭 Released session {session_id} with {channel.qsize()} unread events")
+
+    def sessions(self) -> Dict[str, int]:
+        return {session_id: channel.qsize() for session_id, channel in self._channels.items()}
+
+    def put_nowait(self, event: Any) -> None:
+        session_id = session_key(event)
+        if session_id in self._released:
+            self.late_dropped += 1
+            logger.debug(f"🧭 Dropped a late event for released session {session_id}")
+            return
+        self.channel(session_id).put_nowait(event)
+
+    def qsize(self) -> int:
+        return sum(channel.qsize() for channel in self._channels.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {session_id: channel.snapshot() for session_id, channel in self._channels.items()}
+
+
+class FairNarrationGate:
+    """
+    Caps how many narrations run at once and hands free slots to waiting
+    sessions in round-robin order, so a busy session cannot starve the others.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_NARRATIONS):
+        self.max_concurrent = max_concurrent
+        self._active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()  # sessions with waiters, next to serve first
+
+    def _grant_next(self) -> None:
+        while self._active < self.max_concurrent and self._turns:
+            session_id = self._turns.popleft()
+            waiters = self._waiters.get(session_id)
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    self._active += 1
+                    break
+            if waiters:
+                self._turns.append(session_id)  # back of the line for its next narration
+            else:
+                self._waiters.pop(session_id, None)
+
+    @asynccontextmanager
+    async def slot(self, session_id: str) -> AsyncIterator[None]:
+        if self._active < self.max_concurrent and not self._turns:
+            self._active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            if session_id not in self._waiters:
+                self._waiters[session_id] = deque()
+                self._turns.append(session_id)
+            self._waiters[session_id].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._active -= 1  # granted and cancelled at once: hand the slot on
+                    self._grant_next()
+                raise
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._grant_next()
+
+    def waiting(self, session_id: Optional[str] = None) -> int:
+        if session_id is not None:
+            return len(self._waiters.get(session_id, ()))
+        return sum(len(waiters) for waiters in self._waiters.values())
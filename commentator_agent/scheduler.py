@@ -0,0 +1,130 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from loguru import logger
+
+MIN_WINDOW = 0.25  # seconds, never hold a batch open for less than this
+MAX_WAIT = 6.0  # seconds, hard deadline measured from the first event in a window
+MAX_BATCH = 20  # events per narration
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class SchedulerStats:
+    """Running counters for a CoalescingScheduler."""
+    windows: int = 0
+    events: int = 0
+    closed_full: int = 0
+    closed_deadline: int = 0
+    closed_quiet: int = 0
+    last_window_s: float = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.events / self.windows if self.windows else 0.0
+
+
+class CoalescingScheduler:
+    """
+    Groups queued events into windows so each window becomes one narration.
+    ``queue`` is anything with the ``asyncio.Queue`` get/get_nowait/empty API.
+
+    The window length adapts to two signals: the recent narration latency (no
+    point closing a window faster than we can narrate it) and the event
+    inter-arrival time (close early once the stream goes quiet). A window
+    never stays open longer than ``max_wait`` or grows past ``max_batch``.
+    """
+
+    def __init__(
+            self,
+            queue: Any,
+            min_window: float = MIN_WINDOW,
+            max_wait: float = MAX_WAIT,
+            max_batch: int = MAX_BATCH
+    ):
+        self.queue = queue
+        self.min_window = min_window
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.stats = SchedulerStats()
+        self._interarrival: Optional[float] = None
+        self._narration_latency: Optional[float] = None
+        self._last_arrival: Optional[float] = None
+
+    @staticmethod
+    def _ewma(current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return (1 - EWMA_ALPHA) * current + EWMA_ALPHA * sample
+
+    def _record_arrival(self) -> None:
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            self._interarrival = self._ewma(self._interarrival, now - self._last_arrival)
+        self._last_arrival = now
+
+    def record_narration_latency(self, seconds: float) -> None:
+        """Feed back how long the last narration took end to end."""
+        self._narration_latency = self._ewma(self._narration_latency, seconds)
+
+    def target_window(self) -> float:
+        """How long to keep collecting once the first event of a window arrives."""
+        window = self._narration_latency if self._narration_latency is not None else self.min_window
+        return min(max(window, self.min_window), self.max_wait)
+
+    def quiet_gap(self) -> float:
+        """How long a lull must last before the window closes early."""
+        if self._interarrival is None:
+            return self.target_window()
+        return min(max(3 * self._interarrival, self.min_window), self.target_window())
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Wait up to ``timeout`` for the first event, then coalesce further events
+        into the same window. Raises ``asyncio.TimeoutError`` if nothing arrives.
+        """
+        first = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        self._record_arrival()
+        batch = [first]
+
+        opened = time.monotonic()
+        deadline = opened + self.target_window()
+        reason = "deadline"
+
+        while True:
+            # drain whatever is already waiting without touching the loop
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                self._record_arrival()
+            if len(batch) >= self.max_batch:
+                reason = "full"
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout=min(remaining, self.quiet_gap()))
+            except asyncio.TimeoutError:
+                if time.monotonic() < deadline:
+                    reason = "quiet"
+                break
+            batch.append(event)
+            self._record_arrival()
+
+        self.stats.windows += 1
+        self.stats.events += len(batch)
+        self.stats.last_window_s = time.monotonic() - opened
+        if reason == "full":
+            self.stats.closed_full += 1
+        elif reason == "quiet":
+            self.stats.closed_quiet += 1
+        else:
+            self.stats.closed_deadline += 1
+        logger.debug(
+            f"🪟 Window closed ({reason}) with {len(batch)} events after "
+            f"{self.stats.last_window_s:.2f}s, target {self.target_window():.2f}s"
+        )
+        return batch
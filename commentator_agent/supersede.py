@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class SupersedePolicy(str, Enum):
+    """When newer events should cut an in-flight narration short."""
+    NEVER = "never"  # always let the current narration finish
+    ON_THRESHOLD = "on_threshold"  # supersede once enough new events are waiting
+    ALWAYS = "always"  # any new event supersedes ("latest wins")
+
+
+SUPERSEDE_THRESHOLD = 10  # new events needed to supersede under ON_THRESHOLD
+
+
+@dataclass
+class SupersedeStats:
+    """Counters for narrations started, finished and superseded."""
+    started: int = 0
+    completed: int = 0
+    superseded: int = 0
+    superseding_events: int = 0
+
+    @property
+    def superseded_ratio(self) -> float:
+        return self.superseded / self.started if self.started else 0.0
+
+
+class Superseder:
+    """Decides whether a fresh batch of events should replace the narration in flight."""
+
+    def __init__(self, policy: SupersedePolicy = SupersedePolicy.ON_THRESHOLD,
+                 threshold: int = SUPERSEDE_THRESHOLD):
+        self.policy = SupersedePolicy(policy)
+        self.threshold = max(1, threshold)
+        self.stats = SupersedeStats()
+
+    def should_supersede(self, new_events: int) -> bool:
+        if new_events <= 0 or self.policy is SupersedePolicy.NEVER:
+            return False
+        if self.policy is SupersedePolicy.ALWAYS:
+            return True
+        return new_events >= self.threshold
+
+    def record_superseded(self, new_events: int) -> None:
+        self.stats.superseded += 1
+        self.stats.superseding_events += new_events
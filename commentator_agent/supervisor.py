@@ -1,7 +1,11 @@
 from google.adk.agents import SequentialAgent, LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools import BaseTool, ToolContext
+from commentator_agent.events import ToolCallEvent
+from tools.broadcasting import (
+    event_session_id, broadcast_run_complete, get_event_publisher, publish_event, trace_agent_start
+)
 from tools.demo_tools import fake_search, fake_summarise
+from utils.lazy_llm import lazy_lite_llm
 
 from typing import Optional, Dict, Any
 from loguru import logger
@@ -19,20 +23,14 @@ def broadcast_tool_event(
     Publishes every impending tool call to the Commentator queue so it can
     narrate. Return None to let the tool run normally.
     """
-    # Import the global queue from commentator module
-    from commentator_agent.commentator import commentator_queue
+    event_publisher = get_event_publisher()
 
-    event_data = {
-        "agent": tool_context.agent_name,  # Get agent name from tool_context
-        "tool": tool.name,
-        "args": args,
-        "timestamp": "now"
-    }
+    event_data = ToolCallEvent(tool_context.agent_name, tool.name, args, session_id=event_session_id(tool_context))
 
     # Push event to commentator queue (non-blocking)
     try:
-        commentator_queue.put_nowait(event_data)
-        logger.debug(f"🎯 CALLBACK: Put event in queue. Queue size now: {commentator_queue.qsize()}")
+        publish_event(event_data)
+        logger.debug(f"🎯 CALLBACK: Published event ({event_publisher.pending} awaiting handoff)")
         logger.debug(f"--- Tool {tool.name} called for {tool_context.agent_name} ---")  # Add this debug line
     except Exception as e:
         logger.error(f"Failed to enqueue event: {e}")
@@ -47,17 +45,19 @@ supervisor = SequentialAgent(
     sub_agents=[
         LlmAgent(
             name="Searcher",
-            model=LiteLlm(model=LLM_MODEL),
+            model=lazy_lite_llm(LLM_MODEL),
             instruction="Use fake_search to look things up.",
             tools=[fake_search],
             before_tool_callback=broadcast_tool_event
         ),
         LlmAgent(
             name="Summariser",
-            model=LiteLlm(model=LLM_MODEL),
+            model=lazy_lite_llm(LLM_MODEL),
             instruction="Use fake_summarise on the previous search result.",
             tools=[fake_summarise],
             before_tool_callback=broadcast_tool_event
         ),
     ],
+    before_agent_callback=trace_agent_start,  # opens the run's span, which broadcast_run_complete closes
+    after_agent_callback=broadcast_run_complete  # tells the commentator the run is over
 )
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, List, Optional, Set
+
+from loguru import logger
+
+LISTENER_BUFFER = 256  # chunks buffered per async listener before the oldest is dropped
+PCM_BYTES_PER_SECOND = 24000 * 2  # Gemini Live: 24 kHz mono int16
+
+
+@dataclass(frozen=True)
+class TranscriptChunk:
+    """
+    One piece of commentary text as it arrived from a backend.
+
+    ``timestamp`` is wall-clock time and ``monotonic`` the matching
+    ``time.monotonic()`` reading. ``audio_offset_s`` is how much audio of
+    the same narration had been received when the text arrived (None for
+    text-only backends), which is what a UI needs to line text up with audio.
+    """
+    narration_id: int
+    backend: str
+    text: str
+    timestamp: float
+    monotonic: float
+    audio_offset_s: Optional[float] = None
+    final: bool = False
+    session_id: str = ""
+
+
+TranscriptCallback = Callable[[TranscriptChunk], None]
+
+
+class TranscriptStream:
+    """Fans partial transcript chunks out to callbacks and async iterators."""
+
+    def __init__(self):
+        self._callbacks: List[TranscriptCallback] = []
+        self._queues: Set[asyncio.Queue] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, callback: TranscriptCallback) -> Callable[[], None]:
+        """Register ``callback`` for every chunk; returns a function that unsubscribes it."""
+        self._callbacks.append(callback)
+
+        def unsubscribe():
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+        return unsubscribe
+
+    async def listen(self, maxsize: int = LISTENER_BUFFER) -> AsyncIterator[TranscriptChunk]:
+        """Async iterator over chunks published after the call. Slow listeners lose their oldest chunks."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._queues.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.discard(queue)
+
+    def publish(
+            self,
+            narration_id: int,
+            backend: str,
+            text: str,
+            audio_offset_s: Optional[float] = None,
+            final: bool = False,
+            session_id: str = ""
+    ) -> TranscriptChunk:
+        chunk = TranscriptChunk(narration_id, backend, text, time.time(), time.monotonic(),
+                                audio_offset_s, final, session_id)
+        self.published += 1
+
+        for callback in list(self._callbacks):
+            try:
+                callback(chunk)
+            except Exception as e:
+                logger.error(f"Transcript subscriber failed: {e}")
+
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(chunk)
+        return chunk
@@ -1,9 +1,15 @@
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.planners import PlanReActPlanner, BuiltInPlanner
 from google.genai.types import ThinkingConfig
 
-from tools.broadcasting import broadcast_tool_event, broadcast_tool_complete, broadcast_llm_reasoning
+from tools.broadcasting import (
+    broadcast_tool_event,
+    broadcast_tool_complete,
+    broadcast_llm_reasoning,
+    broadcast_run_complete,
+    trace_agent_start
+)
+from utils.lazy_llm import lazy_lite_llm
 
 from .sub_agents.crisis_response_team import (
     alert_monitor,
@@ -26,7 +32,7 @@ planner = BuiltInPlanner(
 
 crisis_supervisor = LlmAgent(
     name="CrisisCoordinator",
-    model=LiteLlm(model=LLM_MODEL),
+    model=lazy_lite_llm(LLM_MODEL),
     planner=planner,
     # planner=re_act_planner,
     instruction="""You are the Crisis Response Coordinator operating under emergency protocols. You must orchestrate a comprehensive multi-phase response using specialized teams.
@@ -111,7 +117,9 @@ crisis_supervisor = LlmAgent(
     ],
     before_tool_callback=broadcast_tool_event,
     after_tool_callback=broadcast_tool_complete,
-    after_model_callback=broadcast_llm_reasoning
+    after_model_callback=broadcast_llm_reasoning,
+    before_agent_callback=trace_agent_start,  # root span of the run's trace
+    after_agent_callback=broadcast_run_complete  # tells the commentator the run is over
 )
 
 root_agent = crisis_supervisor
@@ -1,13 +1,16 @@
 import os
 
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.base_llm import BaseLlm
 from google.adk.tools.function_tool import FunctionTool
 from google.adk.planners import BuiltInPlanner, PlanReActPlanner
 from google.genai.types import ThinkingConfig
 
-from tools.broadcasting import broadcast_tool_event, broadcast_tool_complete, broadcast_llm_reasoning
+from tools.broadcasting import (
+    broadcast_tool_event, broadcast_tool_complete, broadcast_llm_reasoning, trace_agent_start, trace_agent_end
+)
 from utils.gemma3n import setup_local_model
+from utils.lazy_llm import LazyLlm
 
 from ..tools.crisis_tools import (
     emergency_alert_scan,
@@ -16,12 +19,18 @@ from ..tools.crisis_tools import (
     communication_broadcast
 )
 
-USE_GEMMA_3N = int(os.getenv("USE_GEMMA_3N"))
+CLOUD_MODEL = "openai/gpt-4o"
+
+
+def _team_model() -> BaseLlm:
+    """Pick the team's model on its first request, so USE_GEMMA_3N is read when it is needed."""
+    if int(os.getenv("USE_GEMMA_3N", "0")) == 1:
+        return setup_local_model()
+    from google.adk.models.lite_llm import LiteLlm
+    return LiteLlm(model=CLOUD_MODEL)
+
 
-if USE_GEMMA_3N == 1:
-    LLM_MODEL: LiteLlm = setup_local_model()
-else:
-    LLM_MODEL: LiteLlm = LiteLlm(model="openai/gpt-4o")
+LLM_MODEL = LazyLlm(model=CLOUD_MODEL, factory=_team_model)
 
 
 emergency_alert_scan_adk_tool = FunctionTool(emergency_alert_scan)
@@ -69,7 +78,9 @@ alert_monitor = LlmAgent(
     planner=planner,
     before_tool_callback=broadcast_tool_event,
     after_tool_callback=broadcast_tool_complete,
-    after_model_callback=broadcast_llm_reasoning
+    after_model_callback=broadcast_llm_reasoning,
+    before_agent_callback=trace_agent_start,  # agent spans, nested under CrisisCoordinator's
+    after_agent_callback=trace_agent_end
 )
 
 resource_coordinator = LlmAgent(
@@ -103,7 +114,9 @@ resource_coordinator = LlmAgent(
     tools=[resource_availability_check_adk_tool],
     before_tool_callback=broadcast_tool_event,
     after_tool_callback=broadcast_tool_complete,
-    after_model_callback=broadcast_llm_reasoning
+    after_model_callback=broadcast_llm_reasoning,
+    before_agent_callback=trace_agent_start,  # agent spans, nested under CrisisCoordinator's
+    after_agent_callback=trace_agent_end
 )
 
 evacuation_planner = LlmAgent(
@@ -138,7 +151,9 @@ evacuation_planner = LlmAgent(
     planner=planner,
     before_tool_callback=broadcast_tool_event,
     after_tool_callback=broadcast_tool_complete,
-    after_model_callback=broadcast_llm_reasoning
+    after_model_callback=broadcast_llm_reasoning,
+    before_agent_callback=trace_agent_start,  # agent spans, nested under CrisisCoordinator's
+    after_agent_callback=trace_agent_end
 )
 
 communications_hub = LlmAgent(
@@ -172,5 +187,7 @@ communications_hub = LlmAgent(
     planner=planner,
     before_tool_callback=broadcast_tool_event,
     after_tool_callback=broadcast_tool_complete,
-    after_model_callback=broadcast_llm_reasoning
+    after_model_callback=broadcast_llm_reasoning,
+    before_agent_callback=trace_agent_start,  # agent spans, nested under CrisisCoordinator's
+    after_agent_callback=trace_agent_end
 )
@@ -8,6 +8,7 @@ from google.genai.types import Content, Part
 
 from crisis_response_agent.agent import crisis_supervisor
 from commentator_agent.commentator import LiveCommentator
+from commentator_agent.event_bus import EVENT_BUS_ADDRESS
 
 
 SESSION_ID = "WILDFIRE_DEMO_2025"
@@ -24,13 +25,17 @@ async def hackathon_demo():
         session_id=SESSION_ID
     )
 
-    root = ParallelAgent(
-        name="CrisisResponseSystem",
-        sub_agents=[
-            crisis_supervisor,
-            LiveCommentator()
-        ]
-    )
+    if EVENT_BUS_ADDRESS:
+        # the commentator runs in its own process: python -m commentator_agent.remote
+        root = crisis_supervisor
+    else:
+        root = ParallelAgent(
+            name="CrisisResponseSystem",
+            sub_agents=[
+                crisis_supervisor,
+                LiveCommentator()
+            ]
+        )
 
     runner = Runner(
         agent=root,
@@ -1,15 +1,11 @@
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 from tools.demo_tools import fake_search
-
-import litellm
-
-litellm._turn_on_debug()
+from utils.lazy_llm import lazy_lite_llm
 
 
 # Open LMStudio > Load quantized Gemma3n MLX optimised model > start server
 # Can use `curl -X GET http://localhost:1234/v1/models` if not sure of model ID
-local_model = LiteLlm(
+local_model = lazy_lite_llm(
     model="openai/gemma-3n-e2b-it-mlx",  # lmstudio-community/gemma-3n-E2B-it-MLX-4bit optimised for Mac M2
     api_base="http://localhost:1234/v1",  # usually runs on http://localhost:1234 by default
     api_key="not-needed"  # doesn't require real API key
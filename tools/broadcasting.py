@@ -1,11 +1,64 @@
 from google.adk.tools import BaseTool, ToolContext
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content
 
 from typing import Optional, Dict, Any
 from loguru import logger
-from datetime import datetime
-import time
+
+from commentator_agent.event_bus import EVENT_BUS_ADDRESS, bus_client
+from commentator_agent.events import BroadcastEvent, ToolCallEvent, ToolCompleteEvent, ReasoningEvent, RunCompleteEvent
+from tools.rate_limit import BroadcastLimiter
+from tools.token_usage import metrics_server, token_accounting
+from tools.tracing import span_tracer, CHROME_TRACE_PATH
+
+# Token-bucket limits per agent, tool and event type ($BROADCAST_LIMITS overrides the defaults)
+broadcast_limiter = BroadcastLimiter()
+
+
+def get_event_publisher() -> Any:
+    """
+    Where the callbacks publish: the commentator in this process, or the
+    event bus when it runs in its own process ($EVENT_BUS_ADDRESS).
+    """
+    if EVENT_BUS_ADDRESS:
+        return bus_client()
+    from commentator_agent.commentator import event_publisher
+    return event_publisher
+
+
+def publish_event(event: BroadcastEvent) -> bool:
+    """Publish ``event`` through the rate limiter, with any summaries of shed events. False if it was shed."""
+    admitted = broadcast_limiter.admit(event)
+    publisher = get_event_publisher()
+    for item in admitted:
+        publisher.publish(item)
+    if event not in admitted:
+        logger.debug(f"🚦 {event.agent} {event.event_type} over its rate limit, shed")
+        return False
+    return True
+
+
+def event_session_id(context: Any) -> str:
+    """
+    Session id of the run a callback fires in, used to route its events to
+    the commentator observing that session. Falls back to the invocation id.
+    """
+    session = getattr(context, 'session', None)
+    if session is None:
+        invocation_context = getattr(context, '_invocation_context', None)
+        session = getattr(invocation_context, 'session', None)
+    session_id = getattr(session, 'id', None) or getattr(context, 'session_id', None)
+    return session_id or getattr(context, 'invocation_id', None) or "unknown"
+
+
+def response_model(callback_context: CallbackContext, llm_response: LlmResponse) -> str:
+    """The model that served a response: its reported version, else the model the agent is configured with."""
+    if getattr(llm_response, 'model_version', None):
+        return llm_response.model_version
+    invocation_context = getattr(callback_context, '_invocation_context', None)
+    model = getattr(getattr(invocation_context, 'agent', None), 'model', None)
+    return getattr(model, 'model', model) or "unknown"
 
 
 def broadcast_tool_event(
@@ -17,36 +70,23 @@ def broadcast_tool_event(
     Publishes every impending tool call to the Commentator queue so it can
     narrate. Return None to let the tool run normally.
     """
-    # Import the global queue from commentator module
-    from commentator_agent.commentator import commentator_queue
-
-    event_data = {
-        "agent": tool_context.agent_name,  # Get agent name from tool_context
-        "tool": tool.name,
-        "args": args,
-        "timestamp": time.time(),
-        "start_time": datetime.now().isoformat(),
-        "execution_id": f"{tool_context.agent_name}_{tool.name}_{int(time.time()*1000)}",
-        "agent_state": getattr(tool_context, 'agent_state', None),
-        "previous_tools": getattr(tool_context, 'tool_history', [])[-10:],  # Last 3 tools
-        "workflow_stage": getattr(tool_context, 'workflow_stage', 'unknown'),
-        "session_context": {
-            "total_tools_called": getattr(tool_context, 'tool_count', 0),
-            "session_duration": time.time() - getattr(tool_context, 'session_start', time.time())
-        },
-        "workflow_context": {
-            "current_goal": getattr(tool_context, 'current_objective', 'unknown'),
-            "progress_stage": getattr(tool_context, 'progress_percentage', 0),
-            "parallel_agents": getattr(tool_context, 'active_agents', []),
-            "dependencies": getattr(tool, 'depends_on', []),
-            "expected_next_tools": getattr(tool_context, 'planned_tools', [])
-        }
-    }
+    event_publisher = get_event_publisher()
+
+    # The tool span's id is the call's execution_id, shared with its completion event
+    session_id = event_session_id(tool_context)
+    span = span_tracer.start_tool(tool_context, tool.name, session_id)
+    event_data = ToolCallEvent(
+        tool_context.agent_name,
+        tool.name,
+        args,
+        session_id=session_id,
+        span_id=span.span_id
+    )
 
     # Push event to commentator queue (non-blocking)
     try:
-        commentator_queue.put_nowait(event_data)
-        logger.debug(f"🎯 CALLBACK: Put event in queue. Queue size now: {commentator_queue.qsize()}")
+        publish_event(event_data)
+        logger.debug(f"🎯 CALLBACK: Published event ({event_publisher.pending} awaiting handoff)")
         logger.debug(f"--- Tool {tool.name} called for {tool_context.agent_name} ---")  # Add this debug line
     except Exception as e:
         logger.error(f"Failed to enqueue event: {e}")
@@ -63,20 +103,20 @@ def broadcast_tool_complete(
         tool_response: Any
 ) -> Optional[Dict]:
     """Captures tool completion event with outputs."""
-    from commentator_agent.commentator import commentator_queue
-
-    event_data = {
-        "event_type": "tool_complete",
-        "agent": tool_context.agent_name,
-        "tool": tool.name,
-        "args": args,
-        "tool_response": tool_response,
-        "timestamp": time.time(),
-    }
+    span = span_tracer.end_tool(tool_context, tool.name)
+    event_data = ToolCompleteEvent(
+        tool_context.agent_name,
+        tool.name,
+        args,
+        tool_response,
+        session_id=event_session_id(tool_context),
+        span_id=span.span_id if span is not None else ""
+    )
 
     try:
-        commentator_queue.put_nowait(event_data)
-        logger.debug(f"🎯 TOOL COMPLETE: {tool.name} finished with result: {str(tool_response)[:200]}...")
+        publish_event(event_data)
+        logger.debug(f"🎯 TOOL COMPLETE: {tool.name} finished"
+                     f"{f' in {span.duration_ms:.0f}ms' if span is not None else ''}")
     except Exception as e:
         logger.error(f"Failed to enqueue tool complete event: {e}")
 
@@ -91,32 +131,38 @@ def broadcast_llm_reasoning(
     Captures LLM responses and reasoning for transparency commentary.
     Used as an after_model_callback to broadcast LLM decision-making.
     """
-    # Import the global queue from commentator module
-    from commentator_agent.commentator import commentator_queue
-
-    # Extract reasoning data from the LLM response
-    reasoning_data = {
-        "agent": callback_context.agent_name,
-        "model_response": llm_response.content if hasattr(llm_response, 'content') else str(llm_response),
-        "reasoning_type": "llm_decision",
-        "timestamp": "now",
-        "session_id": callback_context.session_id if hasattr(callback_context, 'session_id') else "unknown",
-        "invocation_id": callback_context.invocation_id if hasattr(callback_context, 'invocation_id') else "unknown"
-    }
-
-    # Add token usage information if available
-    if hasattr(llm_response, 'usage_metadata') and llm_response.usage_metadata:
-        reasoning_data["token_usage"] = {
-            "prompt_tokens": llm_response.usage_metadata.prompt_token_count,
-            "completion_tokens": llm_response.usage_metadata.candidates_token_count,
-            "total_tokens": llm_response.usage_metadata.total_token_count
-        }
+    event_publisher = get_event_publisher()
+
+    # Token usage if available; the response itself is kept by reference and rendered lazily
+    usage = getattr(llm_response, 'usage_metadata', None)
+    token_usage = {
+        "prompt_tokens": usage.prompt_token_count,
+        "completion_tokens": usage.candidates_token_count,
+        "total_tokens": usage.total_token_count
+    } if usage else None
+    if usage:
+        try:
+            metrics_server()
+            model = response_model(callback_context, llm_response)
+            counts = token_accounting.record(callback_context.agent_name, model,
+                                             event_session_id(callback_context), usage)
+            logger.debug(f"💰 {callback_context.agent_name}: {counts.total_tokens} tokens, ${counts.cost_usd:.4f}")
+        except Exception as e:
+            logger.error(f"Failed to account token usage: {e}")
+
+    reasoning_data = ReasoningEvent(
+        callback_context.agent_name,
+        getattr(llm_response, 'content', llm_response),
+        token_usage,
+        session_id=event_session_id(callback_context),
+        invocation_id=getattr(callback_context, 'invocation_id', None) or "unknown"
+    )
 
     # Push reasoning event to commentator queue (non-blocking)
     try:
-        commentator_queue.put_nowait(reasoning_data)
+        publish_event(reasoning_data)
         logger.debug(f"🧠 REASONING: Captured LLM response from {callback_context.agent_name}")
-        logger.debug(f"🧠 Queue size now: {commentator_queue.qsize()}")
+        logger.debug(f"🧠 Awaiting handoff: {event_publisher.pending}")
     except Exception as e:
         logger.error(f"Failed to enqueue LLM reasoning: {e}")
         import traceback
@@ -125,3 +171,56 @@ def broadcast_llm_reasoning(
     return None  # Allow normal LLM response flow
 
 
+def trace_agent_start(callback_context: CallbackContext) -> Optional[Content]:
+    """
+    Opens the agent's span, nested in the span of the agent that transferred
+    to it. Used as a before_agent_callback.
+    """
+    span_tracer.start_agent(callback_context, event_session_id(callback_context))
+    return None  # let the agent run
+
+
+def trace_agent_end(callback_context: CallbackContext) -> Optional[Content]:
+    """Closes the agent's span. Used as an after_agent_callback."""
+    span = span_tracer.end_agent(callback_context)
+    if span is not None:
+        logger.debug(f"⏱️ {span.name} finished in {span.duration_ms:.0f}ms")
+    return None  # keep the agent's own output
+
+
+def broadcast_run_complete(callback_context: CallbackContext) -> Optional[Content]:
+    """
+    Publishes an end-of-run sentinel for the session once the observed agent
+    finishes. Used as an after_agent_callback on the agent the commentator
+    runs alongside, so the commentator can drain and stop straight away.
+    Also closes that agent's span (pair it with trace_agent_start as the
+    before_agent_callback) and writes the run's Chrome trace
+    ($CHROME_TRACE_PATH) on a background thread.
+
+    A transfer back runs the agent again, nested in its own span; those
+    inner exits only close their span, so the run is wrapped up once.
+    """
+    span = span_tracer.end_agent(callback_context)
+    if span is not None and span.parent is not None:
+        logger.debug(f"⏱️ Nested {span.name} finished in {span.duration_ms:.0f}ms")
+        return None  # the outermost run of the agent has not finished yet
+    session_id = event_session_id(callback_context)
+    if CHROME_TRACE_PATH:
+        span_tracer.export_chrome_trace_in_background(CHROME_TRACE_PATH, session_id)
+    logger.debug(f"⏱️ Tool durations: {span_tracer.histograms()['tools']}")
+    try:
+        publish_event(RunCompleteEvent(
+            callback_context.agent_name,
+            session_id=session_id
+        ))
+        logger.debug(f"🏁 RUN COMPLETE: {callback_context.agent_name} finished")
+        spent = token_accounting.session(session_id)
+        if spent.calls:
+            logger.info(f"💰 Session {session_id}: {spent.calls} model calls, {spent.total_tokens} tokens "
+                        f"({spent.thinking_tokens} thinking), ${spent.cost_usd:.4f}")
+        if broadcast_limiter.total_shed():
+            logger.info(f"🚦 Rate limits shed {broadcast_limiter.total_shed()} events: {broadcast_limiter.snapshot()}")
+    except Exception as e:
+        logger.error(f"Failed to enqueue run complete event: {e}")
+
+    return None  # keep the agent's own output
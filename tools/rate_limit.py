@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from commentator_agent.event_channel import is_urgent_alert
+from commentator_agent.events import BroadcastEvent, CollapsedEvent, RunCompleteEvent, ToolCallEvent
+
+WILDCARD = "*"  # rule applied to every agent / tool / event type without its own
+SCOPES = ("agent", "tool", "event_type")
+
+
+class ShedPolicy(str, Enum):
+    """What happens to an event its token bucket has no room for."""
+    SAMPLE = "sample"  # let every Nth one through anyway
+    SUMMARIZE = "summarize"  # publish one summary of the shed events once the bucket has room again
+    COUNT = "count"  # drop it; it only shows up in the stats
+
+
+@dataclass
+class LimitRule:
+    rate: float  # events per second refilled
+    burst: float  # bucket size
+    policy: ShedPolicy = ShedPolicy.SUMMARIZE
+    sample_every: int = 10  # under SAMPLE, the share of over-limit events let through
+
+    def __post_init__(self):
+        self.policy = ShedPolicy(self.policy)
+
+
+# scope -> key (agent name, tool name or event type; "*" for all) -> rule
+DEFAULT_LIMITS: Dict[str, Dict[str, LimitRule]] = {
+    "event_type": {
+        "llm_decision": LimitRule(rate=0.5, burst=5, policy=ShedPolicy.SUMMARIZE),  # model responses
+    },
+    "agent": {
+        WILDCARD: LimitRule(rate=5.0, burst=20, policy=ShedPolicy.SAMPLE, sample_every=5),
+    },
+    "tool": {
+        WILDCARD: LimitRule(rate=3.0, burst=10, policy=ShedPolicy.SUMMARIZE),
+    },
+}
+
+
+def limits_from_env(value: Optional[str] = None) -> Dict[str, Dict[str, LimitRule]]:
+    """
+    DEFAULT_LIMITS overridden by $BROADCAST_LIMITS, JSON shaped like
+    ``{"event_type": {"llm_decision": {"rate": 0.2, "burst": 2, "policy": "count"}}}``.
+    """
+    value = os.getenv("BROADCAST_LIMITS", "") if value is None else value
+    limits = {scope: dict(rules) for scope, rules in DEFAULT_LIMITS.items()}
+    if value:
+        for scope, rules in json.loads(value).items():
+            if scope not in SCOPES:
+                raise ValueError(f"Unknown rate limit scope {scope!r}, expected one of {SCOPES}")
+            for key, rule in rules.items():
+                if rule is None:
+                    limits.setdefault(scope, {}).pop(key, None)  # null lifts a default limit
+                else:
+                    limits.setdefault(scope, {})[key] = LimitRule(**rule)
+    return limits
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+
+@dataclass
+class ShedStats:
+    admitted: int = 0
+    shed: int = 0  # over the limit, including those sampled through
+    sampled: int = 0  # over the limit but let through by SAMPLE
+    summarized: int = 0  # shed events folded into a published summary
+    summaries: int = 0
+
+
+@dataclass
+class _Shed:
+    """Events one bucket shed for one session, waiting to be summarised."""
+    agent: str
+    count: int = 0
+    labels: Counter = field(default_factory=Counter)
+
+
+class BroadcastLimiter:
+    """
+    Token-bucket limits on what the broadcast callbacks publish, per agent,
+    per tool and per event type.
+
+    An event has to fit every bucket that applies to it. If one has no room,
+    that bucket's rule decides: sample it, fold it into a summary published
+    ahead of the next event that fits (or at the end of the run), or just
+    count it. End-of-run sentinels and urgent alerts are never limited.
+    Safe to call from any thread.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, LimitRule]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limits = limits_from_env() if limits is None else limits
+        self.clock = clock
+        self.stats: Dict[Tuple[str, str], ShedStats] = {}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._shed: Dict[Tuple[str, str, str], _Shed] = {}  # (scope, key, session) -> pending summary
+        self._lock = threading.Lock()
+
+    def _rules(self, event: BroadcastEvent) -> List[Tuple[Tuple[str, str], LimitRule]]:
+        keys = (("agent", event.agent),
+                ("tool", event.tool if isinstance(event, ToolCallEvent) else None),
+                ("event_type", event.event_type))
+        rules = []
+        for scope, key in keys:
+            scoped = self.limits.get(scope)
+            if key is None or not scoped:
+                continue
+            rule = scoped.get(key) or scoped.get(WILDCARD)
+            if rule is not None:
+                rules.append(((scope, key), rule))
+        return rules
+
+    def _bucket(self, key: Tuple[str, str], rule: LimitRule, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rule.rate, rule.burst, now)
+            self.stats[key] = ShedStats()
+        return bucket
+
+    def admit(self, event: Any) -> List[Any]:
+        """The events to publish in place of ``event``: itself, possibly preceded by summaries, or nothing."""
+        if not isinstance(event, BroadcastEvent) or is_urgent_alert(event):
+            return [event]
+        if isinstance(event, RunCompleteEvent):
+            with self._lock:
+                return self._flush_session(event.session_id) + [event]
+
+        now = self.clock()
+        with self._lock:
+            rules = self._rules(event)
+            blocking = None
+            for key, rule in rules:
+                if self._bucket(key, rule, now).refill(now) < 1:
+                    blocking = (key, rule)
+                    break
+
+            if blocking is None:
+                for key, _ in rules:
+                    self._buckets[key].tokens -= 1
+                    self.stats[key].admitted += 1
+                return self._flush_keys([key for key, _ in rules], event.session_id) + [event]
+
+            (scope, name), rule = blocking
+            stats = self.stats[(scope, name)]
+            stats.shed += 1
+            if rule.policy is ShedPolicy.SAMPLE and (stats.shed - 1) % rule.sample_every == 0:
+                stats.sampled += 1
+                return [event]
+            if rule.policy is ShedPolicy.SUMMARIZE:
+                pending = self._shed.get((scope, name, event.session_id))
+                if pending is None:
+                    pending = self._shed[(scope, name, event.session_id)] = _Shed(event.agent)
+                pending.count += 1
+                pending.labels[f"{event.agent} {getattr(event, 'tool', event.event_type)}"] += 1
+            return []
+
+    def _flush_keys(self, keys: List[Tuple[str, str]], session_id: str) -> List[CollapsedEvent]:
+        summaries = []
+        for scope, name in keys:
+            pending = self._shed.pop((scope, name, session_id), None)
+            if pending is not None:
+                summaries.append(self._summary(scope, name, session_id, pending))
+        return summaries
+
+    def _flush_session(self, session_id: str) -> List[CollapsedEvent]:
+        keys = [(scope, name) for scope, name, session in self._shed if session == session_id]
+        return self._flush_keys(keys, session_id)
+
+    def _summary(self, scope: str, name: str, session_id: str, pending: _Shed) -> CollapsedEvent:
+        stats = self.stats[(scope, name)]
+        stats.summarized += pending.count
+        stats.summaries += 1
+        labels = ", ".join(f"{label} x{count}" for label, count in pending.labels.most_common(5))
+        return CollapsedEvent(
+            pending.agent,
+            pending.count,
+            f"{pending.count} events over the {scope} limit for {name} ({labels})",
+            session_id=session_id
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Shed counts per limited key, e.g. ``{"event_type:llm_decision": {"shed": 40, ...}}``."""
+        with self._lock:
+            return {f"{scope}:{name}": vars(stats).copy() for (scope, name), stats in self.stats.items()
+                    if stats.shed}
+
+    def total_shed(self) -> int:
+        return sum(stats.shed - stats.sampled for stats in self.stats.values())
+
+
+if __name__ == "__main__":
+    # A chatty agent tree: reasoning every 50ms from 4 agents, bursts of tool calls, for 5 simulated seconds
+    from commentator_agent.events import ReasoningEvent, ToolCompleteEvent
+
+    clock = [0.0]  # simulated, so the run is instant and repeatable
+    limiter = BroadcastLimiter(DEFAULT_LIMITS, clock=lambda: clock[0])
+    published = Counter()
+    offered = Counter()
+    for tick in range(100):
+        clock[0] = tick * 0.05
+        for agent in ("CrisisCoordinator", "AlertMonitor", "EvacuationPlanner", "ResourceCoordinator"):
+            events = [ReasoningEvent(agent, "thinking " * 200, session_id="demo")]
+            if tick % 10 == 0:
+                events += [ToolCallEvent(agent, "emergency_alert_scan", {"n": n}, session_id="demo")
+                           for n in range(5)]
+            if tick == 50:
+                events.append(ToolCompleteEvent(agent, "emergency_alert_scan", {}, {"alerts": "CRITICAL: fire"},
+                                                session_id="demo"))
+            for event in events:
+                offered[event.event_type] += 1
+                for admitted in limiter.admit(event):
+                    published[admitted.event_type] += 1
+    for admitted in limiter.admit(RunCompleteEvent("CrisisCoordinator", session_id="demo")):
+        published[admitted.event_type] += 1
+
+    print(f"offered   {dict(offered)}")
+    print(f"published {dict(published)}")
+    logger.info(f"🚦 shed {limiter.total_shed()} events: {json.dumps(limiter.snapshot(), indent=1)}")
@@ -0,0 +1,413 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+TOKEN_METRICS_HOST = os.getenv("TOKEN_METRICS_HOST", "127.0.0.1")
+TOKEN_METRICS_PORT = int(os.getenv("TOKEN_METRICS_PORT", "0"))  # 0 disables the endpoint
+RATE_WINDOW_S = 60  # rolling rates are averaged over this many seconds
+MAX_SESSIONS = 1000  # sessions kept, least recently active dropped first; agent and model totals keep counting
+MAX_REQUEST_BYTES = 8192
+
+
+@dataclass
+class ModelPrice:
+    """USD per million tokens."""
+    input: float
+    output: float  # thinking tokens are billed as output
+    cached_input: Optional[float] = None  # defaults to the input price
+
+
+# Model name (provider prefix optional) -> price; a served version such as
+# "gpt-4o-2024-08-06" takes the price of its longest matching prefix
+DEFAULT_PRICES: Dict[str, ModelPrice] = {
+    "gpt-4o": ModelPrice(input=2.50, output=10.00, cached_input=1.25),
+    "gpt-4o-mini": ModelPrice(input=0.15, output=0.60, cached_input=0.075),
+    "gemini-2.5-pro": ModelPrice(input=1.25, output=10.00, cached_input=0.31),
+    "gemini-2.5-flash": ModelPrice(input=0.30, output=2.50, cached_input=0.075),
+    "gemini-2.0-flash": ModelPrice(input=0.10, output=0.40, cached_input=0.025),
+    "gemma-3n": ModelPrice(input=0.0, output=0.0),  # local, through LM Studio
+}
+
+
+def prices_from_env(value: Optional[str] = None) -> Dict[str, ModelPrice]:
+    """
+    DEFAULT_PRICES overridden by $TOKEN_PRICES, JSON shaped like
+    ``{"gpt-4o": {"input": 2.5, "output": 10, "cached_input": 1.25}}``.
+    """
+    value = os.getenv("TOKEN_PRICES", "") if value is None else value
+    prices = dict(DEFAULT_PRICES)
+    if value:
+        for model, price in json.loads(value).items():
+            if price is None:
+                prices.pop(model, None)
+            else:
+                prices[model] = ModelPrice(**price)
+    return prices
+
+
+def _bare_model(model: str) -> str:
+    return model.rsplit("/", 1)[-1].lower()
+
+
+@dataclass
+class TokenCounts:
+    calls: int = 0
+    prompt_tokens: int = 0  # including cached
+    cached_tokens: int = 0
+    completion_tokens: int = 0  # excluding thinking
+    thinking_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, other: "TokenCounts") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_tokens += other.cached_tokens
+        self.completion_tokens += other.completion_tokens
+        self.thinking_tokens += other.thinking_tokens
+        self.total_tokens += other.total_tokens
+        self.cost_usd += other.cost_usd
+
+
+def counts_from_usage(usage: Any) -> TokenCounts:
+    """
+    TokenCounts for one model response from its ``usage_metadata``. Gemini
+    reports thinking tokens beside the candidate tokens, OpenAI through
+    LiteLLM inside them; the total tells the two apart.
+    """
+    prompt = usage.prompt_token_count or 0
+    candidates = usage.candidates_token_count or 0
+    thoughts = getattr(usage, "thoughts_token_count", None) or 0
+    total = usage.total_token_count or prompt + candidates + thoughts
+    if thoughts and total < prompt + candidates + thoughts:
+        candidates = max(candidates - thoughts, 0)  # already counted in the completion
+    return TokenCounts(
+        calls=1,
+        prompt_tokens=prompt,
+        cached_tokens=getattr(usage, "cached_content_token_count", None) or 0,
+        completion_tokens=candidates,
+        thinking_tokens=thoughts,
+        total_tokens=total,
+    )
+
+
+class RollingRate:
+    """Tokens, calls and cost per second over the last ``window_s`` seconds, in one-second buckets."""
+
+    __slots__ = ("window_s", "buckets")
+
+    def __init__(self, window_s: int = RATE_WINDOW_S):
+        self.window_s = window_s
+        self.buckets: Deque[List[float]] = deque()  # [second, calls, tokens, cost_usd]
+
+    def add(self, now: float, counts: TokenCounts) -> None:
+        second = int(now)
+        if self.buckets and self.buckets[-1][0] == second:
+            bucket = self.buckets[-1]
+            bucket[1] += counts.calls
+            bucket[2] += counts.total_tokens
+            bucket[3] += counts.cost_usd
+        else:
+            self.buckets.append([second, counts.calls, counts.total_tokens, counts.cost_usd])
+        self._expire(second)
+
+    def _expire(self, second: int) -> None:
+        while self.buckets and self.buckets[0][0] <= second - self.window_s:
+            self.buckets.popleft()
+
+    def rates(self, now: float) -> Dict[str, float]:
+        self._expire(int(now))
+        calls = sum(bucket[1] for bucket in self.buckets)
+        tokens = sum(bucket[2] for bucket in self.buckets)
+        cost = sum(bucket[3] for bucket in self.buckets)
+        return {
+            "calls_per_min": round(calls * 60 / self.window_s, 3),
+            "tokens_per_s": round(tokens / self.window_s, 3),
+            "cost_usd_per_hour": round(cost * 3600 / self.window_s, 6),
+        }
+
+
+class TokenUsageAggregator:
+    """
+    Token counts and cost of every model response, per agent, per model,
+    per (agent, model) and per session, with rolling rates per agent and
+    per model. Fed by the after_model callback; safe from any thread.
+    Models missing from the price table are counted at no cost and listed
+    in ``unpriced``.
+    """
+
+    def __init__(self, prices: Optional[Dict[str, ModelPrice]] = None, window_s: int = RATE_WINDOW_S,
+                 max_sessions: int = MAX_SESSIONS, clock: Callable[[], float] = time.time):
+        self.prices = prices_from_env() if prices is None else prices
+        self.window_s = window_s
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.started = clock()
+        self.unpriced: Dict[str, int] = {}  # model -> responses counted at no cost
+        self._by_agent_model: Dict[Tuple[str, str], TokenCounts] = {}
+        self._by_session: "OrderedDict[str, TokenCounts]" = OrderedDict()
+        self._agent_rates: Dict[str, RollingRate] = {}
+        self._model_rates: Dict[str, RollingRate] = {}
+        self._price_cache: Dict[str, Optional[ModelPrice]] = {}
+        self._lock = threading.Lock()
+
+    def price(self, model: str) -> Optional[ModelPrice]:
+        """The price of ``model``: an exact entry, else the longest entry it starts with, ignoring providers."""
+        if model not in self._price_cache:
+            bare = _bare_model(model)
+            exact = self.prices.get(model)
+            matches = [key for key in self.prices if bare.startswith(_bare_model(key))]
+            self._price_cache[model] = exact or (self.prices[max(matches, key=len)] if matches else None)
+        return self._price_cache[model]
+
+    def cost(self, model: str, counts: TokenCounts) -> Optional[float]:
+        price = self.price(model)
+        if price is None:
+            return None
+        cached_price = price.input if price.cached_input is None else price.cached_input
+        return ((counts.prompt_tokens - counts.cached_tokens) * price.input
+                + counts.cached_tokens * cached_price
+                + (counts.completion_tokens + counts.thinking_tokens) * price.output) / 1e6
+
+    def record(self, agent: str, model: str, session_id: str, usage: Any) -> TokenCounts:
+        """Account one model response's ``usage_metadata``; returns its counts and cost."""
+        counts = counts_from_usage(usage)
+        now = self.clock()
+        with self._lock:
+            cost = self.cost(model, counts)
+            if cost is None:
+                self.unpriced[model] = self.unpriced.get(model, 0) + 1
+            else:
+                counts.cost_usd = cost
+            totals = self._by_agent_model.get((agent, model))
+            if totals is None:
+                totals = self._by_agent_model[(agent, model)] = TokenCounts()
+            totals.add(counts)
+
+            session = self._by_session.pop(session_id, None) or TokenCounts()
+            session.add(counts)
+            self._by_session[session_id] = session  # most recently active last
+            if len(self._by_session) > self.max_sessions:
+                self._by_session.popitem(last=False)
+
+            for rates, key in ((self._agent_rates, agent), (self._model_rates, model)):
+                rate = rates.get(key)
+                if rate is None:
+                    rate = rates[key] = RollingRate(self.window_s)
+                rate.add(now, counts)
+        return counts
+
+    def _totals(self, pick: Callable[[Tuple[str, str]], str]) -> Dict[str, TokenCounts]:
+        totals: Dict[str, TokenCounts] = {}
+        for key, counts in self._by_agent_model.items():
+            totals.setdefault(pick(key), TokenCounts()).add(counts)
+        return totals
+
+    def session(self, session_id: str) -> TokenCounts:
+        with self._lock:
+            return TokenCounts(**asdict(self._by_session.get(session_id, TokenCounts())))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything, as JSON-ready dicts; costs in USD."""
+        now = self.clock()
+        with self._lock:
+            def row(counts: TokenCounts, rate: Optional[RollingRate] = None) -> Dict[str, Any]:
+                data = asdict(counts)
+                data["cost_usd"] = round(data["cost_usd"], 6)
+                if rate is not None:
+                    data.update(rate.rates(now))
+                return data
+
+            return {
+                "uptime_s": round(now - self.started, 1),
+                "rate_window_s": self.window_s,
+                "agents": {agent: row(counts, self._agent_rates.get(agent))
+                           for agent, counts in self._totals(lambda key: key[0]).items()},
+                "models": {model: row(counts, self._model_rates.get(model))
+                           for model, counts in self._totals(lambda key: key[1]).items()},
+                "agent_models": [{"agent": agent, "model": model, **row(counts)}
+                                 for (agent, model), counts in self._by_agent_model.items()],
+                "sessions": {session_id: row(counts) for session_id, counts in self._by_session.items()},
+                "unpriced": dict(self.unpriced),
+            }
+
+    def prometheus(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                lines.append(f"{name}{{{rendered}}} {value}")
+
+        rows = snapshot["agent_models"]
+        metric("llm_calls_total", "counter", "Model responses.",
+               [({"agent": r["agent"], "model": r["model"]}, r["calls"]) for r in rows])
+        metric("llm_tokens_total", "counter", "Tokens by kind; prompt includes cached.",
+               [({"agent": r["agent"], "model": r["model"], "kind": kind}, r[f"{kind}_tokens"])
+                for r in rows for kind in ("prompt", "cached", "completion", "thinking")])
+        metric("llm_cost_usd_total", "counter", "Cost at the configured prices.",
+               [({"agent": r["agent"], "model": r["model"]}, r["cost_usd"]) for r in rows])
+        metric("llm_session_cost_usd", "gauge", "Cost of each recent session so far.",
+               [({"session": session_id}, r["cost_usd"]) for session_id, r in snapshot["sessions"].items()])
+        for scope in ("agent", "model"):
+            for key, help_text in (("tokens_per_s", "Tokens per second"),
+                                   ("cost_usd_per_hour", "Cost per hour at the current rate")):
+                metric(f"llm_{scope}_{key}", "gauge", f"{help_text} over the last {self.window_s}s.",
+                       [({scope: name}, r[key]) for name, r in snapshot[f"{scope}s"].items()])
+        metric("llm_unpriced_calls_total", "counter", "Responses from models missing from the price table.",
+               [({"model": model}, count) for model, count in snapshot["unpriced"].items()])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class TokenMetricsServer:
+    """
+    Serves an aggregator's snapshot over HTTP: ``GET /metrics`` in the
+    Prometheus text format, ``GET /usage`` as JSON. Runs on its own thread
+    and event loop, so scrapes never wait on the agents' loop.
+    """
+
+    def __init__(self, aggregator: TokenUsageAggregator, host: str = TOKEN_METRICS_HOST,
+                 port: int = TOKEN_METRICS_PORT):
+        self.aggregator = aggregator
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="token-metrics", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        logger.info(f"💰 Token usage on http://{self.host}:{self.port}/metrics (Prometheus) and /usage (JSON)")
+
+    async def _start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+
+        async def stop() -> None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(stop(), self._loop).result(timeout=1)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+            parts = head.split(b"\r\n", 1)[0].decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(head) <= MAX_REQUEST_BYTES and len(parts) == 3 \
+                and parts[0] == "GET" else None
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            path = None
+
+        if path == "/metrics":
+            status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+            body = self.aggregator.prometheus().encode()
+        elif path == "/usage":
+            status, content_type = "200 OK", "application/json"
+            body = json.dumps(self.aggregator.snapshot()).encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b""
+        try:
+            writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                          f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+# Global aggregator fed by the after_model callbacks ($TOKEN_PRICES overrides the default prices)
+token_accounting = TokenUsageAggregator()
+
+# Its endpoint, started on the first response accounted when $TOKEN_METRICS_PORT is set
+_metrics_server: Optional[TokenMetricsServer] = None
+_metrics_lock = threading.Lock()
+
+
+def metrics_server() -> Optional[TokenMetricsServer]:
+    global _metrics_server
+    if not TOKEN_METRICS_PORT:
+        return None
+    with _metrics_lock:
+        if _metrics_server is None:
+            _metrics_server = TokenMetricsServer(token_accounting)
+            _metrics_server.start()
+            atexit.register(_metrics_server.close)
+    return _metrics_server
+
+
+if __name__ == "__main__":
+    # Simulated run: the coordinator thinks hard, specialists answer briefly; then scrape both endpoints
+    import random
+    import urllib.request
+    from types import SimpleNamespace
+
+    clock = [1_000_000.0]  # simulated, so rates are repeatable
+    aggregator = TokenUsageAggregator(DEFAULT_PRICES, clock=lambda: clock[0])
+    agents = {
+        "CrisisCoordinator": ("gemini-2.5-flash", 6000),  # thinking budget 8192
+        "AlertMonitor": ("openai/gpt-4o-2024-08-06", 0),
+        "EvacuationPlanner": ("openai/gpt-4o-2024-08-06", 0),
+        "ResourceCoordinator": ("openai/gpt-4o-2024-08-06", 0),
+        "CommunicationsHub": ("local/gemma-3n-e4b", 0),
+    }
+    for tick in range(120):
+        clock[0] += 0.5
+        for agent, (model, thinking) in agents.items():
+            prompt = random.randint(2000, 6000)
+            completion = random.randint(100, 800)
+            thoughts = random.randint(thinking // 2, thinking) if thinking else 0
+            usage = SimpleNamespace(prompt_token_count=prompt, candidates_token_count=completion,
+                                    thoughts_token_count=thoughts or None,
+                                    cached_content_token_count=prompt // 2 if tick else 0,
+                                    total_token_count=prompt + completion + thoughts)
+            aggregator.record(agent, model, f"session-{tick // 40}", usage)
+
+    for agent, row in sorted(aggregator.snapshot()["agents"].items(), key=lambda item: -item[1]["cost_usd"]):
+        print(f"{agent:20} {row['calls']:4} calls {row['total_tokens']:>9,} tokens "
+              f"${row['cost_usd']:8.4f}  now {row['tokens_per_s']:8.1f} tok/s ${row['cost_usd_per_hour']:.2f}/h")
+
+    server = TokenMetricsServer(aggregator, port=0)
+    server.start()
+    metrics = urllib.request.urlopen(f"http://{server.host}:{server.port}/metrics").read().decode()
+    print("\n".join(line for line in metrics.splitlines() if "llm_cost_usd_total" in line))
+    usage = json.loads(urllib.request.urlopen(f"http://{server.host}:{server.port}/usage").read())
+    print(f"💰 sessions {json.dumps(usage['sessions'], indent=1)}")
+    server.close()
+
+    # Overhead of accounting one response on the callback path
+    usage = SimpleNamespace(prompt_token_count=4000, candidates_token_count=300, thoughts_token_count=None,
+                            cached_content_token_count=0, total_token_count=4300)
+    n = 100_000
+    started = time.perf_counter()
+    for i in range(n):
+        aggregator.record("bench", "openai/gpt-4o", "bench", usage)
+    print(f"💰 {(time.perf_counter() - started) / n * 1e6:.2f}µs per response accounted")
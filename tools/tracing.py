@@ -0,0 +1,288 @@
+import bisect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+CHROME_TRACE_PATH = os.getenv("CHROME_TRACE_PATH", "")  # where each finished run's trace is written; empty disables
+MAX_SPANS = 100_000  # finished spans kept for export; histograms keep counting past it
+# Histogram bucket upper bounds, in milliseconds
+DURATION_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, float("inf"))
+
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """One timed piece of a run: an agent's turn or a tool call."""
+
+    __slots__ = ("span_id", "parent", "kind", "name", "agent", "session_id", "start_ns", "end_ns")
+
+    def __init__(self, kind: str, name: str, agent: str, parent: Optional["Span"], session_id: str = ""):
+        self.span_id = f"{os.getpid():x}-{next(_span_ids):x}"  # unique in the process, cheap, never reused
+        self.parent = parent
+        self.kind = kind
+        self.name = name
+        self.agent = agent
+        self.session_id = session_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent is not None else None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def __repr__(self) -> str:
+        return f"Span({self.kind} {self.name} {self.span_id} parent={self.parent_id} {self.duration_ms:.1f}ms)"
+
+
+class DurationHistogram:
+    """Durations in fixed log-spaced buckets, so percentiles stay cheap however many are recorded."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(DURATION_BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        self.counts[bisect.bisect_left(DURATION_BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile_ms(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at the slowest duration seen)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(DURATION_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile_ms(0.5), 2),
+            "p95_ms": round(self.percentile_ms(0.95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {f"<={bound}": count for bound, count in zip(DURATION_BUCKETS_MS, self.counts) if count},
+        }
+
+
+# The agent span the current task is running in; ParallelAgent branches each get their own copy
+_current_agent_span: ContextVar[Optional[Span]] = ContextVar("current_agent_span", default=None)
+
+
+class SpanTracer:
+    """
+    Spans for agent turns and tool calls, built from the ADK callbacks.
+
+    A tool call's start and completion share one span id (matched on ADK's
+    function_call_id). Agent spans nest: an agent that CrisisCoordinator
+    transfers to is a child of the coordinator's span, and tool spans are
+    children of the agent span they ran in. An agent re-entered under the
+    same invocation and branch (the coordinator again, after a transfer back)
+    stacks a new span on the one still open, and each end closes the newest. Finished spans feed per-tool and
+    per-agent duration histograms and can be exported as Chrome trace-event
+    JSON (chrome://tracing or https://ui.perfetto.dev). Safe from any thread.
+    """
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.finished: Deque[Span] = deque(maxlen=max_spans)
+        self.tool_histograms: Dict[str, DurationHistogram] = {}
+        self.agent_histograms: Dict[str, DurationHistogram] = {}
+        self.unmatched = 0  # completions whose start was never seen
+        self._open: Dict[Tuple[str, ...], Span] = {}
+        self._open_agents: Dict[Tuple[str, ...], List[Span]] = {}  # a stack per key, innermost last
+        self._epoch_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    @staticmethod
+    def _agent_key(context: Any) -> Tuple[str, ...]:
+        return ("agent", getattr(context, "invocation_id", "") or "", getattr(context, "branch", None) or "",
+                context.agent_name)
+
+    @staticmethod
+    def _tool_key(tool_context: Any, tool_name: str) -> Tuple[str, ...]:
+        call_id = getattr(tool_context, "function_call_id", None)
+        if call_id:
+            return "tool", call_id
+        return "tool", getattr(tool_context, "invocation_id", "") or "", tool_context.agent_name, tool_name
+
+    def start_agent(self, context: Any, session_id: str = "") -> Span:
+        span = Span("agent", context.agent_name, context.agent_name, _current_agent_span.get(), session_id)
+        _current_agent_span.set(span)
+        with self._lock:
+            self._open_agents.setdefault(self._agent_key(context), []).append(span)
+        return span
+
+    def end_agent(self, context: Any) -> Optional[Span]:
+        key = self._agent_key(context)
+        with self._lock:
+            stack = self._open_agents.get(key)
+            if not stack:
+                self.unmatched += 1
+                return None
+            span = stack.pop()
+            if not stack:
+                del self._open_agents[key]
+            self._finish(span, self.agent_histograms)
+        if _current_agent_span.get() is span:
+            _current_agent_span.set(span.parent)
+        return span
+
+    def start_tool(self, tool_context: Any, tool_name: str, session_id: str = "") -> Span:
+        span = Span("tool", tool_name, tool_context.agent_name, _current_agent_span.get(), session_id)
+        with self._lock:
+            self._open[self._tool_key(tool_context, tool_name)] = span
+        return span
+
+    def end_tool(self, tool_context: Any, tool_name: str) -> Optional[Span]:
+        with self._lock:
+            span = self._open.pop(self._tool_key(tool_context, tool_name), None)
+            if span is None:
+                self.unmatched += 1
+                return None
+            self._finish(span, self.tool_histograms)
+        return span
+
+    def _finish(self, span: Span, histograms: Dict[str, DurationHistogram]) -> None:
+        span.end_ns = time.perf_counter_ns()
+        histogram = histograms.get(span.name)
+        if histogram is None:
+            histogram = histograms[span.name] = DurationHistogram()
+        histogram.record(span.duration_ms)
+        self.finished.append(span)
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                "tools": {name: hist.snapshot() for name, hist in self.tool_histograms.items()},
+                "agents": {name: hist.snapshot() for name, hist in self.agent_histograms.items()},
+            }
+
+    def chrome_trace(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Finished spans (of one session, if given) as Chrome trace events, one row per agent."""
+        with self._lock:
+            spans = [span for span in self.finished if session_id is None or span.session_id == session_id]
+        rows: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        pid = os.getpid()
+        for span in sorted(spans, key=lambda span: span.start_ns):
+            tid = rows.setdefault(span.agent, len(rows) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": (span.start_ns - self._epoch_ns) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {"span_id": span.span_id, "parent_id": span.parent_id, "session_id": span.session_id},
+            })
+        for agent, tid in rows.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": agent}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"histograms": self.histograms()}}
+
+    def export_chrome_trace(self, path: str, session_id: Optional[str] = None) -> None:
+        with self._export_lock:  # exports of different sessions to one path must not interleave
+            trace = self.chrome_trace(session_id)
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        logger.info(f"⏱️ Wrote {len(trace['traceEvents'])} trace events to {path}")
+
+    def export_chrome_trace_in_background(self, path: str, session_id: Optional[str] = None) -> threading.Thread:
+        """
+        ``export_chrome_trace`` on its own thread, so a callback on the agents'
+        event loop never serializes and writes up to MAX_SPANS spans itself.
+        The thread is not a daemon: the interpreter finishes the write before exiting.
+        """
+        def export() -> None:
+            try:
+                self.export_chrome_trace(path, session_id)
+            except OSError as e:
+                logger.error(f"Failed to write Chrome trace: {e}")
+
+        thread = threading.Thread(target=export, name="chrome-trace-export")
+        thread.start()
+        return thread
+
+
+# Global tracer shared by the broadcast callbacks
+span_tracer = SpanTracer()
+
+
+if __name__ == "__main__":
+    # Simulated run: a coordinator transferring to two specialists in parallel, each calling tools
+    import asyncio
+    import random
+    from types import SimpleNamespace
+
+    tracer = SpanTracer()
+    call_ids = itertools.count()
+
+    async def tool(agent: str, name: str, seconds: float) -> None:
+        context = SimpleNamespace(agent_name=agent, invocation_id="inv", function_call_id=f"call-{next(call_ids)}")
+        tracer.start_tool(context, name, "demo")
+        await asyncio.sleep(seconds)
+        tracer.end_tool(context, name)
+
+    async def agent(name: str, tools: List[str], branch: str) -> None:
+        context = SimpleNamespace(agent_name=name, invocation_id="inv", branch=branch)
+        tracer.start_agent(context, "demo")
+        for tool_name in tools:
+            await tool(name, tool_name, random.uniform(0.01, 0.08))
+        tracer.end_agent(context)
+
+    async def main() -> None:
+        coordinator = SimpleNamespace(agent_name="CrisisCoordinator", invocation_id="inv", branch="root")
+        tracer.start_agent(coordinator, "demo")
+        await tool("CrisisCoordinator", "assess_situation", 0.02)
+        await asyncio.gather(
+            agent("AlertMonitor", ["emergency_alert_scan"] * 3, "root.AlertMonitor"),
+            agent("EvacuationPlanner", ["route_planner", "shelter_lookup"], "root.EvacuationPlanner"),
+        )
+        # a transfer back runs the coordinator again, nested, under the same invocation and branch
+        tracer.start_agent(coordinator, "demo")
+        await tool("CrisisCoordinator", "synthesize", 0.01)
+        tracer.end_agent(coordinator)
+        tracer.end_agent(coordinator)
+
+    asyncio.run(main())
+    roots = [span for span in tracer.finished if span.parent is None]
+    assert len(roots) == 1 and roots[0].name == "CrisisCoordinator", roots
+    assert [span.parent for span in tracer.finished if span.name == "CrisisCoordinator" and span.parent] == roots
+    assert tracer.unmatched == 0 and not tracer._open_agents
+    for span in tracer.finished:
+        print(span)
+    print(json.dumps({name: {key: value for key, value in hist.items() if key != "buckets"}
+                      for name, hist in tracer.histograms()["tools"].items()}, indent=1))
+    tracer.export_chrome_trace(os.path.join(os.getenv("TMPDIR", "/tmp"), "crisis_trace.json"))
+
+    # Overhead of one traced tool call (start + end) on the callback path
+    context = SimpleNamespace(agent_name="bench", invocation_id="inv", function_call_id="")
+    n = 100_000
+    started = time.perf_counter()
+    for i in range(n):
+        context.function_call_id = f"bench-{i}"
+        tracer.start_tool(context, "noop")
+        tracer.end_tool(context, "noop")
+    print(f"⏱️ {(time.perf_counter() - started) / n * 1e6:.2f}µs per traced tool call")
@@ -0,0 +1,225 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+INPUT_RATE = 24000  # Gemini Live outputs at 24kHz
+OUTPUT_RATE = int(os.getenv("AUDIO_OUTPUT_RATE", str(INPUT_RATE)))  # e.g. 48000 for the broadcast chain
+TARGET_RMS_DBFS = -20.0  # loudness every segment is normalized towards
+MAX_GAIN_DB = 12.0  # never boost quiet speech by more than this
+EDGE_FADE_MS = 15.0  # fade-in at the head and fade-out at the tail of every segment
+SILENCE_DBFS = -50.0  # chunks quieter than this do not count towards segment loudness
+
+_INT16_SCALE = 32768.0
+
+
+def _db_to_linear(db: float) -> float:
+    return 10 ** (db / 20)
+
+
+@dataclass
+class ProcessorStats:
+    chunks: int = 0
+    input_samples: int = 0
+    output_samples: int = 0
+    segments: int = 0
+    processing_s: float = 0.0
+
+    def realtime_factor(self, input_rate: int = INPUT_RATE) -> float:
+        """Seconds of audio processed per second of CPU time."""
+        return (self.input_samples / input_rate) / self.processing_s if self.processing_s else 0.0
+
+
+class StreamingResampler:
+    """
+    Linear-interpolation resampler that keeps its phase and last sample
+    across chunks, so chunk boundaries do not produce discontinuities.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.step = input_rate / output_rate  # input samples per output sample
+        self._last = 0.0  # final input sample of the previous chunk
+        self._phase = 1.0  # position of the next output sample, 0 = ``_last``
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.input_rate == self.output_rate or len(samples) == 0:
+            return samples
+        n = len(samples)
+        count = int(np.ceil((n - self._phase) / self.step)) if n > self._phase else 0
+        if count <= 0:
+            self._phase -= n
+            self._last = float(samples[-1])
+            return samples[:0]
+        positions = self._phase + self.step * np.arange(count)
+        source = np.concatenate(([self._last], samples))
+        out = np.interp(positions, np.arange(n + 1), source).astype(np.float32)
+        self._phase = positions[-1] + self.step - n
+        self._last = float(samples[-1])
+        return out
+
+
+class AudioProcessor:
+    """
+    Chunk-level post-processing between the commentator and the audio sink:
+    streaming resample, per-segment loudness normalization and short fades
+    at segment edges. Everything is vectorized; there are no per-sample
+    Python loops.
+
+    Segments never overlap: the boundary between two narrations is the first
+    one fading out over ``EDGE_FADE_MS`` followed by the next fading in over
+    the same length, so neither clicks on a non-zero sample. The last
+    ``EDGE_FADE_MS`` of output are held back because the fade-out can only be
+    applied once ``end_segment`` says the segment is over.
+    """
+
+    def __init__(
+            self,
+            input_rate: int = INPUT_RATE,
+            output_rate: int = OUTPUT_RATE,
+            target_rms_dbfs: float = TARGET_RMS_DBFS,
+            max_gain_db: float = MAX_GAIN_DB,
+            edge_fade_ms: float = EDGE_FADE_MS
+    ):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.target_rms = _db_to_linear(target_rms_dbfs)
+        self.max_gain = _db_to_linear(max_gain_db)
+        self.min_gain = 1 / self.max_gain
+        self.silence_rms = _db_to_linear(SILENCE_DBFS)
+        self.stats = ProcessorStats()
+        self._resampler = StreamingResampler(input_rate, output_rate)
+
+        fade_len = max(1, int(output_rate * edge_fade_ms / 1000))
+        ramp = 0.5 - 0.5 * np.cos(np.linspace(0, np.pi, fade_len, dtype=np.float32))  # raised cosine
+        self._fade_in = ramp.astype(np.float32)
+        self._fade_out = self._fade_in[::-1].copy()
+        self._tail: Optional[np.ndarray] = None  # held-back output of the open segment
+        self._segment_start = True
+        self._gain = 1.0
+        self._energy = 0.0
+        self._measured = 0
+
+    def begin_segment(self) -> None:
+        """The next chunk starts a new narration segment."""
+        self._segment_start = True
+        self._energy = 0.0
+        self._measured = 0
+        self.stats.segments += 1
+
+    def end_segment(self) -> bytes:
+        """Close the current segment and return its held-back tail, faded out."""
+        tail, self._tail = self._tail, None
+        if tail is None or len(tail) == 0:
+            return b""
+        tail = tail * self._fade_out[-len(tail):]
+        self.stats.output_samples += len(tail)
+        return self._to_pcm(tail)
+
+    def _segment_gain(self, samples: np.ndarray) -> float:
+        rms = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        if rms >= self.silence_rms:
+            self._energy += rms * rms * len(samples)
+            self._measured += len(samples)
+        if not self._measured:
+            return self._gain
+        segment_rms = np.sqrt(self._energy / self._measured)
+        return float(np.clip(self.target_rms / segment_rms, self.min_gain, self.max_gain))
+
+    @staticmethod
+    def _to_pcm(samples: np.ndarray) -> bytes:
+        return np.clip(samples * _INT16_SCALE, -_INT16_SCALE, _INT16_SCALE - 1).astype("<i2").tobytes()
+
+    def process(self, chunk: bytes) -> bytes:
+        """Turn one chunk of input int16 PCM into output int16 PCM."""
+        started = time.perf_counter()
+        samples = np.frombuffer(chunk, dtype="<i2").astype(np.float32) / _INT16_SCALE
+        self.stats.chunks += 1
+        self.stats.input_samples += len(samples)
+
+        # gain ramps from the previous value so corrections never step audibly
+        gain = self._segment_gain(samples)
+        samples *= np.linspace(self._gain, gain, len(samples), dtype=np.float32)
+        self._gain = gain
+
+        out = self._resampler.process(samples)
+        fade_len = len(self._fade_in)
+        if self._segment_start and len(out):
+            self._segment_start = False
+            head = min(fade_len, len(out))
+            out[:head] *= self._fade_in[:head]
+        if self._tail is not None:
+            out = np.concatenate((self._tail, out))
+
+        self._tail = out[-fade_len:].copy()
+        out = out[:-fade_len]
+        self.stats.output_samples += len(out)
+        self.stats.processing_s += time.perf_counter() - started
+        return self._to_pcm(out)
+
+
+class PcmFadeOut:
+    """
+    Fades the head of an int16 PCM buffer out to silence, in place, for the
+    real-time render callback: the ramp and the scratch space are set up
+    here, so ``apply`` is two vectorized operations and allocates no buffers.
+    """
+
+    def __init__(self, buffer: bytearray, max_samples: int):
+        self._samples = np.frombuffer(buffer, dtype="<i2")  # a view: writes land in ``buffer``
+        self._countdown = np.arange(max_samples, 0, -1, dtype=np.float32)  # max_samples .. 1
+        self._gains = np.empty(max_samples, dtype=np.float32)
+
+    def apply(self, size: int) -> None:
+        """Fade the first ``size`` bytes linearly from full level to silence."""
+        n = min(size // 2, len(self._gains))
+        if n <= 0:
+            return
+        gains = self._gains[:n]
+        np.divide(self._countdown[-n:], n, out=gains)  # (n - i) / n, whatever n is
+        samples = self._samples[:n]
+        np.multiply(samples, gains, out=samples, casting="unsafe")
+
+
+if __name__ == "__main__":
+    # Benchmark: one hour of synthetic narration in 100ms chunks, 24 kHz -> 48 kHz
+    rate, chunk_s, total_s, segment_s = INPUT_RATE, 0.1, 3600, 8
+    t = np.arange(int(rate * chunk_s)) / rate
+    chunks = []
+    for i in range(8):
+        level = 0.05 + 0.1 * i  # segments at very different loudness
+        tone = level * np.sin(2 * np.pi * (180 + 40 * i) * t) * (1 + 0.3 * np.sin(2 * np.pi * 3 * t))
+        chunks.append((tone * 32767).astype("<i2").tobytes())
+
+    processor = AudioProcessor(output_rate=48000)
+    out_bytes = 0
+    wall = time.perf_counter()
+    for n in range(int(total_s / chunk_s)):
+        if n % int(segment_s / chunk_s) == 0:
+            out_bytes += len(processor.end_segment())
+            processor.begin_segment()
+        out_bytes += len(processor.process(chunks[n % len(chunks)]))
+    out_bytes += len(processor.end_segment())
+    wall = time.perf_counter() - wall
+
+    stats = processor.stats
+    print(f"Processed {total_s}s of audio in {wall:.2f}s ({total_s / wall:.0f}x real-time, "
+          f"{stats.realtime_factor():.0f}x in process()), {stats.chunks} chunks, {stats.segments} segments")
+    print(f"Output {out_bytes / 2 / 48000:.1f}s at 48 kHz")
+
+    # Segment boundary: the first segment fades out to silence, the next fades in from silence, no overlap
+    boundary = AudioProcessor()
+    loud = (np.full(rate // 10, 0.5) * 32767).astype("<i2").tobytes()
+    boundary.begin_segment()
+    first = boundary.process(loud)
+    first_tail = np.frombuffer(boundary.end_segment(), dtype="<i2")
+    boundary.begin_segment()
+    second = np.frombuffer(boundary.process(loud), dtype="<i2")
+    fade_len = len(boundary._fade_in)
+    assert len(first) // 2 + len(first_tail) == rate // 10 and len(first_tail) == fade_len
+    assert abs(int(first_tail[-1])) < 0.01 * 32767 and np.all(np.diff(first_tail.astype(int)) <= 0)
+    assert abs(int(second[0])) < 0.01 * 32767 and np.all(np.diff(second[:fade_len].astype(int)) >= 0)
+    print("🎚️ segment boundary: fade-out, then fade-in, no overlap")
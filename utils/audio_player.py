@@ -1,104 +1,256 @@
-import pyaudio
-import queue
-import atexit
+from collections import deque
+from dataclasses import dataclass
+from itertools import count
+from typing import Deque, Dict, Optional, TYPE_CHECKING
+
+from utils.audio_sinks import AudioSink, create_sink
+from utils.jitter_buffer import JitterBufferConfig, JitterController, NarrationPlaybackStats
+from utils.ring_buffer import ByteRingBuffer
+
+if TYPE_CHECKING:
+    from utils.audio_dsp import AudioProcessor, PcmFadeOut  # NumPy; imported by whoever builds a processor
+
+SAMPLE_RATE = 24000  # Gemini Live outputs at 24kHz; the processor may resample
+SAMPLE_WIDTH = 2  # 16-bit mono
+FRAMES_PER_BUFFER = 1024
+BUFFER_SECONDS = 30  # ring buffer capacity
+FLUSH_FADE_MS = 10  # fade applied when a flush cuts a segment that is already playing
+
+
+@dataclass(eq=False)
+class PlaybackSegment:
+    """One narration's worth of audio in the player."""
+    segment_id: int
+    urgent: bool = False
+    flushed: bool = False  # set by the producer, honoured by the playback callback
+    closed: bool = False
+
+
+@dataclass(eq=False)
+class _Run:
+    """A contiguous stretch of the ring buffer belonging to one segment."""
+    segment: PlaybackSegment
+    start: int  # stream positions, see ByteRingBuffer.read_position
+    end: Optional[int] = None  # None while it is the run being written
 
 
 class CallbackAudioPlayer:
-    def __init__(self):
-        self.audio_queue = queue.Queue(maxsize=100)  # Limit queue size to prevent memory issues
-        self.p = None
-        self.stream = None
+    def __init__(self, buffer_seconds: float = BUFFER_SECONDS, jitter: Optional[JitterBufferConfig] = None,
+                 sink: Optional[AudioSink] = None, processor: Optional["AudioProcessor"] = None):
+        # Optional resample/normalize/edge-fade stage applied before audio is buffered
+        self.processor = processor
+        self.rate = processor.output_rate if processor else SAMPLE_RATE
+        # Preallocated ring buffer; the callback copies out of it without allocating
+        self.buffer = ByteRingBuffer(int(self.rate * SAMPLE_WIDTH * buffer_seconds))
+        # Jitter-buffer mode: hold playback until the pre-roll is buffered
+        self.jitter = JitterController(jitter, self.rate * SAMPLE_WIDTH) if jitter else None
+        self.sink = sink  # created from $AUDIO_SINK on start() when not given
         self.is_running = False
+        self.underruns = 0  # callbacks that ran out of audio mid-playback
+        self._was_playing = False
+        # Output buffer handed to the sink, reused on every render. Every sink
+        # copies or writes it out before asking for the next one, so reuse is safe.
+        self._out = bytearray(FRAMES_PER_BUFFER * SAMPLE_WIDTH)
+        self._out_view = memoryview(self._out)
+        self._out_readonly = self._out_view.toreadonly()
+        self._silence = memoryview(bytes(len(self._out)))
+        # Segment bookkeeping. The producer appends runs and sets flags, the
+        # callback pops finished runs and skips flushed ones, so neither needs a lock.
+        self._segment_ids = count(1)
+        self._segments: Dict[int, PlaybackSegment] = {}
+        self._current: Optional[PlaybackSegment] = None  # default target of add_chunk
+        self._runs: Deque[_Run] = deque()
+        self._fade_bytes = int(self.rate * FLUSH_FADE_MS / 1000) * SAMPLE_WIDTH
+        self._fade: Optional["PcmFadeOut"] = None  # built on the first flush fade; it needs NumPy
+        self.flushed_bytes = 0
 
-    def start(self):
-        """Initialize and start the audio stream."""
-        if not self.is_running:
-            try:
-                self.p = pyaudio.PyAudio()
-
-                # Use callback for continuous playback
-                self.stream = self.p.open(
-                    format=pyaudio.paInt16,
-                    channels=1,
-                    rate=24000,  # Gemini Live outputs at 24kHz
-                    output=True,
-                    frames_per_buffer=1024,
-                    stream_callback=self._audio_callback
-                )
-
-                self.stream.start_stream()
-                self.is_running = True
-                print("🔊 Audio player started successfully")
-            except Exception as e:
-                print(f"Failed to start audio player: {e}")
+    @property
+    def fill_level(self) -> float:
+        """Fraction of the ring buffer holding unplayed audio."""
+        return self.buffer.fill_level
+
+    @property
+    def buffered_seconds(self) -> float:
+        return self.buffer.available / (self.rate * SAMPLE_WIDTH)
+
+    @property
+    def overrun_bytes(self) -> int:
+        """Audio discarded because the ring buffer was full."""
+        return self.buffer.overrun_bytes
+
+    def has_room(self, input_bytes: int) -> bool:
+        """Whether ``input_bytes`` of source audio would fit in the ring buffer now, after any resampling."""
+        return self.buffer.free >= input_bytes * self.rate // SAMPLE_RATE
+
+    def begin_segment(self, narration_id: int = 0, urgent: bool = False) -> int:
+        """
+        Start a new segment of audio and return its id for ``add_chunk`` and
+        ``flush``. An urgent segment pre-empts everything queued before it: the
+        segment currently playing fades out and the rest is dropped.
+        """
+        self._prune_segments()
+        segment = PlaybackSegment(next(self._segment_ids), urgent=urgent)
+        if urgent:
+            self.flush_all()
+        self._segments[segment.segment_id] = segment
+        self._current = segment
+        if self.processor:
+            self.processor.begin_segment()
+        if self.jitter:
+            self.jitter.begin(narration_id)
+        return segment.segment_id
+
+    def end_segment(self, segment_id: Optional[int] = None) -> Optional[NarrationPlaybackStats]:
+        """Mark that a segment has delivered all its audio; returns its playback stats."""
+        segment = self._segments.get(segment_id) if segment_id is not None else self._current
+        if self.processor:
+            self._buffer_chunk(self.processor.end_segment(), segment)
+        if segment is not None:
+            segment.closed = True
+        if self.jitter:
+            return self.jitter.end()
+        return None
+
+    def flush(self, segment_id: int) -> None:
+        """Drop a segment's unplayed audio; takes effect on the next callback."""
+        segment = self._segments.get(segment_id)
+        if segment is not None:
+            segment.flushed = True
 
-    def _audio_callback(self, in_data, frame_count, time_info, status):
-        """Callback function for continuous audio playback."""
-        bytes_needed = frame_count * 2  # 2 bytes per sample for 16-bit
+    def flush_all(self) -> None:
+        """Drop all unplayed audio of every segment begun so far."""
+        for segment in list(self._segments.values()):
+            segment.flushed = True
 
+    def _prune_segments(self) -> None:
+        live = {run.segment.segment_id for run in list(self._runs)}
+        for segment_id, segment in list(self._segments.items()):
+            if segment.closed and segment_id not in live:
+                del self._segments[segment_id]
+
+    def start(self, sink: Optional[AudioSink] = None):
+        """Start playback into ``sink`` (default: the configured sink, else $AUDIO_SINK)."""
+        if self.is_running:
+            if sink is None or sink is self.sink:
+                return
+            self.stop()  # switching sinks at runtime
+        if sink is not None:
+            self.sink = sink
         try:
-            # Try to get audio data from queue (non-blocking)
-            data = self.audio_queue.get_nowait()
+            if self.sink is None:
+                self.sink = create_sink()
+            self.sink.start(self._render, self.rate, SAMPLE_WIDTH, FRAMES_PER_BUFFER)
+            self.is_running = True
+            print(f"🔊 Audio player started successfully ({self.sink.describe()})")
+        except Exception as e:
+            print(f"Failed to start audio player: {e}")
+
+    def _render(self, frame_count: int) -> memoryview:
+        """Fill the next output buffer; called from the sink's playback clock."""
+        bytes_needed = frame_count * SAMPLE_WIDTH  # 2 bytes per sample for 16-bit
 
-            # Handle data size mismatches
-            if len(data) < bytes_needed:
+        if bytes_needed > len(self._out):
+            # PortAudio asked for more than we preallocated; grow once and keep it
+            self._out = bytearray(bytes_needed)
+            self._out_view = memoryview(self._out)
+            self._out_readonly = self._out_view.toreadonly()
+            self._silence = memoryview(bytes(bytes_needed))
+            self._fade = None  # rebuilt over the new buffer when next needed
+
+        try:
+            faded = self._drop_flushed(bytes_needed)
+            if faded:
+                copied = faded  # a flush cut the playing segment; play its fade-out only
+            elif self.jitter and not self.jitter.should_play(self.buffer.available):
+                copied = 0  # still filling the pre-roll
+            else:
+                copied = self.buffer.read_into(self._out_view, bytes_needed)
+                if copied < bytes_needed:
+                    if copied or self._was_playing:
+                        self.underruns += 1
+                    if self.jitter:
+                        self.jitter.on_underrun()
+            if copied < bytes_needed:
                 # Pad with silence if too short
-                data += b'\x00' * (bytes_needed - len(data))
-            elif len(data) > bytes_needed:
-                # Truncate if too long, put remainder back in queue
-                remainder = data[bytes_needed:]
-                data = data[:bytes_needed]
-                # Put remainder back at front of queue for next callback
-                try:
-                    temp_queue = queue.Queue()
-                    temp_queue.put(remainder)
-                    while not self.audio_queue.empty():
-                        temp_queue.put(self.audio_queue.get_nowait())
-                    self.audio_queue = temp_queue
-                except:
-                    pass  # If queue operations fail, just continue
-
-            return (data, pyaudio.paContinue)
-
-        except queue.Empty:
-            # No data available, play silence
-            silence = b'\x00' * bytes_needed
-            return (silence, pyaudio.paContinue)
+                self._out_view[copied:bytes_needed] = self._silence[copied:bytes_needed]
+            self._was_playing = copied == bytes_needed
         except Exception as e:
             print(f"Audio callback error: {e}")
-            silence = b'\x00' * bytes_needed
-            return (silence, pyaudio.paContinue)
+            self._out_view[:bytes_needed] = self._silence[:bytes_needed]
+
+        if bytes_needed == len(self._out):
+            return self._out_readonly
+        return self._out_readonly[:bytes_needed]
 
-    def add_chunk(self, audio_bytes: bytes):
-        """Add audio chunk to playback queue."""
+    def _drop_flushed(self, bytes_needed: int) -> int:
+        """
+        Callback side: skip the audio of flushed segments. If the cut lands
+        in a segment that is playing, its next few milliseconds are copied
+        into the output with a fade-out first; returns how many bytes that was.
+        """
+        faded = 0
+        position = self.buffer.read_position
+        while self._runs:
+            run = self._runs[0]
+            if run.end is not None and position >= run.end:
+                self._runs.popleft()
+                continue
+            end = run.end if run.end is not None else self.buffer.write_position
+            if not run.segment.flushed or position >= end:
+                break
+            if not faded and self._was_playing and position > run.start:
+                faded = self.buffer.read_into(self._out_view, min(self._fade_bytes, end - position, bytes_needed))
+                self._fade_out(faded)
+                position += faded
+            skipped = self.buffer.skip(end - position)
+            self.flushed_bytes += skipped
+            position += skipped
+            if run.end is None:
+                break
+        return faded
+
+    def _build_fade(self) -> "PcmFadeOut":
+        """Precomputed fade-out over the output buffer, so the callback does no per-sample work."""
+        from utils.audio_dsp import PcmFadeOut
+        return PcmFadeOut(self._out, self._fade_bytes // SAMPLE_WIDTH)
+
+    def _fade_out(self, size: int) -> None:
+        if self._fade is None:
+            self._fade = self._build_fade()
+        self._fade.apply(size)
+
+    def add_chunk(self, audio_bytes: bytes, segment_id: Optional[int] = None):
+        """Add audio chunk to the playback ring buffer (default: the latest segment)."""
         try:
-            # Add chunk to queue (non-blocking)
-            self.audio_queue.put_nowait(audio_bytes)
-        except queue.Full:
-            # Queue is full, remove oldest item and add new one
-            try:
-                self.audio_queue.get_nowait()  # Remove oldest
-                self.audio_queue.put_nowait(audio_bytes)  # Add new
-            except queue.Empty:
-                pass
+            segment = self._segments.get(segment_id) if segment_id is not None else self._current
+            if segment is not None and segment.flushed:
+                return  # flushed while still streaming in
+            if self.processor:
+                audio_bytes = self.processor.process(audio_bytes)
+            self._buffer_chunk(audio_bytes, segment)
+            if self.jitter:
+                self.jitter.on_chunk(self.buffer.available)
         except Exception as e:
             print(f"Failed to add audio chunk: {e}")
 
+    def _buffer_chunk(self, audio_bytes: bytes, segment: Optional[PlaybackSegment] = None):
+        if segment is not None and audio_bytes:
+            tail = self._runs[-1] if self._runs else None
+            if tail is None or tail.segment is not segment:
+                position = self.buffer.write_position
+                self._runs.append(_Run(segment, position))
+                if tail is not None:
+                    tail.end = position  # after the append, so the callback never sees a gap
+        written = self.buffer.write(audio_bytes)
+        if written < len(audio_bytes):
+            print(f"Audio buffer full, dropped {len(audio_bytes) - written} bytes")
+
     def stop(self):
         """Stop and cleanup audio resources."""
         if self.is_running:
             self.is_running = False
             try:
-                if self.stream:
-                    self.stream.stop_stream()
-                    self.stream.close()
-                if self.p:
-                    self.p.terminate()
+                self.sink.stop()
                 print("🔊 Audio player stopped")
             except Exception as e:
                 print(f"Error stopping audio player: {e}")
-
-
-# Global audio player instance
-_audio_player = CallbackAudioPlayer()
-atexit.register(_audio_player.stop)  # Cleanup on exit
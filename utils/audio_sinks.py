@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable, Optional
+
+# Renders ``frame_count`` frames of PCM into a (reused) buffer and returns a view of it
+RenderCallback = Callable[[int], memoryview]
+
+AUDIO_SINK = os.getenv("AUDIO_SINK", "portaudio")  # portaudio | wav:<path> | pcm:<path or fifo> | null
+# Targets that are the process's own stdout, which the commentator also prints to
+STDOUT_TARGETS = ("-", "/dev/stdout", "/dev/fd/1", "/proc/self/fd/1")
+
+
+class AudioSink(ABC):
+    """
+    Where rendered PCM goes. A sink owns the playback clock: it asks the
+    player's render callback for one buffer at a time, at the pace its
+    output consumes audio, so every sink shares the player's buffering path.
+    """
+
+    name = "sink"
+
+    @abstractmethod
+    def start(self, render: RenderCallback, rate: int, sample_width: int, frames_per_buffer: int) -> None:
+        ...
+
+    @abstractmethod
+    def stop(self) -> None:
+        ...
+
+    def describe(self) -> str:
+        return self.name
+
+
+class PortAudioSink(AudioSink):
+    """Local sound card through PyAudio's callback mode."""
+
+    name = "portaudio"
+
+    def __init__(self):
+        self.p = None
+        self.stream = None
+
+    def start(self, render: RenderCallback, rate: int, sample_width: int, frames_per_buffer: int) -> None:
+        import pyaudio  # only hosts with a sound card need it
+
+        def callback(in_data, frame_count, time_info, status):
+            return render(frame_count), pyaudio.paContinue
+
+        self.p = pyaudio.PyAudio()
+        try:
+            self.stream = self.p.open(
+                format=self.p.get_format_from_width(sample_width),
+                channels=1,
+                rate=rate,
+                output=True,
+                frames_per_buffer=frames_per_buffer,
+                stream_callback=callback
+            )
+            self.stream.start_stream()
+        except Exception:
+            self.p.terminate()
+            self.p = None
+            raise
+
+    def stop(self) -> None:
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.p:
+            self.p.terminate()
+            self.p = None
+
+
+class ClockedSink(AudioSink):
+    """
+    Base for sinks without a hardware clock. A worker thread pulls one buffer
+    per buffer period, so files and pipes receive audio at playback speed and
+    jitter-buffer timing behaves exactly as it does on a sound card. With
+    ``realtime=False`` the clock free-runs, which is what benchmarks want.
+    """
+
+    def __init__(self, realtime: bool = True):
+        self.realtime = realtime
+        self.frames_written = 0
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._exited = False
+        self._close_on_exit = False  # stop() gave up waiting; the thread closes the output itself
+
+    def _open(self, rate: int, sample_width: int) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, data: memoryview) -> None:
+        ...
+
+    def _close(self) -> None:
+        pass
+
+    def start(self, render: RenderCallback, rate: int, sample_width: int, frames_per_buffer: int) -> None:
+        self._open(rate, sample_width)
+        self._running = True
+        self._exited = False
+        self._close_on_exit = False
+        self._thread = threading.Thread(
+            target=self._run, args=(render, rate, sample_width, frames_per_buffer),
+            name=f"audio-sink-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, render: RenderCallback, rate: int, sample_width: int, frames_per_buffer: int) -> None:
+        period = frames_per_buffer / rate
+        deadline = time.monotonic()
+        while self._running:
+            try:
+                data = render(frames_per_buffer)
+                self._write(data)
+                self.frames_written += len(data) // sample_width
+            except (BrokenPipeError, OSError) as e:
+                print(f"Audio sink {self.describe()} closed: {e}")
+                self._running = False
+                break
+            if self.realtime:
+                deadline += period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    deadline = time.monotonic()  # fell behind; don't try to catch up in a burst
+        with self._lock:
+            self._exited = True
+            close = self._close_on_exit
+        if close:
+            self._close()
+
+    def stop(self) -> None:
+        self._running = False
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+            with self._lock:
+                if not self._exited:
+                    # still inside a write (e.g. to a FIFO nobody reads): closing now would pull
+                    # the output out from under it, so it closes once its write returns
+                    self._close_on_exit = True
+                    print(f"Audio sink {self.describe()} still writing; it will close when the write returns")
+                    return
+        self._close()
+
+
+class WavFileSink(ClockedSink):
+    """Streams playback into a WAV file; the header is finalized on stop."""
+
+    name = "wav"
+
+    def __init__(self, path: str, realtime: bool = True):
+        super().__init__(realtime)
+        self.path = path
+        self._wav: Optional[wave.Wave_write] = None
+
+    def _open(self, rate: int, sample_width: int) -> None:
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(sample_width)
+        self._wav.setframerate(rate)
+
+    def _write(self, data: memoryview) -> None:
+        self._wav.writeframesraw(data)
+
+    def _close(self) -> None:
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def describe(self) -> str:
+        return f"wav:{self.path}"
+
+
+class RawPcmSink(ClockedSink):
+    """
+    Raw PCM to a file or a named pipe, e.g. ``mkfifo /tmp/commentary.pcm`` and
+    ``ffmpeg -f s16le -ar 24000 -ac 1 -i /tmp/commentary.pcm``. Not stdout: the
+    commentator prints its commentary there, which would corrupt the stream.
+    """
+
+    name = "pcm"
+
+    def __init__(self, path: str, realtime: bool = True):
+        super().__init__(realtime)
+        if not path or path in STDOUT_TARGETS:
+            raise ValueError(f"pcm sink needs a file or FIFO path (got {path!r}); "
+                             f"stdout also carries the commentator's text output")
+        self.path = path
+        self._out: Optional[BinaryIO] = None
+
+    def _open(self, rate: int, sample_width: int) -> None:
+        # opening a FIFO blocks until a reader attaches, so it happens on the sink thread
+        pass
+
+    def _write(self, data: memoryview) -> None:
+        if self._out is None:
+            self._out = open(self.path, "wb")
+        self._out.write(data)
+        self._out.flush()
+
+    def _close(self) -> None:
+        if self._out is not None:
+            self._out.close()
+        self._out = None
+
+    def describe(self) -> str:
+        return f"pcm:{self.path}"
+
+
+class NullSink(ClockedSink):
+    """Discards audio; counts what it was given. Use ``realtime=False`` for benchmarks."""
+
+    name = "null"
+
+    def _write(self, data: memoryview) -> None:
+        pass
+
+
+def create_sink(spec: str = AUDIO_SINK) -> AudioSink:
+    """Build a sink from a spec string such as ``portaudio``, ``wav:out.wav``, ``pcm:/tmp/fifo`` or ``null``."""
+    kind, _, target = spec.partition(":")
+    kind = kind.strip().lower()
+    if kind == "portaudio":
+        return PortAudioSink()
+    if kind == "wav":
+        return WavFileSink(target or "commentary.wav")
+    if kind == "pcm":
+        return RawPcmSink(target)
+    if kind == "null":
+        return NullSink()
+    raise ValueError(f"Unknown audio sink {spec!r}; expected portaudio, wav:<path>, pcm:<path> or null")
@@ -1,7 +1,6 @@
-from google.adk.models.lite_llm import LiteLlm
+def setup_local_model():
+    from google.adk.models.lite_llm import LiteLlm  # imports litellm, which is slow
 
-
-def setup_local_model() -> LiteLlm:
     # Open LMStudio > Load quantized Gemma3n MLX optimised model > start server
     # Can use `curl -X GET http://localhost:1234/v1/models` if not sure of model ID
     local_model = LiteLlm(
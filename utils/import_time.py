@@ -0,0 +1,63 @@
+"""
+Import-time benchmark: ``python -m utils.import_time``.
+
+Imports each entry module in a fresh interpreter with ``-X importtime`` and
+fails if one is over budget or pulls in a module that should only load on
+first use (audio, NumPy, litellm).
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_MODULES = [
+    "commentator_agent.commentator",
+    "crisis_response_agent.agent",
+    "local_agent.agent",
+    "demo",
+]
+IMPORT_BUDGET_S = 3.0  # per entry module; google.adk and google.genai alone take most of it
+LAZY_MODULES = ["pyaudio", "numpy", "litellm", "google.adk.models.lite_llm"]
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """Total import time of ``module`` and the cumulative time of every module it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    loaded: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded[name.strip()] = int(cumulative) / 1e6
+    return loaded.get(module, 0.0), loaded
+
+
+def main() -> int:
+    failures: List[str] = []
+    for module in ENTRY_MODULES:
+        total, loaded = measure(module)
+        heaviest = sorted(loaded.items(), key=lambda item: item[1], reverse=True)[1:6]
+        print(f"{module}: {total:.2f}s")
+        for name, seconds in heaviest:
+            print(f"    {seconds:6.2f}s  {name}")
+
+        if total > IMPORT_BUDGET_S:
+            failures.append(f"{module} took {total:.2f}s (budget {IMPORT_BUDGET_S:.1f}s)")
+        eager = [name for name in LAZY_MODULES if name in loaded]
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} eagerly")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup imports within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
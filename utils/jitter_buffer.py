@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Optional
+
+
+@dataclass
+class JitterBufferConfig:
+    """Pre-roll and watermark settings for jitter-buffered playback (milliseconds)."""
+    preroll_ms: float = 200.0  # minimum audio buffered before a narration starts playing
+    max_preroll_ms: float = 1200.0  # adaptive pre-roll never waits longer than this
+    low_watermark_ms: float = 120.0  # after an underrun, refill this much before resuming
+    high_watermark_ms: float = 8000.0  # buffering beyond this counts as an overrun
+    jitter_factor: float = 3.0  # pre-roll = preroll_ms + factor * inter-arrival std dev
+    adaptive: bool = True
+
+
+@dataclass
+class NarrationPlaybackStats:
+    """Playback quality of one narration."""
+    narration_id: int
+    preroll_ms: float = 0.0
+    chunks: int = 0
+    underruns: int = 0
+    overruns: int = 0
+    startup_wait_ms: float = 0.0
+    rebuffer_ms: float = 0.0
+    jitter_ms: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class JitterController:
+    """
+    Decides when buffered audio may play.
+
+    A narration starts in the buffering state and only plays once the
+    pre-roll is buffered (or the narration has ended). An underrun while the
+    narration is still streaming drops back to buffering until the low
+    watermark is refilled, so a network stall becomes one clean pause instead
+    of audible gaps mid-word. The pre-roll adapts to the spread of chunk
+    inter-arrival times seen so far.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, config: JitterBufferConfig, bytes_per_second: int, history: int = 50):
+        self.config = config
+        self.bytes_per_second = bytes_per_second
+        self.history: Deque[NarrationPlaybackStats] = deque(maxlen=history)
+        self.current: Optional[NarrationPlaybackStats] = None
+        self._playing = False
+        self._ended = True
+        self._target_bytes = self._ms_to_bytes(config.preroll_ms)
+        self._buffering_since = time.monotonic()
+        self._last_arrival: Optional[float] = None
+        self._mean_gap = 0.0
+        self._var_gap = 0.0
+        self._above_high = False
+
+    def _ms_to_bytes(self, ms: float) -> int:
+        return int(self.bytes_per_second * ms / 1000) & ~1  # whole 16-bit samples
+
+    @property
+    def jitter_ms(self) -> float:
+        return (self._var_gap ** 0.5) * 1000
+
+    def preroll_ms(self) -> float:
+        if not self.config.adaptive:
+            return self.config.preroll_ms
+        adaptive = self.config.preroll_ms + self.config.jitter_factor * self.jitter_ms
+        return min(adaptive, self.config.max_preroll_ms)
+
+    def begin(self, narration_id: int) -> None:
+        """A new narration is about to stream in."""
+        self.current = NarrationPlaybackStats(narration_id, preroll_ms=self.preroll_ms())
+        self._ended = False
+        self._last_arrival = None  # the gap between narrations is not jitter
+        if not self._playing:
+            self._enter_buffering(self.current.preroll_ms)
+
+    def end(self) -> Optional[NarrationPlaybackStats]:
+        """The narration has delivered all its audio; let whatever is buffered play out."""
+        self._ended = True
+        stats, self.current = self.current, None
+        if stats is not None:
+            stats.jitter_ms = self.jitter_ms
+            self.history.append(stats)
+        return stats
+
+    def _enter_buffering(self, ms: float) -> None:
+        self._playing = False
+        self._target_bytes = self._ms_to_bytes(ms)
+        self._buffering_since = time.monotonic()
+
+    def on_chunk(self, buffered_bytes: int) -> None:
+        """Producer side: a chunk was added and ``buffered_bytes`` are now waiting."""
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            gap = now - self._last_arrival
+            delta = gap - self._mean_gap
+            self._mean_gap += self.EWMA_ALPHA * delta
+            self._var_gap = (1 - self.EWMA_ALPHA) * (self._var_gap + self.EWMA_ALPHA * delta * delta)
+        self._last_arrival = now
+
+        above_high = buffered_bytes > self._ms_to_bytes(self.config.high_watermark_ms)
+        current = self.current  # read once: begin()/end() swap it from the producer side
+        if current is not None:
+            current.chunks += 1
+            if above_high and not self._above_high:
+                current.overruns += 1
+        self._above_high = above_high
+
+    def should_play(self, available: int) -> bool:
+        """Callback side: may buffered audio be played right now?"""
+        if self._playing:
+            return True
+        if available >= self._target_bytes or (self._ended and available > 0):
+            waited_ms = (time.monotonic() - self._buffering_since) * 1000
+            current = self.current  # read once: end() may clear it on the producer thread meanwhile
+            if current is not None:
+                if current.chunks and current.startup_wait_ms == 0.0 and current.underruns == 0:
+                    current.startup_wait_ms = waited_ms
+                else:
+                    current.rebuffer_ms += waited_ms
+            self._playing = True
+            return True
+        return False
+
+    def on_underrun(self) -> None:
+        """Callback side: the buffer ran dry before the frame was filled."""
+        current = self.current  # read once: end() may clear it on the producer thread meanwhile
+        if self._ended or (current is not None and current.chunks == 0):
+            # between narrations: the next one starts with a fresh pre-roll
+            self._enter_buffering(current.preroll_ms if current else self.preroll_ms())
+            return
+        if current is not None:
+            current.underruns += 1
+        self._enter_buffering(self.config.low_watermark_ms)
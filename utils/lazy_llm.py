@@ -0,0 +1,52 @@
+import os
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+LITELLM_DEBUG = os.getenv("LITELLM_DEBUG") == "1"  # verbose litellm logging, switched on with the first model
+
+
+class LazyLlm(BaseLlm):
+    """
+    Stands in for a model until its first request, then builds the real one
+    with ``factory`` and delegates to it. Agents can be declared at import time
+    without importing litellm or reading model settings from the environment.
+    """
+
+    factory: Callable[[], BaseLlm]
+    _llm: Optional[BaseLlm] = PrivateAttr(default=None)
+
+    def resolve(self) -> BaseLlm:
+        if self._llm is None:
+            self._llm = self.factory()
+            self.model = self._llm.model
+        return self._llm
+
+    @property
+    def capabilities(self):
+        return self.resolve().capabilities
+
+    async def generate_content_async(
+            self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.resolve().generate_content_async(llm_request, stream=stream):
+            yield response
+
+    def connect(self, llm_request: LlmRequest):
+        return self.resolve().connect(llm_request)
+
+
+def lazy_lite_llm(model: str, **kwargs) -> LazyLlm:
+    """``LiteLlm(model=model, **kwargs)``, constructed on first use."""
+
+    def build() -> BaseLlm:
+        from google.adk.models.lite_llm import LiteLlm  # imports litellm, which is slow
+        if LITELLM_DEBUG:
+            import litellm
+            litellm._turn_on_debug()
+        return LiteLlm(model=model, **kwargs)
+
+    return LazyLlm(model=model, factory=build)
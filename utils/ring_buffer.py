@@ -0,0 +1,82 @@
+class ByteRingBuffer:
+    """
+    Fixed-capacity single-producer/single-consumer byte ring buffer.
+
+    The storage is allocated once. ``write`` copies into it from the producer
+    side, ``read_into`` copies out of it into a caller-owned buffer through
+    memoryviews, so the consumer (the real-time audio callback) never
+    allocates or concatenates byte buffers. Each side only ever advances its own
+    counter, after its copy is done, which keeps the pair safe under the GIL
+    without a lock. Audio is never reordered: a write that does not fit is
+    truncated and the overflow is counted instead.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._storage = bytearray(capacity)
+        self._view = memoryview(self._storage)
+        self._written = 0  # total bytes ever written (producer-owned)
+        self._read = 0  # total bytes ever read (consumer-owned)
+        self.overrun_bytes = 0
+
+    @property
+    def available(self) -> int:
+        """Bytes ready to be read."""
+        return self._written - self._read
+
+    @property
+    def read_position(self) -> int:
+        """Total bytes consumed so far; positions index the stream, not the storage."""
+        return self._read
+
+    @property
+    def write_position(self) -> int:
+        """Total bytes written so far."""
+        return self._written
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.available
+
+    @property
+    def fill_level(self) -> float:
+        return self.available / self.capacity
+
+    def write(self, data) -> int:
+        """Copy as much of ``data`` as fits; returns the number of bytes written."""
+        source = memoryview(data).cast("B")
+        size = min(len(source), self.free)
+        if size < len(source):
+            self.overrun_bytes += len(source) - size
+        if size == 0:
+            return 0
+
+        start = self._written % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = source[:first]
+        if first < size:
+            self._view[:size - first] = source[first:size]
+        self._written += size
+        return size
+
+    def read_into(self, destination: memoryview, size: int) -> int:
+        """Copy up to ``size`` bytes into ``destination``; returns how many were copied."""
+        size = min(size, self.available)
+        if size == 0:
+            return 0
+
+        start = self._read % self.capacity
+        first = min(size, self.capacity - start)
+        destination[:first] = self._view[start:start + first]
+        if first < size:
+            destination[first:size] = self._view[:size - first]
+        self._read += size
+        return size
+
+    def skip(self, size: int) -> int:
+        """Discard up to ``size`` bytes from the read side (consumer only)."""
+        size = min(size, self.available)
+        self._read += size
+        return size
@@ -1,63 +1,49 @@
-import pyaudio
-import threading
-import queue
-import time
+from typing import Optional
+
+from utils.audio_player import CallbackAudioPlayer
+from utils.audio_sinks import AudioSink
 
 
 class AudioBuffer:
-    def __init__(self):
-        self.audio_queue = queue.Queue()
-        self.is_playing = False
-        self.stream = None
-        self.p = None
+    """
+    Queue-style playback API kept for existing callers. It shares the
+    ring-buffer player and its pluggable sinks, so it works on headless hosts
+    and times playback exactly like ``CallbackAudioPlayer``.
+    """
+
+    def __init__(self, sink: Optional[AudioSink] = None):
+        self.player = CallbackAudioPlayer(sink=sink)
+
+    @property
+    def is_playing(self) -> bool:
+        return self.player.is_running
 
-    def start_stream(self):
+    def start_stream(self, sink: Optional[AudioSink] = None):
         """Initialize and start the audio stream."""
-        if self.p is None:
-            self.p = pyaudio.PyAudio()
-            self.stream = self.p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=24000,  # Gemini Live outputs at 24kHz
-                output=True,
-                frames_per_buffer=40960,  # Larger buffer for smoother playback
-            )
-
-        if not self.is_playing:
-            self.is_playing = True
-            self.playback_thread = threading.Thread(target=self._playback_worker, daemon=True)
-            self.playback_thread.start()
+        self.player.start(sink)
 
     def add_audio_chunk(self, audio_bytes: bytes):
         """Add audio chunk to the playback queue."""
-        self.audio_queue.put(audio_bytes)
-
-    def _playback_worker(self):
-        """Continuous playback worker thread."""
-        while self.is_playing:
-            try:
-                # Get audio chunk with timeout to avoid blocking forever
-                audio_chunk = self.audio_queue.get(timeout=0.1)
-                if audio_chunk and self.stream:
-                    self.stream.write(audio_chunk)
-                self.audio_queue.task_done()
-            except queue.Empty:
-                # No audio available, brief pause
-                time.sleep(0.01)
-            except Exception as e:
-                print(f"Audio playback error: {e}")
+        self.player.add_chunk(audio_bytes)
 
     def stop(self):
         """Stop audio playback and cleanup."""
-        self.is_playing = False
-        if hasattr(self, 'playback_thread'):
-            self.playback_thread.join(timeout=1.0)
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if self.p:
-            self.p.terminate()
-
-
-# Global audio buffer instance
-audio_buffer = AudioBuffer()
+        self.player.stop()
+
+
+_audio_buffer: Optional[AudioBuffer] = None
+
+
+def get_audio_buffer() -> AudioBuffer:
+    """The shared audio buffer, created on first use so importing this module allocates nothing."""
+    global _audio_buffer
+    if _audio_buffer is None:
+        _audio_buffer = AudioBuffer()
+    return _audio_buffer
+
+
+def __getattr__(name: str):
+    # ``from utils.stream_audio import audio_buffer`` keeps working, without building it at import time
+    if name == "audio_buffer":
+        return get_audio_buffer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")